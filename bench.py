@@ -0,0 +1,219 @@
+import sys
+import os
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+import engine.storage as storage
+from engine.analysis import forget
+from engine.analytics import calculate_critical_path
+from engine.engine import compute_schedule, get_project_diagnosis
+from engine.journal import JournalStore
+from engine.sharded_store import ShardedStore
+from engine.sqlite_store import SqliteStore
+
+# Usage: python bench.py [--max 100000] [--shapes random,layered,chain] [--backend json]
+#                        [--out bench_results.json] [--compare old_results.json]
+# Times the scheduling and storage core on synthetic DAGs of 10 .. --max tasks and
+# writes one JSON document per run; --compare flags operations that got slower.
+
+SHAPES = ("random", "layered", "chain")
+OPS = ("compute_schedule", "calculate_critical_path", "get_project_diagnosis", "load_data", "save_data")
+STORES = {
+    "json": lambda d: storage.JsonStore(d / "projects.json"),
+    "journal": lambda d: JournalStore(d / "projects.json"),
+    "sqlite": lambda d: SqliteStore(d / "projects.db"),
+    "sharded": lambda d: ShardedStore(d / "projects"),
+}
+
+
+# --- Synthetic plans ---
+
+def _task(i, rng, deps):
+    return {"id": f"t{i}", "name": f"Task {i}", "duration_days": rng.randint(1, 5),
+            "depends_on": deps, "status": "pending", "delay_days": 0}
+
+
+def random_dag(n: int, max_deps: int = 3, seed: int = 0):
+    """Each task depends on up to max_deps random earlier tasks."""
+    rng = random.Random(seed)
+    tasks = [_task(i, rng, [f"t{rng.randrange(i)}" for _ in range(rng.randint(0, max_deps))] if i else [])
+             for i in range(n)]
+    rng.shuffle(tasks)  # the scheduler must not rely on input order
+    return tasks
+
+
+def layered_dag(n: int, width: int = 0, max_deps: int = 3, seed: int = 0):
+    """Tasks in layers of `width` (default sqrt n); each depends on tasks of the previous layer."""
+    rng = random.Random(seed)
+    width = width or max(int(n ** 0.5), 1)
+    tasks = []
+    for i in range(n):
+        layer = i // width
+        prev = range((layer - 1) * width, layer * width) if layer else range(0)
+        deps = [f"t{j}" for j in rng.sample(prev, min(len(prev), rng.randint(1, max_deps)))] if prev else []
+        tasks.append(_task(i, rng, deps))
+    rng.shuffle(tasks)
+    return tasks
+
+
+def chain_dag(n: int, chains: int = 4, cross: float = 0.01, seed: int = 0):
+    """A few long chains with the odd cross-link: deep graphs with little parallelism."""
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(n):
+        deps = [f"t{i - chains}"] if i >= chains else []
+        if i >= chains and rng.random() < cross:
+            deps.append(f"t{rng.randrange(i - chains + 1)}")
+        tasks.append(_task(i, rng, deps))
+    return tasks[::-1]
+
+
+GENERATORS = {"random": random_dag, "layered": layered_dag, "chain": chain_dag}
+
+
+# --- Measurement ---
+
+def measure(fn, repeat: int, memory: bool):
+    """(best wall time over `repeat` runs, peak traced allocation of one extra run or None)."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def bench_plan(shape: str, n: int, backend: str, ops, repeat: int, memory: bool):
+    tasks = GENERATORS[shape](n)
+    pid = f"bench-{shape}-{n}"
+    project = {"id": pid, "name": pid, "deadline": None, "tasks": tasks}
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        store = STORES[backend](Path(d))
+        previous, storage._store = storage._store, store
+        try:
+            store.save_data({"active_project_id": pid, "projects": [project]})
+            data = store.load_data()
+
+            def cold_schedule():
+                forget(pid)  # time the computation, not the cache
+                compute_schedule(project)
+
+            def cold_diagnosis():
+                forget(pid)
+                get_project_diagnosis(pid)
+
+            def cold_load():
+                fresh = STORES[backend](Path(d))  # fresh instance: parse, no cache
+                fresh.load_data()
+                if hasattr(fresh, "close"):
+                    fresh.close()
+
+            work = {
+                "compute_schedule": cold_schedule,
+                "calculate_critical_path": lambda: calculate_critical_path(tasks),
+                "get_project_diagnosis": cold_diagnosis,
+                "load_data": cold_load,
+                "save_data": lambda: store.save_data(data),
+            }
+            for op in ops:
+                seconds, peak = measure(work[op], repeat, memory)
+                results.append({"shape": shape, "tasks": n, "op": op, "backend": backend,
+                                "seconds": round(seconds, 6), "peak_bytes": peak})
+        finally:
+            storage._store = previous
+            forget(pid)
+            if hasattr(store, "close"):
+                store.close()
+    return results
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old, new, threshold: float):
+    """Rows of new results that got slower than `threshold` x the matching old result."""
+    before = {(r["shape"], r["tasks"], r["op"], r["backend"]): r for r in old["results"]}
+    slower = []
+    for r in new["results"]:
+        o = before.get((r["shape"], r["tasks"], r["op"], r["backend"]))
+        # Timings of a few milliseconds are mostly noise
+        if o and r["seconds"] > 5e-3 and r["seconds"] > threshold * o["seconds"]:
+            slower.append((r, o))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scheduling and storage core on synthetic DAGs.")
+    parser.add_argument("--max", type=int, default=100_000, help="largest plan (tasks), sizes go 10, 100, ... up to it")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--ops", default=",".join(OPS))
+    parser.add_argument("--backend", default="json", choices=sorted(STORES))
+    parser.add_argument("--repeat", type=int, default=0, help="runs per measurement (default: fewer for large plans)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file; exit 1 if anything got slower")
+    parser.add_argument("--threshold", type=float, default=1.3, help="slowdown factor that counts as a regression")
+    args = parser.parse_args(argv)
+
+    shapes = [s for s in args.shapes.split(",") if s]
+    ops = [o for o in args.ops.split(",") if o]
+    for name, known in (("shape", shapes), ("op", ops)):
+        unknown = set(known) - set(SHAPES if name == "shape" else OPS)
+        if unknown:
+            parser.error(f"unknown {name}(s): {', '.join(sorted(unknown))}")
+
+    run = {"commit": _commit(), "date": datetime.now().isoformat(timespec="seconds"),
+           "python": platform.python_version(), "machine": platform.machine(), "results": []}
+    print(f"{'shape':<8}{'tasks':>9} {'op':<24}{'seconds':>10}{'us/task':>10}{'peak MB':>9}")
+    n = 10
+    while n <= args.max:
+        repeat = args.repeat or max(1, min(5, 100_000 // n))
+        for shape in shapes:
+            for r in bench_plan(shape, n, args.backend, ops, repeat, not args.no_memory):
+                run["results"].append(r)
+                peak = f"{r['peak_bytes'] / 2**20:.1f}" if r["peak_bytes"] is not None else "-"
+                print(f"{shape:<8}{n:>9} {r['op']:<24}{r['seconds']:>10.4f}{r['seconds'] / n * 1e6:>10.2f}{peak:>9}")
+        n *= 10
+
+    Path(args.out).write_text(json.dumps(run, indent=1))
+    print(f"Results saved to {args.out}")
+
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text())
+        slower = compare(old, run, args.threshold)
+        for r, o in slower:
+            print(f"SLOWER: {r['shape']} {r['tasks']} {r['op']}: {o['seconds']:.4f}s -> {r['seconds']:.4f}s")
+        if slower:
+            return 1
+        print(f"No regressions against {old.get('commit') or args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,9 @@
 ﻿from pathlib import Path
 from datetime import date
-from typing import Dict, Any
+from typing import Dict, Any, List
 import subprocess
 
-def export_plan_to_word(project: Dict[str, Any]) -> str:
+def export_plan_to_word(project: Dict[str, Any], critical_path: List[str] | None = None) -> str:
     from docx import Document  # python-docx
     out_dir = Path(__file__).resolve().parent.parent / "data"
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -18,10 +18,13 @@ def export_plan_to_word(project: Dict[str, Any]) -> str:
         doc.add_paragraph(project["description"])
 
     doc.add_heading("Tasks", level=2)
+    critical = set(critical_path or [])
     for t in project.get("tasks", []):
         line = f'- {t.get("id")} | {t.get("name")} | {t.get("duration_days")} day(s)'
         if t.get("depends_on"):
             line += f' | depends on: {", ".join(t["depends_on"])}'
+        if t.get("id") in critical:
+            line += ' | critical'
         doc.add_paragraph(line)
 
     doc.save(str(out_path))
@@ -30,7 +33,8 @@ def export_plan_to_word(project: Dict[str, Any]) -> str:
     subprocess.Popen(["cmd", "/c", "start", "", str(out_path)], shell=True)
     return str(out_path)
 
-def export_schedule_to_excel(project: Dict[str, Any], schedule: list[Dict[str, Any]]) -> str:
+def export_schedule_to_excel(project: Dict[str, Any], schedule: list[Dict[str, Any]],
+                             slack: Dict[str, int] | None = None) -> str:
     from openpyxl import Workbook  # openpyxl
     out_dir = Path(__file__).resolve().parent.parent / "data"
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -40,7 +44,7 @@ def export_schedule_to_excel(project: Dict[str, Any], schedule: list[Dict[str, A
     wb = Workbook()
     ws = wb.active
     ws.title = "Schedule"
-    ws.append(["Task ID", "Task Name", "Start", "End", "Duration Days", "Delay Days", "Status", "Depends On"])
+    ws.append(["Task ID", "Task Name", "Start", "End", "Duration Days", "Delay Days", "Status", "Depends On", "Slack Days"])
 
     for t in schedule:
         ws.append([
@@ -52,6 +56,7 @@ def export_schedule_to_excel(project: Dict[str, Any], schedule: list[Dict[str, A
             t.get("delay_days"),
             t.get("status"),
             ", ".join(t.get("depends_on", [])),
+            (slack or {}).get(t.get("id")),
         ])
 
     wb.save(str(out_path))
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .storage import DATA_PATH
+
+# Cache of AI replies, so the same question ("what can you do", a standard project
+# prompt) isn't a paid multi-second call every time. Keyed by provider, model, the
+# normalized prompt and the content hashes of any attachments.
+
+# Set JARVIS_AI_CACHE=0 to turn it off
+CACHE_ENABLED = os.environ.get("JARVIS_AI_CACHE", "1") != "0"
+
+# Replies kept in memory (least recently used go first), and their lifetime in seconds
+CACHE_SIZE = int(os.environ.get("JARVIS_AI_CACHE_SIZE", "256"))
+CACHE_TTL = float(os.environ.get("JARVIS_AI_CACHE_TTL", "21600"))
+
+# JARVIS_AI_CACHE_DISK=1 also keeps replies in data/ai_cache.db, so they survive a
+# restart; it holds up to JARVIS_AI_CACHE_DISK_SIZE replies (default 10 x CACHE_SIZE)
+CACHE_DISK = os.environ.get("JARVIS_AI_CACHE_DISK", "0") != "0"
+CACHE_DISK_PATH = DATA_PATH.parent / "ai_cache.db"
+CACHE_DISK_SIZE = int(os.environ.get("JARVIS_AI_CACHE_DISK_SIZE", "0")) or 10 * CACHE_SIZE
+
+
+def normalize_prompt(message: str) -> str:
+    """Case, runs of whitespace and trailing punctuation don't make a different question."""
+    return " ".join((message or "").lower().split()).rstrip("?!. ")
+
+
+def content_hash(data: str) -> str:
+    """Hash of an attachment's (base64) content, fed in 1 MB slices so a large upload isn't copied whole."""
+    h = hashlib.sha256()
+    for i in range(0, len(data), 1 << 20):
+        h.update(data[i:i + (1 << 20)].encode("utf-8"))
+    return h.hexdigest()
+
+
+def cache_key(provider: str, model: str, message: str, files: Optional[List[Dict[str, Any]]] = None) -> str:
+    attachments = sorted((f.get("type", ""), content_hash(f.get("content", ""))) for f in files or [])
+    raw = json.dumps([provider, model, normalize_prompt(message), attachments])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of replies with a TTL, in front of an optional SQLite tier
+    (same bound-and-expire rules, least recently used rows trimmed). Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL,
+                 path: Optional[Path] = None, max_disk_entries: int = CACHE_DISK_SIZE):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (stored at, reply)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.disk_hits = 0
+        self.db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self.db = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS replies ("
+                            "key TEXT PRIMARY KEY, stored REAL NOT NULL, used REAL NOT NULL, reply TEXT NOT NULL)")
+            self.db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            if self.db is not None:
+                row = self.db.execute("SELECT stored, reply FROM replies WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[0] < self.ttl:
+                    self.db.execute("UPDATE replies SET used = ? WHERE key = ?", (now, key))
+                    self.db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[1]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, reply: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, reply)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO replies VALUES (?, ?, ?, ?)", (key, now, now, reply))
+                self.db.execute("DELETE FROM replies WHERE stored < ?", (now - self.ttl,))
+                self.db.execute("DELETE FROM replies WHERE key NOT IN "
+                                "(SELECT key FROM replies ORDER BY used DESC LIMIT ?)", (self.max_disk_entries,))
+                self.db.commit()
+
+    def _remember(self, key: str, stored: float, reply: str) -> None:
+        self._entries[key] = (stored, reply)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM replies")
+                self.db.commit()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "disk_hits": self.disk_hits, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -1,17 +1,23 @@
 
 import json
 import os
-import urllib.request
 import urllib.error
 import time
 import random
-from typing import List, Dict, Any
+import queue
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Optional
 
 import base64
 import io
 import zipfile
 import xml.etree.ElementTree as ET
 
+from .ai_cache import CACHE_DISK, CACHE_DISK_PATH, CACHE_ENABLED, ResponseCache, cache_key, content_hash
+from .circuit_breaker import CircuitBreaker, retry_after_seconds
+from .http_client import post_json, stream_events
+
 # Configuration
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
@@ -21,6 +27,116 @@ DEFAULT_PROVIDER = os.environ.get("LLM_PROVIDER", "gemini").lower()
 GEMINI_MODEL = os.environ.get("LLM_MODEL_NAME", "gemini-2.5-flash")
 GROQ_MODEL = os.environ.get("GROQ_MODEL_NAME", "llama-3.3-70b-versatile")
 
+# Hedged requests: when both providers are configured, the other one is started
+# if the preferred one hasn't answered within this many ms (urgent turns, like
+# voice, start both at once). The first good answer wins. JARVIS_HEDGE=0 goes
+# back to strictly one provider after the other.
+HEDGE_ENABLED = os.environ.get("JARVIS_HEDGE", "1") != "0"
+HEDGE_DELAY = float(os.environ.get("JARVIS_HEDGE_DELAY_MS", "2500")) / 1000.0
+
+# Longest Retry-After worth waiting out on the same model; a longer one moves on
+# to the next model (and keeps the busy one out of the chain until then)
+RETRY_WAIT_MAX = float(os.environ.get("JARVIS_RETRY_WAIT_MAX", "5"))
+
+# Same-model retries after a 429, and the backoff base in seconds when the server names no wait
+MAX_RETRIES_PER_MODEL = 1
+RETRY_BASE_DELAY = 2
+
+# Text extracted from attachments, by content hash: a file sent again (or the same
+# request retried on another model) isn't decoded and parsed again. Bounded by the
+# total size of the kept text and by the number of files (failed extractions keep
+# no text but still take an entry), least recently used dropped first.
+EXTRACT_CACHE_CHARS = int(float(os.environ.get("JARVIS_EXTRACT_CACHE_MB", "64")) * 2**20)
+EXTRACT_CACHE_ENTRIES = int(os.environ.get("JARVIS_EXTRACT_CACHE_ENTRIES", "256"))
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class ProviderError(Exception):
+    """A provider (every model of it) failed to answer."""
+
+
+# Replies that report a failure rather than answer, and so are never cached
+_NOT_ANSWERS = (
+    "All AI models failed.",
+    "I'm not connected to my primary brain",
+    "Groq API Key missing.",
+    "I thought about it, but couldn't form a response.",
+)
+
+# Health of each Gemini model, so known-broken ones are skipped (see engine/circuit_breaker.py)
+_breaker = CircuitBreaker()
+
+_cache = ResponseCache(path=CACHE_DISK_PATH if CACHE_DISK else None) if CACHE_ENABLED else None
+
+
+def _cache_key(message: str, files: List[Dict[str, Any]] = None) -> str:
+    # The provider asked first: Gemini for attachments, else the preferred one. This is
+    # the route, not necessarily the model that answered: a fallback reply (another
+    # Gemini model, or Groq) is kept under the same key and served for the question
+    # until it expires. Pass use_cache=False (the API's "no_cache") for a fresh answer.
+    provider = "gemini" if files else DEFAULT_PROVIDER
+    return cache_key(provider, GROQ_MODEL if provider == "groq" else GEMINI_MODEL, message, files)
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the reply cache."""
+    return _cache.stats if _cache is not None else {}
+
+
+_extracted: "OrderedDict[str, Optional[str]]" = OrderedDict()
+_extracted_chars = 0
+_extract_lock = threading.Lock()
+
+
+def _is_docx(mime_type: str, filename: str) -> bool:
+    return "wordprocessingml.document" in mime_type or filename.endswith(".docx")
+
+
+def _extract_cached(base64_data: str, mime_type: str, filename: str) -> Optional[str]:
+    """_extract_text_from_file, remembered by content hash (failures too, so they aren't retried)."""
+    global _extracted_chars
+    key = f"{content_hash(base64_data)}:{'docx' if _is_docx(mime_type, filename) else 'text'}"
+    with _extract_lock:
+        if key in _extracted:
+            _extracted.move_to_end(key)
+            return _extracted[key]
+    text = _extract_text_from_file(base64_data, mime_type, filename)
+    size = len(text or "")
+    with _extract_lock:
+        if key not in _extracted and size <= EXTRACT_CACHE_CHARS:
+            _extracted[key] = text
+            _extracted_chars += size
+            while _extracted_chars > EXTRACT_CACHE_CHARS or len(_extracted) > EXTRACT_CACHE_ENTRIES:
+                _, dropped = _extracted.popitem(last=False)
+                _extracted_chars -= len(dropped or "")
+    return text
+
+
+def _docx_text(stream) -> str:
+    """
+    Text of word/document.xml, read incrementally: paragraphs start a new line
+    and every finished paragraph is dropped from the tree, so memory stays flat
+    however long the document is.
+    """
+    text_parts = []
+    body = None
+    for event, node in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if node.tag == f"{W_NS}p": # Paragraph (add newline)
+                text_parts.append("\n")
+            elif node.tag == f"{W_NS}body":
+                body = node
+        elif node.tag == f"{W_NS}t": # Text node
+            if node.text:
+                text_parts.append(node.text)
+        elif node.tag == f"{W_NS}p":
+            node.clear()
+            if body is not None:
+                del body[:]  # detaches finished paragraphs and tables (open ones are still being built)
+    return "".join(text_parts).strip()
+
+
 def _extract_text_from_file(base64_data: str, mime_type: str, filename: str) -> str:
     """
     Extracts text from base64 encoded file data.
@@ -30,22 +146,13 @@ def _extract_text_from_file(base64_data: str, mime_type: str, filename: str) ->
         file_bytes = base64.b64decode(base64_data)
         
         # 1. DOCX Handling (Zip of XMLs)
-        if "wordprocessingml.document" in mime_type or filename.endswith(".docx"):
+        if _is_docx(mime_type, filename):
             try:
                 with io.BytesIO(file_bytes) as f:
                     with zipfile.ZipFile(f) as z:
-                        xml_content = z.read("word/document.xml")
-                        tree = ET.fromstring(xml_content)
-                        # Namespace for word processing ml
-                        ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
-                        text_parts = []
-                        for node in tree.iter():
-                            if node.tag == f"{{{ns['w']}}}t": # Text node
-                                if node.text:
-                                    text_parts.append(node.text)
-                            elif node.tag == f"{{{ns['w']}}}p": # Paragraph (add newline)
-                                text_parts.append("\n")
-                        return "".join(text_parts).strip()
+                        # Decompressed and parsed as it is read, never held whole
+                        with z.open("word/document.xml") as xml_stream:
+                            return _docx_text(xml_stream)
             except Exception as e:
                 print(f"[Text Extraction] Failed to parse DOCX: {e}")
                 return None
@@ -65,22 +172,40 @@ def _extract_text_from_file(base64_data: str, mime_type: str, filename: str) ->
         return None
 
 
-def chat_with_ai(message: str, files: List[Dict[str, Any]] = None) -> str:
+def chat_with_ai(message: str, files: List[Dict[str, Any]] = None, urgent: bool = False,
+                 use_cache: bool = True) -> str:
     """
     Sends a message to the AI. Smartly routes between Gemini and Groq.
+    - Asked before? -> The cached reply (see engine/ai_cache.py); use_cache=False skips it.
     - Files present? -> Gemini (Multimodal)
+    - Both keys set? -> Hedged race, preferred provider first (see HEDGE_DELAY);
+      urgent=True starts both right away.
     - Groq configured? -> Try Groq first, fallback to Gemini on error.
     - Default -> Gemini.
     """
     if not message and not files:
         return "I'm listening..."
 
+    if not use_cache or _cache is None:
+        return _route(message, files, urgent)
+    key = _cache_key(message, files)
+    reply = _cache.get(key)
+    if reply is None:
+        reply = _route(message, files, urgent)
+        if reply and not reply.startswith(_NOT_ANSWERS):
+            _cache.put(key, reply)
+    return reply
+
+def _route(message: str, files: List[Dict[str, Any]] = None, urgent: bool = False) -> str:
     # 1. Force Gemini if files are present (Groq text models don't support images easily via this method)
     if files and len(files) > 0:
         return _chat_with_gemini(message, files)
 
     # 2. Check Provider Preference
     provider = DEFAULT_PROVIDER
+
+    if HEDGE_ENABLED and GEMINI_API_KEY and GROQ_API_KEY:
+        return _race(message, provider, 0.0 if urgent else HEDGE_DELAY)
     
     # Logic: If Groq is requested, try it. If it fails, fallback to Gemini.
     if provider == "groq":
@@ -96,6 +221,53 @@ def chat_with_ai(message: str, files: List[Dict[str, Any]] = None) -> str:
     # 3. Default to Gemini
     return _chat_with_gemini(message, files)
 
+def _race(message: str, provider: str, delay: float) -> str:
+    """
+    Hedged request: starts the preferred provider, and the other one after `delay`
+    seconds or as soon as the first fails. Returns the first good answer; the
+    loser is told to stop (it makes no further model attempts or retries) and
+    whatever it still returns is dropped.
+    """
+    cancel = threading.Event()
+    gemini = lambda: _chat_with_gemini(message, cancel=cancel, fallback=False)
+    groq = lambda: _chat_with_groq(message)
+    order = [("groq", groq), ("gemini", gemini)] if provider == "groq" else [("gemini", gemini), ("groq", groq)]
+    results: "queue.Queue" = queue.Queue()
+
+    def run(name, call):
+        try:
+            results.put((name, call(), None))
+        except Exception as e:
+            results.put((name, None, e))
+
+    def launch(name, call):
+        threading.Thread(target=run, args=(name, call), daemon=True, name=f"ai-{name}").start()
+
+    launch(*order[0])
+    running, hedged = 1, False
+    errors = []
+    while running:
+        try:
+            name, reply, error = results.get(timeout=None if hedged else delay)
+        except queue.Empty:
+            print(f"[AI Chat] No answer from {order[0][0]} after {delay:.1f}s. Also asking {order[1][0]}.")
+            launch(*order[1])
+            running, hedged = running + 1, True
+            continue
+        running -= 1
+        if error is None and reply and reply.startswith(_NOT_ANSWERS):
+            # An empty candidate ("couldn't form a response") mustn't beat a real answer
+            error = ProviderError(reply)
+        if error is None:
+            cancel.set()
+            return reply
+        print(f"[AI Chat] {name} failed: {error}")
+        errors.append(f"{name}: {error}")
+        if not hedged:
+            launch(*order[1])
+            running, hedged = running + 1, True
+    return "All AI models failed.\nDetails:\n" + "\n".join(errors)
+
 def _chat_with_groq(message: str) -> str:
     """
     Interacts with Groq API using urllib (standard library).
@@ -112,36 +284,24 @@ def _chat_with_groq(message: str) -> str:
         "max_tokens": 1024
     }
     
-    data = json.dumps(payload).encode("utf-8")
-    
-    req = urllib.request.Request(
-        url, 
-        data=data, 
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" 
-        }
-    )
-    
     try:
-        with urllib.request.urlopen(req) as response:
-            resp_body = response.read().decode("utf-8")
-            resp_data = json.loads(resp_body)
-            return resp_data["choices"][0]["message"]["content"]
+        resp_data = post_json(
+            url,
+            payload,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" 
+            }
+        )
+        return resp_data["choices"][0]["message"]["content"]
             
     except urllib.error.HTTPError as e:
         error_body = e.read().decode('utf-8')
         raise Exception(f"HTTP {e.code} - {error_body}")
 
 
-def _chat_with_gemini(message: str, files: List[Dict[str, Any]] = None) -> str:
-    """
-    Interacts with Google Gemini API with Retry Logic and Model Fallback.
-    """
-    if not GEMINI_API_KEY:
-        return "I'm not connected to my primary brain (Gemini API Key missing)."
-
+def _gemini_models() -> List[str]:
+    """The Gemini models to try, in order."""
     # Define fallback models in order of preference
     # 1. User configured model (current default)
     # 2. Flash Lite (Fastest, cheapest)
@@ -160,63 +320,87 @@ def _chat_with_gemini(message: str, files: List[Dict[str, Any]] = None) -> str:
     for m in fallback_models:
         if m != current_model and m not in models_to_try:
             models_to_try.append(m)
+    return models_to_try
+
+
+def _gemini_parts(message: str, files: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """The request parts for a message: its text, then each file inline or as extracted text."""
+    parts = []
+    if message:
+        parts.append({"text": message})
 
-    max_retries_per_model = 1
-    base_delay = 2
+    if files:
+        for file in files:
+            mime_type = file.get("type", "application/octet-stream")
+            base64_data = file.get("content", "")
+
+            # Check for supported inline types
+            if mime_type.startswith("image/") or mime_type.startswith("audio/") or mime_type == "application/pdf":
+                parts.append({
+                    "inline_data": {
+                        "mime_type": mime_type,
+                        "data": base64_data
+                    }
+                })
+            else:
+                # Attempt to extract text for other types (docx, txt, json, code)
+                extracted_text = _extract_cached(base64_data, mime_type, file.get("name", ""))
+                if extracted_text:
+                    # Append extracted text to the message parts
+                    parts.append({"text": f"\n\n[Content of file '{file.get('name', 'unknown')}':]\n{extracted_text}\n[End of file]\n"})
+                else:
+                    # Fallback or skip
+                    print(f"[Gemini] Skipping unsupported file type: {mime_type}")
+    return parts
+
+
+def _retry_delay(code: int, attempt: int, retry_after: Optional[float]) -> Optional[float]:
+    """Seconds to wait before retrying the same model after HTTP `code`, or None to move on."""
+    if code != 429 or attempt >= MAX_RETRIES_PER_MODEL:
+        return None
+    if retry_after is not None:
+        return retry_after if retry_after <= RETRY_WAIT_MAX else None
+    return RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
+
+
+def _chat_with_gemini(message: str, files: List[Dict[str, Any]] = None,
+                      cancel: Optional[threading.Event] = None, fallback: bool = True) -> str:
+    """
+    Interacts with Google Gemini API with Retry Logic and Model Fallback.
+    With fallback=False (racing Groq) a total failure raises ProviderError instead
+    of trying Groq; a set `cancel` event stops before the next attempt.
+    """
+    if not GEMINI_API_KEY:
+        return "I'm not connected to my primary brain (Gemini API Key missing)."
+
+    chain = _gemini_models()
+    models_to_try = _breaker.order(chain)
+    if len(models_to_try) < len(chain):
+        print(f"[Gemini] Skipping unhealthy model(s): {', '.join(m for m in chain if m not in models_to_try)}")
 
     all_errors = []
 
+    # Built once: attachments are extracted here, not again for every model and retry
+    parts = _gemini_parts(message, files)
+
     for model in models_to_try:
         print(f"[Gemini] Attempting with model: {model}")
         
-        for attempt in range(max_retries_per_model + 1):
+        for attempt in range(MAX_RETRIES_PER_MODEL + 1):
+            if cancel is not None and cancel.is_set():
+                raise ProviderError("cancelled")
             try:
                 # Construct Gemini API URL
                 url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
 
-                parts = []
-                if message:
-                    parts.append({"text": message})
-
-                if files:
-                    for file in files:
-                        mime_type = file.get("type", "application/octet-stream")
-                        base64_data = file.get("content", "")
-                        
-                        # Check for supported inline types
-                        if mime_type.startswith("image/") or mime_type.startswith("audio/") or mime_type == "application/pdf":
-                            parts.append({
-                                "inline_data": {
-                                    "mime_type": mime_type,
-                                    "data": base64_data
-                                }
-                            })
-                        else:
-                            # Attempt to extract text for other types (docx, txt, json, code)
-                            extracted_text = _extract_text_from_file(base64_data, mime_type, file.get("name", ""))
-                            if extracted_text:
-                                # Append extracted text to the message parts
-                                parts.append({"text": f"\n\n[Content of file '{file.get('name', 'unknown')}':]\n{extracted_text}\n[End of file]\n"})
-                            else:
-                                # Fallback or skip
-                                 print(f"[Gemini] Skipping unsupported file type: {mime_type}")
-
                 payload = {"contents": [{"parts": parts}]}
-                data_json = json.dumps(payload).encode("utf-8")
-
-                req = urllib.request.Request(
-                    url, 
-                    data=data_json, 
-                    headers={"Content-Type": "application/json"}
-                )
-
-                with urllib.request.urlopen(req) as response:
-                    resp_body = response.read().decode("utf-8")
-                    resp_data = json.loads(resp_body)
-                    try:
-                        return resp_data["candidates"][0]["content"]["parts"][0]["text"]
-                    except (KeyError, IndexError):
-                        return "I thought about it, but couldn't form a response."
+
+                resp_data = post_json(url, payload)
+                _breaker.record_success(model)
+                try:
+                    return resp_data["candidates"][0]["content"]["parts"][0]["text"]
+                except (KeyError, IndexError):
+                    return "I thought about it, but couldn't form a response."
 
             except urllib.error.HTTPError as e:
                 # Read error body
@@ -227,16 +411,23 @@ def _chat_with_gemini(message: str, files: List[Dict[str, Any]] = None) -> str:
                 
                 error_msg = f"{model}: HTTP {e.code} - {error_body}"
                 print(f"[Gemini] Error: {error_msg}")
+                retry_after = retry_after_seconds(e.headers, error_body)
                 
-                # Retryable errors for SAME model
-                if e.code == 429 and attempt < max_retries_per_model:
+                # Retryable errors for SAME model, unless the server wants a long break
+                delay = _retry_delay(e.code, attempt, retry_after)
+                if delay is not None:
                      # Wait and retry same model
-                    delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
                     print(f"[Gemini] Retrying {model} in {delay:.1f}s...")
-                    time.sleep(delay)
+                    if cancel is not None:
+                        cancel.wait(delay)
+                    else:
+                        time.sleep(delay)
                     continue
                 
                 all_errors.append(error_msg)
+                # A 400 is about the request, not the model's health
+                if e.code != 400:
+                    _breaker.record_failure(model, e.code, retry_after)
                 # If 404, 429, 503, try next MODEL
                 if e.code in [404, 429, 503, 400]: 
                     break 
@@ -245,8 +436,12 @@ def _chat_with_gemini(message: str, files: List[Dict[str, Any]] = None) -> str:
             except Exception as e:
                 print(f"[Gemini] Error: {e}")
                 all_errors.append(f"{model}: {str(e)}")
+                _breaker.record_failure(model)
                 break # Try next model
         
+    if not fallback:
+        raise ProviderError("; ".join(all_errors))
+
     # If all Gemini models fail, try Groq as a last resort
     if GROQ_API_KEY:
         print("[Gemini] All Gemini models failed. Falling back to Groq (Text Only).")
@@ -261,4 +456,131 @@ def _chat_with_gemini(message: str, files: List[Dict[str, Any]] = None) -> str:
         except Exception as e:
             all_errors.append(f"Groq Fallback: {str(e)}")
 
-    return f"All AI models failed.\nDetails:\n" + "\n".join(all_errors)
+    return "All AI models failed.\nDetails:\n" + "\n".join(all_errors)
+
+
+# --- Streaming ---
+
+def stream_chat_with_ai(message: str, files: List[Dict[str, Any]] = None,
+                        use_cache: bool = True) -> Iterator[str]:
+    """
+    Like chat_with_ai, but yields the reply in pieces as the model writes it
+    (Gemini streamGenerateContent / Groq stream=true, both over SSE). Providers and
+    Gemini models are tried in the same order, with the same retry of a model on a
+    429; one that fails before its first piece falls through to the next, one that
+    fails midway ends the reply with a note.
+    A cached reply comes back as one piece; a complete streamed one is cached.
+    """
+    if not message and not files:
+        yield "I'm listening..."
+        return
+
+    key = _cache_key(message, files) if use_cache and _cache is not None else None
+    if key is not None:
+        cached = _cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    attempts = []
+    if GEMINI_API_KEY:
+        parts = _gemini_parts(message, files)
+        attempts = [(model, lambda model=model: _stream_gemini(model, parts)) for model in _breaker.order(_gemini_models())]
+    if GROQ_API_KEY:
+        groq_message = message
+        if files:
+            file_names = ", ".join([f.get("name", "unnamed") for f in files])
+            groq_message += f"\n\n[System Note: User attached files ({file_names}) but Gemini is overloaded. Please answer the text prompt only.]"
+        groq = ("groq", lambda: _stream_groq(groq_message))
+        if DEFAULT_PROVIDER == "groq" and not files:
+            attempts.insert(0, groq)
+        else:
+            attempts.append(groq)
+    if not attempts:
+        yield chat_with_ai(message, files)  # explains which key is missing
+        return
+
+    errors = []
+    for name, start in attempts:
+        for attempt in range(MAX_RETRIES_PER_MODEL + 1):
+            started = False
+            pieces = []
+            try:
+                for piece in start():
+                    started = True
+                    pieces.append(piece)
+                    yield piece
+                if started:
+                    if name != "groq":
+                        _breaker.record_success(name)
+                    if key is not None:
+                        _cache.put(key, "".join(pieces))
+                    return
+                errors.append(f"{name}: empty reply")
+            except urllib.error.HTTPError as e:
+                try:
+                    error_body = e.read().decode('utf-8')
+                except Exception:
+                    error_body = "Could not read error body"
+                print(f"[AI Stream] {name}: HTTP {e.code} - {error_body}")
+                retry_after = retry_after_seconds(e.headers, error_body)
+                # Like _chat_with_gemini: a 429 before the first piece waits and retries the same model
+                delay = None if started or name == "groq" else _retry_delay(e.code, attempt, retry_after)
+                if delay is not None:
+                    print(f"[AI Stream] Retrying {name} in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
+                errors.append(f"{name}: HTTP {e.code} - {error_body}")
+                if name != "groq" and e.code != 400:
+                    _breaker.record_failure(name, e.code, retry_after)
+            except Exception as e:
+                print(f"[AI Stream] {name}: {e}")
+                errors.append(f"{name}: {str(e)}")
+                if name != "groq":
+                    _breaker.record_failure(name)
+            if started:
+                yield f"\n\n[Reply interrupted: {errors[-1]}]"
+                return
+            break
+
+    yield "All AI models failed.\nDetails:\n" + "\n".join(errors)
+
+
+def _stream_gemini(model: str, parts: List[Dict[str, Any]]) -> Iterator[str]:
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+    for data in stream_events(url, {"contents": [{"parts": parts}]}):
+        chunk = json.loads(data)
+        try:
+            pieces = chunk["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError):
+            continue  # e.g. a final chunk with only finishReason / usage
+        text = "".join(p.get("text", "") for p in pieces)
+        if text:
+            yield text
+
+
+def _stream_groq(message: str) -> Iterator[str]:
+    url = "https://api.groq.com/openai/v1/chat/completions"
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are a helpful, witty, and concise assistant."},
+            {"role": "user", "content": message}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1024,
+        "stream": True
+    }
+    headers = {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+    }
+    for data in stream_events(url, payload, headers=headers):
+        if data == "[DONE]":
+            continue  # read on to the end so the connection can be reused
+        try:
+            text = json.loads(data)["choices"][0]["delta"].get("content")
+        except (KeyError, IndexError):
+            continue
+        if text:
+            yield text
@@ -1,9 +1,9 @@
 import json
 import os
-import urllib.request
-import urllib.error
 from typing import List, Dict, Any
 
+from .http_client import post_json
+
 # Configuration - Use Gemini for planning
 API_KEY = os.environ.get("GEMINI_API_KEY", "") 
 MODEL_NAME = os.environ.get("LLM_MODEL_NAME", "gemini-2.0-flash")
@@ -56,18 +56,9 @@ def generate_plan_ai(project_name: str, description: str, team_size: int = 1) ->
             }
         }
         
-        data_json = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            url, 
-            data=data_json, 
-            headers={"Content-Type": "application/json"}
-        )
-        
-        with urllib.request.urlopen(req) as response:
-            resp_body = response.read().decode("utf-8")
-            resp_data = json.loads(resp_body)
-            # Gemini response path: candidates[0].content.parts[0].text
-            content = resp_data["candidates"][0]["content"]["parts"][0]["text"]
+        resp_data = post_json(url, payload)
+        # Gemini response path: candidates[0].content.parts[0].text
+        content = resp_data["candidates"][0]["content"]["parts"][0]["text"]
 
         # Common Cleanup & Parsing
         content = content.replace("```json", "").replace("```", "").strip()
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from .analytics import CompiledPlan, critical_path_analysis, diagnose_project
+from .calendars import WorkCalendar, calendar_for
+from .models import TaskTable
+from .risk import deadline_risk, risk_summary
+from .scheduler import DependencyCycleError, IncrementalSchedule, ResourceSchedule
+from .storage import load_project, plan_version
+from .validator import PlanValidator
+
+# Projects whose schedule, validator and analysis are kept (least recently used dropped first)
+CACHE_PROJECTS = int(os.environ.get("JARVIS_ANALYSIS_CACHE_PROJECTS", "128"))
+
+# project id -> IncrementalSchedule, reused across commands while the plan's structure is unchanged
+_schedules: "OrderedDict[str, IncrementalSchedule]" = OrderedDict()
+
+# project id -> PlanValidator, re-checking only edited tasks while ids and dependencies are unchanged
+_validators: "OrderedDict[str, PlanValidator]" = OrderedDict()
+
+# project id -> analysis of the last version of the plan we saw
+_analyses: "OrderedDict[str, ProjectAnalysis]" = OrderedDict()
+
+
+def _cached(cache: OrderedDict, pid: str | None) -> Any:
+    value = cache.get(pid) if pid else None
+    if value is not None:
+        cache.move_to_end(pid)
+    return value
+
+
+def _keep(cache: OrderedDict, pid: str | None, value: Any) -> None:
+    if pid:
+        cache[pid] = value
+        cache.move_to_end(pid)
+        while len(cache) > CACHE_PROJECTS:
+            cache.popitem(last=False)
+
+
+def _plain(obj: Any) -> Any:
+    # Task / Project / TaskTable -> their JSON dict shape
+    if isinstance(obj, TaskTable):
+        return obj.to_dicts()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+def content_key(project: Dict[str, Any]) -> str:
+    """Hash of everything an analysis depends on: the tasks, the deadline, the team and the calendar."""
+    payload = json.dumps([project.get("deadline"), project.get("team"), project.get("team_size"),
+                          project.get("calendar"), project.get("tasks", [])],
+                         sort_keys=True, separators=(",", ":"), default=_plain)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def schedule_for(project: Dict[str, Any], version: Optional[int] = None) -> IncrementalSchedule:
+    """
+    Cached schedule of a project; rebuilt only when its structure changed. Raises
+    DependencyCycleError. With the plan's `version` (see storage.plan_version) a
+    schedule already patched up to it is returned as is, without re-syncing.
+    """
+    pid = project.get("id")
+    tasks = project.get("tasks", [])
+    entry = _cached(_schedules, pid)  # (schedule, plan version it reflects or None)
+    if entry is not None and version is not None and entry[1] == version and entry[0].tasks is tasks:
+        return entry[0]
+    sched = entry[0] if entry is not None else None
+    if sched is None or not sched.sync(tasks):
+        _schedules.pop(pid, None)
+        sched = IncrementalSchedule(tasks)
+    _keep(_schedules, pid, (sched, version))
+    return sched
+
+
+def validator_for(project: Dict[str, Any], version: Optional[int] = None) -> PlanValidator:
+    """Cached validator of a project; re-runs the full traversal only when ids or dependencies changed."""
+    pid = project.get("id")
+    tasks = project.get("tasks", [])
+    entry = _cached(_validators, pid)
+    if entry is not None and version is not None and entry[1] == version and entry[0].tasks is tasks:
+        return entry[0]
+    validator = entry[0] if entry is not None else None
+    if validator is None or not validator.sync(tasks):
+        validator = PlanValidator(tasks)
+    _keep(_validators, pid, (validator, version))
+    return validator
+
+
+def task_changed(project_id: str | None, task_id: str) -> None:
+    """
+    Patches a project's cached schedule and validation after one of its tasks was
+    edited in place (call it right after the edit's apply_op). If they reflected the
+    plan just before the edit, they now reflect the current version.
+    """
+    version = plan_version(project_id)
+    entry = _schedules.get(project_id)
+    if entry is not None:
+        if entry[0].task_changed(task_id) is None:
+            _schedules.pop(project_id, None)
+        else:
+            _schedules[project_id] = (entry[0], version if entry[1] == version - 1 else None)
+    entry = _validators.get(project_id)
+    if entry is not None:
+        if not entry[0].task_changed(task_id):
+            _validators.pop(project_id, None)
+        else:
+            _validators[project_id] = (entry[0], version if entry[1] == version - 1 else None)
+
+
+def forget(project_id: str | None) -> None:
+    """Drops everything cached for a project (e.g. its task list was replaced)."""
+    _schedules.pop(project_id, None)
+    _validators.pop(project_id, None)
+    _analyses.pop(project_id, None)
+
+
+class ProjectAnalysis:
+    """
+    Everything derived from one version of a project's plan: schedule, critical path,
+    slack, validation issues and status. Each part is computed on first use and then
+    kept, so status, doctor and exports within and across commands share the work.
+    """
+
+    def __init__(self, project: Dict[str, Any], key: Optional[str] = None, version: Optional[int] = None):
+        self.project = project
+        self._key = key
+        self.version = version  # storage.plan_version of a stored project, else None
+        self.tasks: List[Dict[str, Any]] = project.get("tasks", [])
+        self.calendar: WorkCalendar = calendar_for(project)
+        self._cycle: Optional[DependencyCycleError] = None
+        self._schedule: Optional[IncrementalSchedule | ResourceSchedule] = None
+        self._cpm: Optional[Dict[str, Any]] = None
+        self._compiled: Optional[CompiledPlan] = None
+        self._critical_path: Optional[List[str]] = None
+        self._issues: Optional[List[str]] = None
+        self._status: Dict[Any, Dict[str, Any]] = {}
+        self._risk: Dict[date, Optional[Dict[str, Any]]] = {}
+
+    @property
+    def key(self) -> str:
+        """Content hash of the plan (see content_key); computed on first use for stored projects."""
+        if self._key is None:
+            self._key = content_key(self.project)
+        return self._key
+
+    # --- Schedule ---
+
+    @property
+    def constrained(self) -> bool:
+        """True when the project declares a team, so headcount limits the schedule."""
+        return bool(self.project.get("team") or self.project.get("team_size"))
+
+    @property
+    def schedule(self) -> Optional[IncrementalSchedule | ResourceSchedule]:
+        """
+        The schedule, or None if the plan has a cycle (see `cycle`). Resource-constrained
+        when the project has a team / team_size, else dependency-only (and incremental).
+        """
+        if self._schedule is None and self._cycle is None:
+            try:
+                if self.constrained:
+                    self._schedule = ResourceSchedule(self.tasks, self.project.get("team"), self.project.get("team_size"))
+                else:
+                    self._schedule = schedule_for(self.project, self.version)
+            except DependencyCycleError as e:
+                # Name the same cycle as the doctor's issue, not the scheduler's own walk
+                path = validator_for(self.project, self.version).cycle
+                self._cycle = DependencyCycleError(path) if path else e
+        return self._schedule
+
+    @property
+    def cycle(self) -> Optional[DependencyCycleError]:
+        self.schedule
+        return self._cycle
+
+    def rows(self, start: date) -> List[Dict[str, Any]]:
+        """Dated schedule in task order (empty on a cycle). Shared: do not mutate."""
+        sched = self.schedule
+        return sched.rows(start, self.calendar) if sched is not None else []
+
+    def finish_date(self, start: date) -> Optional[str]:
+        sched = self.schedule
+        return sched.finish_date(start, self.calendar) if sched is not None else None
+
+    # --- Critical path ---
+
+    @property
+    def cpm(self) -> Optional[Dict[str, Any]]:
+        """critical_path_analysis() of the tasks, or None on a cycle."""
+        if self._cpm is None and self.tasks and self.cycle is None:
+            self._cpm = critical_path_analysis(self.tasks)
+        return self._cpm
+
+    @property
+    def slack(self) -> Dict[str, int]:
+        """Task id -> days of slack (first task wins for duplicate ids)."""
+        cpm = self.cpm
+        if cpm is None:
+            return {}
+        slack: Dict[str, int] = {}
+        for t, s in zip(self.tasks, cpm["slack"]):
+            slack.setdefault(t.get("id"), int(s))
+        return slack
+
+    @property
+    def critical_path(self) -> List[str]:
+        if self._critical_path is None:
+            self._critical_path = [tid for tid, s in self.slack.items() if s == 0]
+        return self._critical_path
+
+    @property
+    def compiled(self) -> Optional[CompiledPlan]:
+        """The plan's DAG compiled for batched evaluation (what-if), or None on a cycle / without NumPy."""
+        if self._compiled is None and self.cycle is None:
+            try:
+                self._compiled = CompiledPlan(self.tasks)
+            except RuntimeError:
+                return None
+        return self._compiled
+
+    def recommendations(self) -> List[str]:
+        if self.cycle is not None:
+            return [f"CRITICAL: {self.cycle}. Break the cycle before anything can be scheduled."]
+        return diagnose_project(self.project, critical_path=self.critical_path)
+
+    # --- Validation ---
+
+    @property
+    def issues(self) -> List[str]:
+        """Structural problems with the plan (the doctor's checks, see PlanValidator). Empty list means none."""
+        if self._issues is None:
+            self._issues = validator_for(self.project, self.version).issues
+        return self._issues
+
+    # --- Status ---
+
+    def status(self, today: date, risk: bool = False) -> Dict[str, Any]:
+        cached = self._status.get((today, risk))
+        if cached is None:
+            cached = self._compute_status(today)
+            summary = self.risk(today) if risk and cached["status"] != "invalid" else None
+            if summary is not None:
+                cached = {**cached, "risk": summary, "message": f"{cached['message']} {risk_summary(summary)}"}
+            self._status[(today, risk)] = cached
+        return cached
+
+    def risk(self, today: date) -> Optional[Dict[str, Any]]:
+        """Monte Carlo finish-date risk (see engine.risk), or None without tasks or NumPy."""
+        if today not in self._risk:
+            result = None
+            if self.tasks and self.cycle is None:
+                try:
+                    # Seeded by the content hash: the same plan reports the same numbers
+                    result = deadline_risk(self.tasks, today, self.project.get("deadline"),
+                                           seed=int(self.key[:8], 16), calendar=self.calendar)
+                except RuntimeError as e:
+                    print(f"[analysis] Risk mode unavailable: {e}")
+            self._risk[today] = result
+        return self._risk[today]
+
+    def _compute_status(self, today: date) -> Dict[str, Any]:
+        if self.cycle is not None:
+            return {"status": "invalid", "message": f"Can't schedule the plan. {self.cycle}.", "schedule": []}
+
+        schedule, final_end = self.rows(today), self.finish_date(today)
+        if not schedule:
+            return {"status": "unknown", "message": "No tasks yet.", "schedule": []}
+
+        deadline = self.project.get("deadline")
+
+        if not deadline:
+            return {"status": "ok", "message": f"Estimated finish: {final_end} (no deadline set).", "schedule": schedule}
+
+        if final_end <= deadline:
+            return {"status": "on-track", "message": f"On track. Estimated finish {final_end} before deadline {deadline}.", "schedule": schedule}
+
+        return {"status": "off-track", "message": f"Off track. Estimated finish {final_end} after deadline {deadline}.", "schedule": schedule}
+
+
+def analyze(project: Dict[str, Any]) -> ProjectAnalysis:
+    """
+    The shared analysis of a project's current plan, whoever asks for it. For the
+    store's own copy of a project it is reused while storage.plan_version is
+    unchanged, so an unchanged plan costs nothing and an edit only what it touches;
+    any other project dict is matched by the content hash of its plan instead.
+    """
+    pid = project.get("id")
+    cached = _cached(_analyses, pid)
+    if pid and load_project(pid) is project:
+        version = plan_version(pid)
+        if cached is not None and cached.project is project and cached.version == version:
+            return cached
+        analysis = ProjectAnalysis(project, version=version)
+    else:
+        key = content_key(project)
+        if cached is not None and cached.version is None and cached.key == key:
+            return cached
+        analysis = ProjectAnalysis(project, key)
+    _keep(_analyses, pid, analysis)
+    return analysis
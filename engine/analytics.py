@@ -1,122 +1,361 @@
 from typing import List, Dict, Any
 from datetime import date, timedelta, datetime
 
+try:
+    import numpy as np
+except ImportError:  # optional: falls back to a pure-Python pass
+    np = None
+
+from .models import TaskTable
+from .scheduler import DependencyCycleError, topological_order, task_duration
+
+# Levels at least this wide are processed as whole-array NumPy operations;
+# narrower ones (long chains) are cheaper as plain scalar steps.
+_WIDE_LEVEL = 64
+
+# Batched evaluation (CompiledPlan): tasks x columns cells per batch, bounding memory
+# to a few arrays of this size
+_BATCH_CELLS = 8_000_000
+
+
+def task_ids(tasks) -> List[str]:
+    """Ids in task order, for a list of task dicts or a TaskTable."""
+    return tasks.ids if isinstance(tasks, TaskTable) else [t.get("id") for t in tasks]
+
+
+def _task_index(tasks) -> Dict[str, int]:
+    """id -> index of the first task with that id."""
+    if isinstance(tasks, TaskTable):
+        return tasks.index
+    index: Dict[str, int] = {}
+    for i, t in enumerate(tasks):
+        index.setdefault(t.get("id"), i)
+    return index
+
+
+def _table_graph(table: TaskTable):
+    # Columns straight from the table: no per-task dict access
+    if np is None:
+        src, dst = table.edges()
+        return table.total_durations(), src, dst
+    n = len(table)
+    durations = np.frombuffer(table.durations, dtype=np.intc).astype(np.int64)
+    durations += np.frombuffer(table.delays, dtype=np.intc)
+    ptr = np.frombuffer(table.dep_ptr, dtype=np.intc)
+    idx = np.frombuffer(table.dep_idx, dtype=np.intc).astype(np.int64)
+    dst = np.repeat(np.arange(n, dtype=np.int64), np.diff(ptr))
+    known = idx >= 0
+    return durations, idx[known], dst[known]
+
+
+def _task_graph(tasks: List[Dict[str, Any]]):
+    """(durations, dependency edges as parallel src/dst index lists). Unknown deps are dropped, first duplicate id wins."""
+    if isinstance(tasks, TaskTable):
+        return _table_graph(tasks)
+    index: Dict[str, int] = {}
+    for i, t in enumerate(tasks):
+        index.setdefault(t.get("id"), i)
+    src: List[int] = []
+    dst: List[int] = []
+    lookup = index.get
+    for i, t in enumerate(tasks):
+        for d in t.get("depends_on") or ():
+            j = lookup(d)
+            if j is not None:
+                src.append(j)
+                dst.append(i)
+    durations = [task_duration(t) for t in tasks]
+    return durations, src, dst
+
+
+def _csr(n: int, rows, cols):
+    """Groups `cols` by `rows`: returns (ptr, values) with row r's values at values[ptr[r]:ptr[r + 1]]."""
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=ptr[1:])
+    return ptr, cols[np.argsort(rows, kind="stable")]
+
+
+def _gather(ptr, values, nodes):
+    """For every node, its CSR row: returns (owner of each value, values), both flat arrays."""
+    counts = ptr[nodes + 1] - ptr[nodes]
+    total = int(counts.sum())
+    offsets = np.repeat(ptr[nodes] - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.repeat(nodes, counts), values[offsets]
+
+
+def _levels(n: int, succ_ptr, succ_idx, indegree):
+    """
+    Level-synchronous Kahn: returns a list of levels, level k holding the tasks whose
+    dependencies all sit in levels < k. Wide levels are NumPy arrays and advance with
+    array operations; narrow ones (chains) are small lists stepped in plain Python.
+    Raises ValueError on a cycle.
+    """
+    indegree = indegree.copy()
+    frontier = np.flatnonzero(indegree == 0)
+    levels: List[Any] = []
+    placed = 0
+    succ_lists = None
+    pending: Dict[int, int] = {}  # narrow-mode indegrees not yet written back to the array
+    while len(frontier):
+        if len(frontier) >= _WIDE_LEVEL and not isinstance(frontier, np.ndarray):
+            frontier = np.array(frontier, dtype=np.int64)
+        levels.append(frontier)
+        placed += len(frontier)
+        if len(frontier) >= _WIDE_LEVEL:
+            if pending:
+                indegree[list(pending)] = list(pending.values())
+                pending.clear()
+            _, targets = _gather(succ_ptr, succ_idx, frontier)
+            if not targets.size:
+                break
+            targets, hits = np.unique(targets, return_counts=True)
+            indegree[targets] -= hits
+            frontier = targets[indegree[targets] == 0]
+        else:
+            if succ_lists is None:
+                succ_lists = (succ_ptr.tolist(), succ_idx.tolist())
+            ptr, idx = succ_lists
+            nxt = []
+            for v in (frontier.tolist() if isinstance(frontier, np.ndarray) else frontier):
+                for k in range(ptr[v], ptr[v + 1]):
+                    s = idx[k]
+                    left = pending.get(s)
+                    if left is None:
+                        left = int(indegree[s])
+                    left -= 1
+                    pending[s] = left
+                    if left == 0:
+                        nxt.append(s)
+            frontier = nxt
+    if placed != n:
+        raise ValueError("dependency cycle")
+    return levels
+
+
+def _segment_reduce(ufunc, ptr, idx, values, nodes, empty):
+    """For each node, `ufunc` over the rows of `values` listed in its CSR row; `empty` where it has none."""
+    counts = ptr[nodes + 1] - ptr[nodes]
+    out = np.empty((len(nodes), values.shape[1]), dtype=values.dtype)
+    out[:] = empty
+    # Slot by slot (first neighbour of every node, then the second, ...): a few
+    # whole-row operations per level, since tasks have few dependencies
+    for k in range(int(counts.max(initial=0))):
+        sel = np.flatnonzero(counts > k)
+        rows = values[idx[ptr[nodes[sel]] + k]]
+        if k == 0 and len(sel) == len(nodes):
+            out = rows
+        elif k == 0:
+            out[sel] = rows
+        else:
+            out[sel] = ufunc(out[sel], rows)
+    return out
+
+
+class CompiledPlan:
+    """
+    A task list's dependency DAG compiled once into CSR arrays and topological levels,
+    then evaluated for many duration vectors at a time (what-if scenarios, Monte Carlo
+    runs): every column of a (tasks, k) duration matrix is one independent CPM pass.
+    Needs NumPy. Raises DependencyCycleError.
+    """
+
+    def __init__(self, tasks: List[Dict[str, Any]]):
+        if np is None:
+            raise RuntimeError("CompiledPlan needs numpy (pip install numpy).")
+        self.tasks = tasks
+        self.n = len(tasks)
+        durations, src, dst = _task_graph(tasks)
+        self.index = _task_index(tasks)
+        self.durations = np.asarray(durations, dtype=np.float64)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        self.pred_ptr, self.pred_idx = _csr(self.n, dst, src)
+        self.succ_ptr, self.succ_idx = _csr(self.n, src, dst)
+        try:
+            levels = _levels(self.n, self.succ_ptr, self.succ_idx, np.diff(self.pred_ptr))
+        except ValueError:
+            topological_order(tasks)  # names the cycle
+            raise
+        self.levels = [np.asarray(nodes, dtype=np.int64) for nodes in levels]
+
+    def evaluate(self, dur):
+        """
+        CPM for every column of `dur` (shape (tasks, k)). Returns (project duration per
+        column, slack matrix of the same shape as `dur`).
+        """
+        # Forward: EF = max EF over dependencies + duration
+        ef = np.empty_like(dur)
+        for nodes in self.levels:
+            ef[nodes] = _segment_reduce(np.maximum, self.pred_ptr, self.pred_idx, ef, nodes, 0) + dur[nodes]
+        end = ef.max(axis=0) if self.n else np.zeros(dur.shape[1], dtype=dur.dtype)
+
+        # Backward: LF = min LS over dependents (project end if none); slack = LS - ES
+        ls = np.empty_like(dur)
+        for nodes in reversed(self.levels):
+            lf = _segment_reduce(np.minimum, self.succ_ptr, self.succ_idx, ls, nodes, np.inf)
+            lf = np.where(np.isinf(lf), end, lf)
+            ls[nodes] = lf - dur[nodes]
+        ef -= dur  # now ES
+        ls -= ef
+        return end, ls
+
+
+def _cpm_numpy(durations, src, dst):
+    n = len(durations)
+    dur = np.asarray(durations, dtype=np.int64)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    pred_ptr, pred_idx = _csr(n, dst, src)
+    succ_ptr, succ_idx = _csr(n, src, dst)
+    levels = _levels(n, succ_ptr, succ_idx, np.diff(pred_ptr))
+
+    narrow = sum(len(nodes) for nodes in levels if len(nodes) < _WIDE_LEVEL)
+    if narrow * 2 > n:
+        # Mostly chains: one scalar sweep over the level order beats thousands of tiny array ops
+        order = [v for nodes in levels for v in (nodes.tolist() if isinstance(nodes, np.ndarray) else nodes)]
+        return _cpm_scalar(order, dur.tolist(), pred_ptr.tolist(), pred_idx.tolist(), succ_ptr.tolist(), succ_idx.tolist())
+
+    # Forward pass: ES = max EF over dependencies, one sweep over the levels
+    es = np.zeros(n, dtype=np.int64)
+    ef = np.zeros(n, dtype=np.int64)
+    for nodes in levels:
+        if len(nodes) >= _WIDE_LEVEL:
+            owners, deps = _gather(pred_ptr, pred_idx, nodes)
+            if deps.size:
+                np.maximum.at(es, owners, ef[deps])
+            ef[nodes] = es[nodes] + dur[nodes]
+        else:
+            for v in (nodes.tolist() if isinstance(nodes, np.ndarray) else nodes):
+                deps = pred_idx[pred_ptr[v]:pred_ptr[v + 1]]
+                es[v] = ef[deps].max() if deps.size else 0
+                ef[v] = es[v] + dur[v]
+
+    project_duration = int(ef.max()) if n else 0
+
+    # Backward pass: LF = min LS over dependents (project end if none), levels in reverse
+    has_succ = np.diff(succ_ptr) > 0
+    lf = np.where(has_succ, np.iinfo(np.int64).max, project_duration)
+    ls = np.zeros(n, dtype=np.int64)
+    for nodes in reversed(levels):
+        if len(nodes) >= _WIDE_LEVEL:
+            owners, succ = _gather(succ_ptr, succ_idx, nodes)
+            if succ.size:
+                np.minimum.at(lf, owners, ls[succ])
+            ls[nodes] = lf[nodes] - dur[nodes]
+        else:
+            for v in (nodes.tolist() if isinstance(nodes, np.ndarray) else nodes):
+                succ = succ_idx[succ_ptr[v]:succ_ptr[v + 1]]
+                if succ.size:
+                    lf[v] = ls[succ].min()
+                ls[v] = lf[v] - dur[v]
+
+    return es, ef, ls, lf, project_duration
+
+
+def _cpm_scalar(order, durations, pred_ptr, pred_idx, succ_ptr, succ_idx):
+    n = len(durations)
+    es = [0] * n
+    ef = [0] * n
+    for v in order:
+        start = 0
+        for k in range(pred_ptr[v], pred_ptr[v + 1]):
+            if ef[pred_idx[k]] > start:
+                start = ef[pred_idx[k]]
+        es[v] = start
+        ef[v] = start + durations[v]
+    project_duration = max(ef, default=0)
+
+    lf = [project_duration] * n
+    ls = [0] * n
+    for v in reversed(order):
+        k0, k1 = succ_ptr[v], succ_ptr[v + 1]
+        if k1 > k0:
+            lf[v] = min(ls[succ_idx[k]] for k in range(k0, k1))
+        ls[v] = lf[v] - durations[v]
+    return (np.asarray(es, dtype=np.int64), np.asarray(ef, dtype=np.int64),
+            np.asarray(ls, dtype=np.int64), np.asarray(lf, dtype=np.int64), project_duration)
+
+
+def _cpm_python(tasks, durations, src, dst):
+    n = len(durations)
+    preds: List[List[int]] = [[] for _ in range(n)]
+    succs: List[List[int]] = [[] for _ in range(n)]
+    for a, b in zip(src, dst):
+        preds[b].append(a)
+        succs[a].append(b)
+    order = topological_order(tasks, preds)
+
+    es = [0] * n
+    ef = [0] * n
+    for v in order:
+        es[v] = max((ef[d] for d in preds[v]), default=0)
+        ef[v] = es[v] + durations[v]
+    project_duration = max(ef, default=0)
+
+    lf = [project_duration] * n
+    ls = [0] * n
+    for v in reversed(order):
+        if succs[v]:
+            lf[v] = min(ls[s] for s in succs[v])
+        ls[v] = lf[v] - durations[v]
+    return es, ef, ls, lf, project_duration
+
+
+def critical_path_analysis(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Critical path method over the dependency DAG, in days from the project start:
+    earliest/latest start and finish and slack for every task (same order as `tasks`),
+    plus the project duration. Arrays are NumPy arrays when NumPy is installed.
+    Raises DependencyCycleError.
+    """
+    durations, src, dst = _task_graph(tasks)
+    if np is not None:
+        try:
+            es, ef, ls, lf, project_duration = _cpm_numpy(durations, src, dst)
+        except ValueError:
+            # Let the scheduler find and name the cycle
+            topological_order(tasks)
+            raise
+        slack = ls - es
+    else:
+        es, ef, ls, lf, project_duration = _cpm_python(tasks, durations, src, dst)
+        slack = [b - a for a, b in zip(es, ls)]
+    return {"es": es, "ef": ef, "ls": ls, "lf": lf, "slack": slack, "duration": project_duration}
+
+
 def calculate_critical_path(tasks: List[Dict[str, Any]]) -> List[str]:
     """
-    Identifies tasks on the critical path.
-    A simple implementation: finds the path with the longest duration sequence.
-    Returns list of task IDs.
+    Identifies tasks on the critical path (zero slack).
+    Returns list of task IDs, in task order.
     """
     if not tasks:
         return []
 
-    # 1. Build graph and calculate earliest start/finish
-    # This is a simplified version assuming tasks are somewhat ordered or we just do a forward pass
-    # For a hackathon, we can use the end dates computed by the scheduler if available, 
-    # but let's do a standalone recursive search for the longest path to be robust.
-
-    # Map id -> task
-    task_map = {t["id"]: t for t in tasks}
-    
-    # Memoization for longest path to end from a given node
-    memo = {}
-
-    def get_path_duration(tid):
-        if tid in memo:
-            return memo[tid]
-        
-        t = task_map.get(tid)
-        if not t:
-            return 0
-        
-        duration = int(t.get("duration_days", 1)) + int(t.get("delay_days", 0))
-        
-        # Find max duration of dependencies
-        # This is actually reverse: we want longest path leading TO this task? 
-        # Or from this task?
-        # Standard critical path: Longest path from Start to End.
-        
-        # Let's look at it as: End Date of Task = Max(End Date of Dependencies) + Duration
-        # We can reuse the logic from engine.compute_schedule conceptually.
-        pass
-
-    # Re-using the schedule computation is easier and more accurate if we already have it.
-    # Let's assume we can compute the schedule here or pass it in.
-    # But let's write a standalone robust one.
-    
-    # 1. Compute Earliest Start (ES) and Earliest Finish (EF)
-    es = {}
-    ef = {}
-    
-    # Topological sort isn't strictly guaranteed, so we might need to iterate.
-    # But assuming DAG.
-    
-    sorted_ids = [] # TODO: implement topo sort if needed, but let's assume input is roughly sorted or we do multi-pass
-    
-    # Naive multi-pass to settle dates (handles arbitrary order)
-    for _ in range(len(tasks)):
-        for t in tasks:
-            tid = t["id"]
-            duration = int(t.get("duration_days", 1)) + int(t.get("delay_days", 0))
-            
-            my_es = 0
-            for dep_id in t.get("depends_on", []):
-                if dep_id in ef:
-                    my_es = max(my_es, ef[dep_id])
-            
-            es[tid] = my_es
-            ef[tid] = my_es + duration
-
-    project_duration = max(ef.values()) if ef else 0
-    
-    # 2. Compute Latest Start (LS) and Latest Finish (LF)
-    # LF for last tasks = project_duration
-    ls = {}
-    lf = {tid: project_duration for tid in task_map}
-
-    # Reverse pass
-    # We need to process reverse dependencies. 
-    # dependent_map: who depends on me?
-    dependent_map = {tid: [] for tid in task_map}
-    for t in tasks:
-        for dep_id in t.get("depends_on", []):
-            if dep_id in dependent_map:
-                dependent_map[dep_id].append(t["id"])
-
-    # Basic reverse pass logic (needs true reverse topo order, but repeated passes work for small N)
-    for _ in range(len(tasks)):
-        for t in tasks: # iterate all, but effective updates propagate
-            tid = t["id"]
-            duration = int(t.get("duration_days", 1)) + int(t.get("delay_days", 0))
-            
-            # My LF is min(LS of tasks that depend on me)
-            my_lf = project_duration
-            deps_on_me = dependent_map.get(tid, [])
-            if deps_on_me:
-                my_lf = min(ls.get(dtid, project_duration) for dtid in deps_on_me)
-            
-            lf[tid] = my_lf
-            ls[tid] = my_lf - duration
-            
-    # 3. Critical Path: ES == LS (Slack == 0)
+    slack = critical_path_analysis(tasks)["slack"]
     critical_path = []
-    for tid in task_map:
-        if abs(es.get(tid, -1) - ls.get(tid, -2)) < 0.01: # float tolerance just in case
+    seen = set()
+    for tid, s in zip(task_ids(tasks), slack.tolist() if np is not None else slack):
+        if s == 0 and tid not in seen:
+            seen.add(tid)
             critical_path.append(tid)
-            
     return critical_path
 
-def diagnose_project(project: Dict[str, Any]) -> List[str]:
+def diagnose_project(project: Dict[str, Any], critical_path: List[str] | None = None) -> List[str]:
     """
     Analyzes the project and returns a list of text recommendations.
+    Pass `critical_path` when it is already known (see engine.analysis) to skip recomputing it.
     """
     recommendations = []
     tasks = project.get("tasks", [])
     if not tasks:
         return ["Add some tasks to get started."]
 
-    critical_path = calculate_critical_path(tasks)
-    
+    if critical_path is None:
+        try:
+            critical_path = calculate_critical_path(tasks)
+        except DependencyCycleError as e:
+            return [f"CRITICAL: {e}. Break the cycle before anything can be scheduled."]
+
     # 1. Deadline Check
     # This requires running the schedule logic, which we can approximate or replicate
     # Let's replicate the simple schedule logic from engine.py locally to be safe
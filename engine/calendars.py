@@ -0,0 +1,152 @@
+import os
+import re
+from array import array
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Working week, Monday first: "1111100" (Mon-Fri), "mon-fri", "mon,tue,thu". The default
+# keeps every day a working day; projects can set their own (see calendar_for).
+DEFAULT_WORKWEEK = os.environ.get("JARVIS_WORKWEEK", "1111111")
+
+# Comma-separated ISO dates that are never working days, for every project
+DEFAULT_HOLIDAYS = [d.strip() for d in os.environ.get("JARVIS_HOLIDAYS", "").split(",") if d.strip()]
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_weekmask(spec: Any) -> Tuple[bool, ...]:
+    """
+    "1111100", "mon-fri", "mon,wed,fri", "weekdays", "every day" or 7 booleans
+    -> 7 booleans, Monday first. Raises ValueError.
+    """
+    if not isinstance(spec, str):
+        mask = tuple(bool(x) for x in spec)
+    else:
+        s = spec.strip().lower()
+        if s in ("weekdays", "business days", "workdays"):
+            s = "mon-fri"
+        elif s in ("every day", "everyday", "all", "all days", "daily"):
+            s = "1111111"
+        if re.fullmatch(r"[01]{7}", s):
+            mask = tuple(c == "1" for c in s)
+        else:
+            days = [False] * 7
+            for part in re.split(r"[\s,]+", s):
+                if not part:
+                    continue
+                lo, _, hi = part.partition("-")
+                try:
+                    a = WEEKDAYS.index(lo[:3])
+                    b = WEEKDAYS.index(hi[:3]) if hi else a
+                except ValueError:
+                    raise ValueError(f"Unknown weekday in working week {spec!r}") from None
+                for k in range(a, a + (b - a) % 7 + 1):
+                    days[k % 7] = True
+            mask = tuple(days)
+    if len(mask) != 7 or not any(mask):
+        raise ValueError(f"A working week needs 7 days and at least one working day, got {spec!r}")
+    return mask
+
+
+class WorkCalendar:
+    """
+    Which days are working days: a weekly mask plus holidays. The scheduler counts
+    in working-day offsets from the project start; this maps them to dates.
+
+    For each start date the calendar keeps a table of the ordinals of its working
+    days (offset k -> table[k]), built once for the longest offset asked for, so
+    dating a schedule is one array index per task instead of walking the days.
+    """
+    __slots__ = ("weekmask", "holidays", "_tables")
+
+    def __init__(self, weekmask: Any = "1111111", holidays: Iterable[Any] = ()):
+        self.weekmask = parse_weekmask(weekmask)
+        self.holidays = frozenset(
+            (h if isinstance(h, date) else date.fromisoformat(str(h))).toordinal() for h in holidays)
+        self._tables: Dict[int, array] = {}  # start ordinal -> working day ordinals
+
+    @property
+    def continuous(self) -> bool:
+        """Every day is a working day: offsets are plain day counts."""
+        return all(self.weekmask) and not self.holidays
+
+    def is_working(self, d: date) -> bool:
+        return self.weekmask[d.weekday()] and d.toordinal() not in self.holidays
+
+    def table(self, start: date, count: int) -> array:
+        """Ordinals of the first `count` (or more) working days on or after `start`."""
+        base = start.toordinal()
+        table = self._tables.get(base)
+        if table is not None and len(table) >= count:
+            return table
+        count = max(count, 2 * len(table) if table is not None else 64)
+        if self.continuous:
+            table = array("i", range(base, base + count))
+        else:
+            # Working days of one week relative to `base`, repeated week by week
+            first = start.weekday()
+            week = [k for k in range(7) if self.weekmask[(first + k) % 7]]
+            holidays = self.holidays
+            table = array("i")
+            week_start = base
+            while len(table) < count:
+                weeks = -(-(count - len(table)) // len(week))
+                table.extend(o for o in (week_start + 7 * w + k for w in range(weeks) for k in week)
+                             if o not in holidays)
+                week_start += 7 * weeks
+        if len(self._tables) >= 8:  # one per start date ever asked for; keep the recent ones
+            self._tables.clear()
+        self._tables[base] = table
+        return table
+
+    def date(self, start: date, offset: int) -> date:
+        """The working day `offset` working days after `start` (0 = first working day on/after it)."""
+        return date.fromordinal(self.table(start, offset + 1)[offset])
+
+    def offset(self, start: date, day: date) -> int:
+        """Offset of the last working day on or before `day` (-1 if there is none since `start`)."""
+        target = day.toordinal()
+        if self.continuous:
+            return max(target - start.toordinal(), -1)
+        table = self.table(start, 64)
+        while table[-1] < target:
+            table = self.table(start, 2 * len(table))
+        return bisect_right(table, target) - 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"weekmask": "".join("1" if x else "0" for x in self.weekmask),
+                "holidays": sorted(date.fromordinal(o).isoformat() for o in self.holidays)}
+
+    def __eq__(self, other: Any) -> bool:
+        return (isinstance(other, WorkCalendar)
+                and (self.weekmask, self.holidays) == (other.weekmask, other.holidays))
+
+    def __hash__(self) -> int:
+        return hash((self.weekmask, self.holidays))
+
+    def __repr__(self) -> str:
+        return f"WorkCalendar({self.to_dict()})"
+
+
+@lru_cache(maxsize=64)
+def _shared(weekmask: Tuple[bool, ...], holidays: Tuple[str, ...]) -> WorkCalendar:
+    # One instance (and one set of date tables) per distinct calendar
+    return WorkCalendar(weekmask, holidays)
+
+
+def get_calendar(weekmask: Any = None, holidays: Optional[Iterable[Any]] = None) -> WorkCalendar:
+    """Shared calendar instance; missing parts fall back to JARVIS_WORKWEEK / JARVIS_HOLIDAYS."""
+    mask = parse_weekmask(DEFAULT_WORKWEEK if weekmask is None else weekmask)
+    days = DEFAULT_HOLIDAYS if holidays is None else holidays
+    return _shared(mask, tuple(sorted({str(d) for d in days})))
+
+
+def calendar_for(project: Dict[str, Any]) -> WorkCalendar:
+    """A project's calendar: its "calendar": {"weekmask", "holidays"} over the defaults."""
+    spec = project.get("calendar") or {}
+    return get_calendar(spec.get("weekmask"), spec.get("holidays"))
+
+
+DEFAULT_CALENDAR = get_calendar()
@@ -0,0 +1,154 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Model health for the Gemini fallback chain: a model that keeps failing is
+# skipped ("open") for a cooldown instead of being re-tried on every request.
+# After the cooldown it is "half-open": the next call decides whether it is
+# healthy again (closed) or goes back to open for twice as long.
+
+# Failure rate over the last WINDOW seconds (with at least MIN_CALLS calls) that opens a model
+BREAKER_WINDOW = float(os.environ.get("JARVIS_BREAKER_WINDOW", "300"))
+BREAKER_MIN_CALLS = int(os.environ.get("JARVIS_BREAKER_MIN_CALLS", "3"))
+BREAKER_FAILURE_RATE = float(os.environ.get("JARVIS_BREAKER_FAILURE_RATE", "0.5"))
+
+# First cooldown in seconds; doubles on each failed half-open call, up to the max
+BREAKER_COOLDOWN = float(os.environ.get("JARVIS_BREAKER_COOLDOWN", "60"))
+BREAKER_MAX_COOLDOWN = float(os.environ.get("JARVIS_BREAKER_MAX_COOLDOWN", "3600"))
+
+# A 404 (model retired or not available to this key) won't fix itself soon
+NOT_FOUND_COOLDOWN = BREAKER_MAX_COOLDOWN
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+# Gemini puts the wait in the error body: "retryDelay": "37s"
+_RETRY_DELAY = re.compile(r'"retryDelay"\s*:\s*"(\d+(?:\.\d+)?)s"')
+
+
+def retry_after_seconds(headers: Any = None, body: str = "") -> Optional[float]:
+    """Seconds the server asked us to wait: Retry-After (seconds or HTTP date), or Gemini's retryDelay."""
+    value = headers.get("Retry-After") if headers is not None else None
+    if value:
+        value = value.strip()
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    match = _RETRY_DELAY.search(body or "")
+    return float(match.group(1)) if match else None
+
+
+class _Health:
+    __slots__ = ("calls", "open_until", "cooldown")
+
+    def __init__(self):
+        self.calls: Deque[Tuple[float, bool]] = deque()  # (time, ok) within the window
+        self.open_until: Optional[float] = None  # set while open or half-open
+        self.cooldown = 0.0  # of the last opening
+
+
+class CircuitBreaker:
+    """Per-model circuit breakers. Thread-safe; `clock` is injectable for tests."""
+
+    def __init__(self, window: float = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS,
+                 failure_rate: float = BREAKER_FAILURE_RATE, cooldown: float = BREAKER_COOLDOWN,
+                 max_cooldown: float = BREAKER_MAX_COOLDOWN, clock=time.monotonic):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self._models: Dict[str, _Health] = {}
+        self._lock = threading.Lock()
+
+    def _health(self, name: str) -> _Health:
+        h = self._models.get(name)
+        if h is None:
+            h = self._models[name] = _Health()
+        return h
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            h = self._models.get(name)
+            if h is None or h.open_until is None:
+                return CLOSED
+            return OPEN if self.clock() < h.open_until else HALF_OPEN
+
+    def order(self, names: List[str]) -> List[str]:
+        """
+        The models worth trying, in the given order, without the open ones. If every
+        model is open, the one that reopens first, so a request still gets one try.
+        """
+        now = self.clock()
+        with self._lock:
+            usable = [n for n in names if self._usable(n, now)]
+            if usable or not names:
+                return usable
+            return [min(names, key=lambda n: self._models[n].open_until)]
+
+    def _usable(self, name: str, now: float) -> bool:
+        h = self._models.get(name)
+        return h is None or h.open_until is None or now >= h.open_until
+
+    def record_success(self, name: str) -> None:
+        with self._lock:
+            h = self._health(name)
+            if h.open_until is not None:
+                # Half-open call went through: healthy again, start counting afresh
+                h.calls.clear()
+                h.open_until = None
+                h.cooldown = 0.0
+            self._add(h, True)
+
+    def record_failure(self, name: str, status: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """
+        One failed call. A 429 with a known wait, or a 404, opens the model right
+        away; otherwise it opens once the failure rate over the window is too high.
+        A failure while half-open opens it again for twice the last cooldown.
+        """
+        with self._lock:
+            now = self.clock()
+            h = self._health(name)
+            self._add(h, False)
+            if h.open_until is not None and now >= h.open_until:
+                self._open(h, now, min(max(h.cooldown * 2, self.cooldown), self.max_cooldown), retry_after)
+            elif status == 404:
+                self._open(h, now, NOT_FOUND_COOLDOWN, None)
+            elif status == 429 and retry_after is not None:
+                self._open(h, now, self.cooldown, retry_after)
+            elif h.open_until is None and len(h.calls) >= self.min_calls:
+                failures = sum(1 for _, ok in h.calls if not ok)
+                if failures / len(h.calls) >= self.failure_rate:
+                    self._open(h, now, self.cooldown, retry_after)
+
+    def _add(self, h: _Health, ok: bool) -> None:
+        now = self.clock()
+        h.calls.append((now, ok))
+        while h.calls and now - h.calls[0][0] > self.window:
+            h.calls.popleft()
+
+    def _open(self, h: _Health, now: float, cooldown: float, retry_after: Optional[float]) -> None:
+        # The server's own estimate wins when it gives one
+        h.cooldown = cooldown if retry_after is None else retry_after
+        h.open_until = now + h.cooldown
+
+    @property
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State, failures in the window and seconds until reopening, per model."""
+        now = self.clock()
+        out = {}
+        with self._lock:
+            for name, h in self._models.items():
+                state = CLOSED if h.open_until is None else (OPEN if now < h.open_until else HALF_OPEN)
+                out[name] = {"state": state, "calls": len(h.calls),
+                             "failures": sum(1 for _, ok in h.calls if not ok),
+                             "reopens_in": max(h.open_until - now, 0.0) if h.open_until else 0.0}
+        return out
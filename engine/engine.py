@@ -1,16 +1,56 @@
 ﻿import uuid
 from datetime import date, timedelta
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
-from .storage import load_data, save_data
+from .storage import (
+    get_active_project_id, load_project,
+    add_project, set_active_project_id, replace_tasks, update_task, update_project,
+)
+from .analysis import ProjectAnalysis, analyze, content_key, forget, task_changed
+from .history import HISTORY_ENABLED, TaskHistory, as_of, history_for
+from .calendars import parse_weekmask, WorkCalendar
+from .whatif import evaluate_scenarios
 
 
 def _today_iso() -> str:
     return date.today().isoformat()
 
 
+def _history(project_id: str | None, tasks: Optional[List[Dict[str, Any]]] = None) -> Optional[TaskHistory]:
+    """
+    The history of a project that is about to change. A new one is started from
+    `tasks`, or the project's current tasks (the only case that loads the project).
+    """
+    if not HISTORY_ENABLED or not project_id:
+        return None
+    history = history_for(project_id)
+    try:
+        if not history.started:
+            if tasks is None:
+                project = load_project(project_id)
+                tasks = project.get("tasks", []) if project else []
+            history.start(tasks)
+    except OSError as e:
+        print(f"[engine] Task history unavailable: {e}")
+        return None
+    return history
+
+
+def _record(history: Optional[TaskHistory], tasks: List[Dict[str, Any]], replaced: bool = False) -> None:
+    if history is None:
+        return
+    try:
+        history.record(tasks, replaced=replaced)
+    except OSError as e:
+        print(f"[engine] Could not record task history: {e}")
+
+
+def _task_changed(task_id: str) -> None:
+    """Patches the active project's cached schedule after one of its tasks was edited in place."""
+    task_changed(get_active_project_id(), task_id)
+
+
 def create_project(name: str, deadline_iso: str | None = None, description: str = "") -> Dict[str, Any]:
-    data = load_data()
     pid = str(uuid.uuid4())[:8]
     project = {
         "id": pid,
@@ -20,29 +60,17 @@ def create_project(name: str, deadline_iso: str | None = None, description: str
         "created_at": _today_iso(),
         "tasks": []
     }
-    data["projects"].append(project)
-    data["active_project_id"] = pid
-    save_data(data)
+    add_project(project)
+    _history(pid, tasks=[])  # starts empty, so "as of" works from day one
     return project
 
 
 def get_active_project() -> Dict[str, Any] | None:
-    data = load_data()
-    pid = data.get("active_project_id")
-    for p in data.get("projects", []):
-        if p.get("id") == pid:
-            return p
-    return None
+    return load_project(get_active_project_id())
 
 
 def set_active_project(project_id: str) -> Dict[str, Any] | None:
-    data = load_data()
-    for p in data.get("projects", []):
-        if p.get("id") == project_id:
-            data["active_project_id"] = project_id
-            save_data(data)
-            return p
-    return None
+    return set_active_project_id(project_id)
 
 
 def generate_plan(project: Dict[str, Any], use_ai: bool = True, team_size: int = 1) -> List[Dict[str, Any]]:
@@ -83,124 +111,147 @@ def generate_plan_basic(project: Dict[str, Any]) -> List[Dict[str, Any]]:
     ]
 
 
+def set_team(project_id: str | None, team_size: int | None = None,
+             team: Dict[str, int] | None = None) -> Dict[str, Any] | None:
+    """
+    Records who works on the project: team_size people in total and/or a headcount
+    per role ({"frontend": 2, "backend": 1}). From then on the schedule respects them.
+    """
+    changes: Dict[str, Any] = {}
+    if team_size is not None:
+        changes["team_size"] = int(team_size)
+    if team is not None:
+        changes["team"] = {role: int(n) for role, n in team.items()}
+    return update_project(project_id, changes)
+
+
+def set_calendar(project_id: str | None, weekmask: Any = None,
+                 add_holidays: List[str] | None = None) -> Dict[str, Any] | None:
+    """
+    Sets the project's working week ("mon-fri", "1111100", ...) and/or adds holidays
+    (ISO dates). Durations then count working days only. Raises ValueError on bad input.
+    """
+    project = load_project(project_id)
+    if project is None:
+        return None
+    calendar = dict(project.get("calendar") or {})
+    if weekmask is not None:
+        calendar["weekmask"] = "".join("1" if x else "0" for x in parse_weekmask(weekmask))
+    if add_holidays:
+        calendar["holidays"] = sorted(set(calendar.get("holidays", [])) | set(add_holidays))
+    WorkCalendar(calendar.get("weekmask", "1111111"), calendar.get("holidays", ()))  # validates
+    return update_project(project.get("id"), {"calendar": calendar})
+
+
 def save_tasks(project_id: str, tasks: List[Dict[str, Any]]) -> Dict[str, Any] | None:
-    data = load_data()
-    for p in data.get("projects", []):
-        if p.get("id") == project_id:
-            p["tasks"] = tasks
-            save_data(data)
-            return p
-    return None
+    forget(project_id)
+    history = _history(project_id)
+    project = replace_tasks(project_id, tasks)
+    if project is not None:
+        _record(history, tasks, replaced=True)
+    return project
 
 
 def mark_task_done(task_id: str) -> Tuple[bool, str]:
-    data = load_data()
-    pid = data.get("active_project_id")
-    for p in data.get("projects", []):
-        if p.get("id") == pid:
-            for t in p.get("tasks", []):
-                if t.get("id") == task_id:
-                    t["status"] = "done"
-                    save_data(data)
-                    return True, f"Marked {task_id} as done."
+    # project_id=None -> the active project
+    history = _history(get_active_project_id())
+    task = update_task(None, task_id, changes={"status": "done"})
+    if task is not None:
+        _task_changed(task_id)
+        _record(history, [task])
+        return True, f"Marked {task_id} as done."
     return False, "Task not found."
 
 
 def delay_task(task_id: str, days: int) -> Tuple[bool, str]:
-    data = load_data()
-    pid = data.get("active_project_id")
-    for p in data.get("projects", []):
-        if p.get("id") == pid:
-            for t in p.get("tasks", []):
-                if t.get("id") == task_id:
-                    t["delay_days"] = int(t.get("delay_days", 0)) + int(days)
-                    save_data(data)
-                    return True, f"Delayed {task_id} by {days} day(s)."
+    history = _history(get_active_project_id())
+    task = update_task(None, task_id, increments={"delay_days": int(days)})
+    if task is not None:
+        # Only the delayed task's downstream cone gets recomputed
+        _task_changed(task_id)
+        _record(history, [task])
+        return True, f"Delayed {task_id} by {days} day(s)."
     return False, "Task not found."
 
 
 def compute_schedule(project: Dict[str, Any]) -> List[Dict[str, Any]]:
-    # Simple dependency scheduling: assumes task list already topologically ordered
-    start = date.today()
-    schedule: List[Dict[str, Any]] = []
-    end_dates: Dict[str, date] = {}
-
-    for t in project.get("tasks", []):
-        deps = t.get("depends_on", [])
-        base_start = start
+    """
+    Start/end dates for every task (returned in the project's task order).
+    Tasks may be listed in any order; raises DependencyCycleError on a cycle.
+    The list is cached and shared between calls: do not mutate it.
+    """
+    analysis = analyze(project)
+    if analysis.cycle is not None:
+        raise analysis.cycle
+    return analysis.rows(date.today())
 
-        for d in deps:
-            if d in end_dates:
-                base_start = max(base_start, end_dates[d] + timedelta(days=1))
 
-        duration = int(t.get("duration_days", 1)) + int(t.get("delay_days", 0))
-        task_start = base_start
-        task_end = task_start + timedelta(days=max(duration - 1, 0))
+def get_status(project: Dict[str, Any], risk: bool = False) -> Dict[str, Any]:
+    """
+    Deterministic finish vs deadline. With risk=True also runs the Monte Carlo
+    simulation and adds its P50/P90 finish and on-time probability ("risk" key).
+    Memoized per plan version and day: repeated status/doctor/export calls are free.
+    """
+    return analyze(project).status(date.today(), risk=risk)
 
-        end_dates[t["id"]] = task_end
-        schedule.append({**t, "start": task_start.isoformat(), "end": task_end.isoformat()})
 
-    return schedule
+def what_if(project: Dict[str, Any], scenarios: List[Any]) -> Dict[str, Any]:
+    """
+    Finish date and critical path of each hypothetical scenario (lists of delay /
+    shorten / drop edits, see engine.whatif), evaluated together without saving anything.
+    Finish dates respect the project's team, like get_status. Raises DependencyCycleError.
+    """
+    analysis = analyze(project)
+    if analysis.cycle is not None:
+        raise analysis.cycle
+    return evaluate_scenarios(analysis.tasks, scenarios, date.today(), plan=analysis.compiled,
+                              calendar=analysis.calendar, team=project.get("team"),
+                              team_size=project.get("team_size"))
 
 
-def get_status(project: Dict[str, Any]) -> Dict[str, Any]:
-    schedule = compute_schedule(project)
-    if not schedule:
-        return {"status": "unknown", "message": "No tasks yet.", "schedule": []}
+def status_as_of(project: Dict[str, Any], day: date) -> Dict[str, Any]:
+    """
+    The status the project had at the end of `day`, rebuilt from its task history
+    (nearest snapshot plus the events after it) and scheduled from that day.
+    """
+    tasks = as_of(project.get("id"), day)
+    if tasks is None:
+        return {"status": "unknown", "message": f"No history for this project on {day.isoformat()}.", "schedule": []}
+    past = {**project, "tasks": tasks}
+    # Not through analyze(): that would replace the cached analysis of the current plan
+    status = ProjectAnalysis(past, content_key(past)).status(day)
+    return {**status, "message": f"As of {day.isoformat()}: {status['message']}"}
 
-    final_end = schedule[-1]["end"]
-    deadline = project.get("deadline")
 
-    if not deadline:
-        return {"status": "ok", "message": f"Estimated finish: {final_end} (no deadline set).", "schedule": schedule}
+def burndown(project: Dict[str, Any], days: int = 14, today: date | None = None) -> Dict[str, Any]:
+    """
+    Daily burndown over the last `days` days from the task history: remaining days of
+    work and tasks done at the end of each day, and the velocity (days of work
+    completed per day on average).
+    """
+    today = today or date.today()
+    series = history_for(project.get("id")).series(today - timedelta(days=days - 1), today)
+    velocity = sum(r["completed_days"] for r in series) / len(series) if series else 0.0
+    return {"series": series, "velocity": round(velocity, 2)}
 
-    if final_end <= deadline:
-        return {"status": "on-track", "message": f"On track. Estimated finish {final_end} before deadline {deadline}.", "schedule": schedule}
 
-    return {"status": "off-track", "message": f"Off track. Estimated finish {final_end} after deadline {deadline}.", "schedule": schedule}
 def get_project_diagnosis(project_id: str) -> List[str]:
     """
     Simple 'doctor' diagnostics for a project.
     Returns a list of issues/warnings. Empty list means healthy.
     """
-    data = load_data()
-    project = None
-    for p in data.get("projects", []):
-        if p.get("id") == project_id:
-            project = p
-            break
-
+    project = load_project(project_id)
     if not project:
         return ["Project not found."]
 
-    issues: List[str] = []
-    tasks = project.get("tasks", [])
-
-    if not tasks:
-        issues.append("No tasks generated yet. Say 'Generate plan' to create tasks.")
+    analysis = analyze(project)
+    issues = list(analysis.issues)
+    if not analysis.tasks:
         return issues
 
-    # Check duplicate task IDs
-    ids = [t.get("id") for t in tasks if t.get("id")]
-    if len(ids) != len(set(ids)):
-        issues.append("Duplicate task IDs found (some tasks share the same id).")
-
-    # Check missing dependencies
-    id_set = set(ids)
-    for t in tasks:
-        for dep in t.get("depends_on", []) or []:
-            if dep not in id_set:
-                issues.append(f"Task {t.get('id')} depends on missing task '{dep}'.")
-
-    # Check tasks missing required fields
-    for t in tasks:
-        if not t.get("name"):
-            issues.append(f"Task {t.get('id')} is missing a name.")
-        if "duration_days" not in t:
-            issues.append(f"Task {t.get('id')} is missing duration_days.")
-
-    # Check deadline feasibility
-    status = get_status(project)
+    # Check deadline feasibility (a plan that can't be scheduled at all is a cycle,
+    # which the validator has already reported with its path)
+    status = analysis.status(date.today())
     if status.get("status") == "off-track":
         issues.append(status.get("message", "Project is off track."))
 
@@ -0,0 +1,280 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from datetime import time as day_time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import to_json
+from .scheduler import task_duration
+from .storage import DATA_PATH, _file_signature, file_lock
+
+# Task history: every change to a task becomes one event line in
+# data/history/<project id>/events.jsonl:
+#   {"seq": 12, "ts": 1760781234.5, "t": "t3", "f": "delay_days", "o": 1, "n": 3}
+# "f": "*" adds ("n": task) or removes ("n": null) a whole task. Every SNAPSHOT_EVERY
+# events the full task state goes to snapshots.jsonl, with one
+# [ts, seq, snapshot offset, events offset] line in snapshots.idx, so a past state
+# is the nearest snapshot plus a short tail of events.
+HISTORY_DIR = DATA_PATH.parent / "history"
+
+# Set JARVIS_HISTORY=0 to stop recording
+HISTORY_ENABLED = os.environ.get("JARVIS_HISTORY", "1") != "0"
+
+SNAPSHOT_EVERY = int(os.environ.get("JARVIS_HISTORY_SNAPSHOT_EVERY", "200"))
+
+
+def _end_of(day: date) -> float:
+    """Timestamp of the last moment of `day` (local time)."""
+    return datetime.combine(day, day_time.max).timestamp()
+
+
+def _apply_event(tasks: Dict[str, Dict[str, Any]], e: Dict[str, Any]) -> None:
+    tid, field = e["t"], e["f"]
+    if field == "*":
+        if e.get("n") is None:
+            tasks.pop(tid, None)
+        else:
+            tasks[tid] = dict(e["n"])
+    elif tid in tasks:
+        if e.get("n") is None:
+            tasks[tid].pop(field, None)
+        else:
+            tasks[tid][field] = e["n"]
+
+
+def _remaining(task: Optional[Dict[str, Any]]) -> int:
+    """Days of work a task still represents (0 once done)."""
+    if task is None or task.get("status") == "done":
+        return 0
+    return task_duration(task)
+
+
+class TaskHistory:
+    """
+    Event log of one project's tasks. Appends are serialized across processes by
+    file_lock(); each instance reads only the tail other processes added since.
+    """
+
+    def __init__(self, directory: Path, snapshot_every: int = SNAPSHOT_EVERY):
+        self.dir = Path(directory)
+        self.events_path = self.dir / "events.jsonl"
+        self.snapshots_path = self.dir / "snapshots.jsonl"
+        self.index_path = self.dir / "snapshots.idx"
+        self.snapshot_every = snapshot_every
+
+        self._lock = threading.RLock()
+        self._tasks: Dict[str, Dict[str, Any]] = {}  # current state, in task order
+        self._seq = 0
+        self._offset = 0           # bytes of events.jsonl already applied
+        self._since_snapshot = 0
+        self._index: List[list] = []
+        self._index_sig = None
+        self._loaded = False
+
+    @property
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    @property
+    def started(self) -> bool:
+        """Like exists, but without touching the disk once this process has read or started it."""
+        return self._loaded or self.exists
+
+    # --- Reading ---
+
+    def _load_index(self) -> List[list]:
+        sig = _file_signature(self.index_path)
+        if sig != self._index_sig:
+            self._index = []
+            if sig is not None:
+                with open(self.index_path, "rb") as f:
+                    self._index = [json.loads(line) for line in f if line.endswith(b"\n")]
+            self._index_sig = sig
+        return self._index
+
+    def _snapshot(self, entry: list) -> Dict[str, Dict[str, Any]]:
+        with open(self.snapshots_path, "rb") as f:
+            f.seek(entry[2])
+            return {t["id"]: t for t in json.loads(f.readline())["tasks"]}
+
+    def _events(self, offset: int) -> Iterable[Dict[str, Any]]:
+        """Complete event lines from byte `offset` on."""
+        if not self.events_path.exists():
+            return
+        with open(self.events_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                yield json.loads(line)
+
+    def _refresh(self) -> None:
+        """Brings the current state up to date with what other processes appended."""
+        if not self._load_index():
+            return
+        if not self._loaded:
+            last = self._index[-1]
+            self._tasks, self._seq, self._offset = self._snapshot(last), last[1], last[3]
+            self._loaded = True
+        size = (_file_signature(self.events_path) or (0, 0, 0))[1]
+        if size <= self._offset:
+            return
+        with open(self.events_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                e = json.loads(line)
+                if e["seq"] > self._seq:
+                    _apply_event(self._tasks, e)
+                    self._seq = e["seq"]
+                    self._since_snapshot += 1
+
+    def state_at(self, ts: float) -> Optional[List[Dict[str, Any]]]:
+        """The tasks as they were at time `ts`, or None if the history starts later."""
+        with self._lock:
+            index = self._load_index()
+            k = bisect_right([entry[0] for entry in index], ts) - 1
+            if k < 0:
+                return None
+            tasks = self._snapshot(index[k])
+            for e in self._events(index[k][3]):
+                if e["ts"] > ts:
+                    break
+                _apply_event(tasks, e)
+            return list(tasks.values())
+
+    def series(self, first: date, last: date) -> List[Dict[str, Any]]:
+        """
+        Burndown: per day from `first` to `last`, the tasks at the end of that day,
+        how many were done and the days of work remaining, plus "completed_days":
+        work finished that day (the velocity). One pass from the nearest snapshot.
+        """
+        with self._lock:
+            index = self._load_index()
+            if not index or last < first:
+                return []
+            k = max(bisect_right([entry[0] for entry in index], _end_of(first - timedelta(days=1))) - 1, 0)
+            tasks = self._snapshot(index[k])
+            remaining = sum(_remaining(t) for t in tasks.values())
+            done = sum(1 for t in tasks.values() if t.get("status") == "done")
+
+            events = iter(self._events(index[k][3]))
+            pending = next(events, None)
+            rows = []
+            day = first
+            while day <= last:
+                cutoff = _end_of(day)
+                completed = 0
+                while pending is not None and pending["ts"] <= cutoff:
+                    tid = pending["t"]
+                    before = tasks.get(tid)
+                    was_done = before is not None and before.get("status") == "done"
+                    rem_before = _remaining(before)
+                    _apply_event(tasks, pending)
+                    after = tasks.get(tid)
+                    is_done = after is not None and after.get("status") == "done"
+                    remaining += _remaining(after) - rem_before
+                    done += int(is_done) - int(was_done)
+                    if is_done and not was_done and pending["ts"] > _end_of(first - timedelta(days=1)):
+                        completed += task_duration(after)
+                    pending = next(events, None)
+                if cutoff >= index[0][0]:  # nothing to report before the history starts
+                    rows.append({"date": day.isoformat(), "tasks": len(tasks), "done": done,
+                                 "remaining_days": remaining, "completed_days": completed})
+                day += timedelta(days=1)
+            return rows
+
+    # --- Writing ---
+
+    def start(self, tasks: List[Dict[str, Any]], ts: Optional[float] = None) -> None:
+        """Begins the history with a snapshot of `tasks` (no-op if it already exists)."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.dir / "events"), self._lock:
+            if self.exists:
+                return
+            self._tasks = {t.get("id"): t for t in json.loads(json.dumps(list(tasks), default=to_json))}
+            self._seq = self._offset = 0
+            self._write_snapshot(time.time() if ts is None else ts)
+            self._loaded = True
+
+    def record(self, tasks: List[Dict[str, Any]], replaced: bool = False,
+               ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Diffs `tasks` (their state after a change) against the history and appends
+        one event per changed field. replaced=True means `tasks` is the whole new
+        list: tasks missing from it are recorded as removed. Returns the events.
+        """
+        ts = time.time() if ts is None else ts
+        tasks = json.loads(json.dumps(list(tasks), default=to_json))  # detached from the live document
+        with file_lock(self.dir / "events"), self._lock:
+            self._refresh()
+            events: List[Dict[str, Any]] = []
+
+            def add(tid, field, old, new):
+                events.append({"seq": self._seq + len(events) + 1, "ts": ts, "t": tid, "f": field, "o": old, "n": new})
+
+            seen = set()
+            for t in tasks:
+                tid = t.get("id")
+                seen.add(tid)
+                old = self._tasks.get(tid)
+                if old is None:
+                    add(tid, "*", None, dict(t))
+                    continue
+                for field, value in t.items():
+                    if old.get(field) != value:
+                        add(tid, field, old.get(field), value)
+                for field in old.keys() - t.keys():
+                    add(tid, field, old[field], None)
+            if replaced:
+                for tid in [tid for tid in self._tasks if tid not in seen]:
+                    add(tid, "*", self._tasks[tid], None)
+            if not events:
+                return events
+
+            with open(self.events_path, "ab") as f:
+                if f.tell() != self._offset:
+                    f.truncate(self._offset)  # torn line from a crashed writer
+                f.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.tell()
+            for e in events:
+                _apply_event(self._tasks, e)
+            self._seq += len(events)
+            self._since_snapshot += len(events)
+            if self._since_snapshot >= self.snapshot_every:
+                self._write_snapshot(ts)
+            return events
+
+    def _write_snapshot(self, ts: float) -> None:
+        line = json.dumps({"seq": self._seq, "ts": ts, "tasks": list(self._tasks.values())},
+                          separators=(",", ":")) + "\n"
+        with open(self.snapshots_path, "ab") as f:
+            position = f.tell()
+            f.write(line.encode("utf-8"))
+        with open(self.index_path, "ab") as f:
+            f.write((json.dumps([ts, self._seq, position, self._offset]) + "\n").encode("utf-8"))
+        self._since_snapshot = 0
+
+
+_histories: Dict[str, TaskHistory] = {}
+
+
+def history_for(project_id: str, root: Path = HISTORY_DIR) -> TaskHistory:
+    key = str(Path(root) / str(project_id))
+    h = _histories.get(key)
+    if h is None:
+        h = _histories[key] = TaskHistory(Path(key))
+    return h
+
+
+def as_of(project_id: str, day: date) -> Optional[List[Dict[str, Any]]]:
+    """A project's tasks at the end of `day`, or None if its history starts later."""
+    return history_for(project_id).state_at(_end_of(day))
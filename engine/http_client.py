@@ -0,0 +1,186 @@
+import http.client
+import io
+import json
+import os
+import threading
+import time
+import urllib.error
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Keep-alive connections to the LLM providers. One pool of idle connections per
+# (scheme, host, port), shared by every thread: a chat turn or a fallback-model
+# attempt reuses an open TLS connection instead of paying DNS + TCP + TLS again.
+
+# Seconds to establish a connection, and to wait for each read once connected
+CONNECT_TIMEOUT = float(os.environ.get("JARVIS_HTTP_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.environ.get("JARVIS_HTTP_READ_TIMEOUT", "120"))
+
+# Idle connections kept per host, and how long one may sit unused before it is
+# dropped (providers close idle connections on their side after a while)
+MAX_IDLE = int(os.environ.get("JARVIS_HTTP_MAX_IDLE", "4"))
+IDLE_SECONDS = float(os.environ.get("JARVIS_HTTP_IDLE_SECONDS", "60"))
+
+# Errors that mean a reused connection had been closed by the server
+_STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError,
+          BrokenPipeError, ConnectionAbortedError)
+
+_Key = Tuple[str, str, int]
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per host. Thread-safe; connections are used by one thread at a time."""
+
+    def __init__(self, max_idle: int = MAX_IDLE, idle_seconds: float = IDLE_SECONDS):
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self._idle: Dict[_Key, List[Tuple[float, http.client.HTTPConnection]]] = {}
+        self._lock = threading.Lock()
+        self.opened = 0  # connections created, for tests and stats
+
+    def acquire(self, key: _Key, connect_timeout: float, read_timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """(connection, reused). New connections are connected here, so the connect timeout applies."""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                last_used, conn = idle.pop()
+                if now - last_used < self.idle_seconds and conn.sock is not None:
+                    conn.sock.settimeout(read_timeout)
+                    return conn, True
+                conn.close()
+            self.opened += 1
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = cls(host, port, timeout=connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(read_timeout)
+        return conn, False
+
+    def release(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if conn.sock is not None and len(idle) < self.max_idle:
+                idle.append((time.monotonic(), conn))
+                return
+        conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for _, conn in conns:
+                conn.close()
+
+
+_pool = ConnectionPool()
+
+
+def _split(url: str) -> Tuple[_Key, str]:
+    parts = urlsplit(url)
+    scheme = parts.scheme or "https"
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return (scheme, parts.hostname, port), path
+
+
+def _open(method: str, url: str, body: Optional[bytes], headers: Optional[Dict[str, str]],
+          connect_timeout: Optional[float], read_timeout: Optional[float]):
+    """Sends a request over a pooled connection: (pool key, connection, response with the body unread)."""
+    key, path = _split(url)
+    connect_timeout = CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+    read_timeout = READ_TIMEOUT if read_timeout is None else read_timeout
+    headers = dict(headers or {})
+    headers.setdefault("Connection", "keep-alive")
+
+    for attempt in range(2):
+        conn, reused = _pool.acquire(key, connect_timeout, read_timeout)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            return key, conn, conn.getresponse()
+        except _STALE:
+            conn.close()
+            if reused and attempt == 0:
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+    raise AssertionError("unreachable")
+
+
+def _finish(key: _Key, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+    """Returns a connection whose response was read to the end to the pool."""
+    if resp.will_close:
+        conn.close()
+    else:
+        _pool.release(key, conn)
+
+
+def request(method: str, url: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None,
+            connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None) -> bytes:
+    """
+    Sends one request over a pooled connection and returns the response body.
+    Non-2xx responses raise urllib.error.HTTPError (with the body readable), so
+    callers handle errors exactly as they did with urllib.request.urlopen. A
+    reused connection the server had already closed is retried once on a new one.
+    """
+    key, conn, resp = _open(method, url, body, headers, connect_timeout, read_timeout)
+    try:
+        data = resp.read()
+    except BaseException:
+        conn.close()
+        raise
+    _finish(key, conn, resp)
+    if not 200 <= resp.status < 300:
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+    return data
+
+
+def post_json(url: str, payload: Any, headers: Optional[Dict[str, str]] = None, **timeouts) -> Any:
+    """POSTs `payload` as JSON and returns the decoded JSON reply."""
+    merged = {"Content-Type": "application/json"}
+    merged.update(headers or {})
+    data = request("POST", url, json.dumps(payload).encode("utf-8"), merged, **timeouts)
+    return json.loads(data.decode("utf-8"))
+
+
+def stream_events(url: str, payload: Any, headers: Optional[Dict[str, str]] = None, **timeouts) -> Iterator[str]:
+    """
+    POSTs `payload` as JSON to a server-sent-events endpoint and yields the data of
+    each event as soon as it arrives. The connection goes back to the pool once the
+    stream is read to the end; one abandoned midway is closed.
+    """
+    merged = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+    merged.update(headers or {})
+    key, conn, resp = _open("POST", url, json.dumps(payload).encode("utf-8"), merged,
+                            timeouts.get("connect_timeout"), timeouts.get("read_timeout"))
+    if not 200 <= resp.status < 300:
+        try:
+            data = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        _finish(key, conn, resp)
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+    try:
+        lines: List[str] = []
+        while True:
+            raw = resp.readline()
+            if not raw:
+                break
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line:
+                if line.startswith("data:"):
+                    lines.append(line[5:].lstrip(" "))
+            elif lines:
+                yield "\n".join(lines)
+                lines = []
+        if lines:
+            yield "\n".join(lines)
+    except BaseException:
+        conn.close()
+        raise
+    _finish(key, conn, resp)
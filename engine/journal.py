@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import to_json
+from .storage import (
+    GROUP_COMMIT_WINDOW, GroupCommit, atomic_write_text, file_lock,
+    Document, _file_signature, _find_project, _read_json, apply_op, with_models,
+)
+
+# Fold the journal back into the snapshot after this many appended changes
+COMPACT_EVERY = int(os.environ.get("JARVIS_JOURNAL_COMPACT_EVERY", "500"))
+
+
+class JournalStore:
+    """
+    Write-ahead journal storage.
+
+    The snapshot is the usual data/projects.json (plus a "journal_seq" marker),
+    every change is appended as one JSON line to data/projects.journal, and the
+    live document is snapshot + replayed journal. A change therefore costs one
+    small append instead of a full rewrite; compaction runs on a background thread.
+    Appends are fsynced under file_lock(), and concurrent commits share one append.
+    """
+
+    def __init__(self, path: Path, compact_every: int = COMPACT_EVERY, window: float = GROUP_COMMIT_WINDOW):
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal")
+        self.compact_every = compact_every
+
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._seq = 0            # last sequence number applied to _data
+        self._offset = 0         # bytes of the journal already replayed
+        self._snapshot_sig = None
+        self._since_snapshot = 0
+        self._compacting = False
+        self._group = GroupCommit(self._flush_ops, window)
+
+    # --- Loading ---
+
+    def _reload(self) -> None:
+        self._snapshot_sig = _file_signature(self.path)
+        data = with_models(_read_json(self.path))
+        self._seq = int(data.pop("journal_seq", 0) or 0)
+        self._data = data
+        self._offset = 0
+        self._since_snapshot = 0
+
+    def _refresh(self) -> None:
+        """Brings _data up to date, reading only the journal tail we have not seen yet."""
+        journal_size = (_file_signature(self.journal_path) or (0, 0, 0))[1]
+        if (self._data is None
+                or _file_signature(self.path) != self._snapshot_sig
+                or journal_size < self._offset):
+            # First load, or another process compacted under us
+            self._reload()
+
+        if journal_size == self._offset:
+            return
+
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn/in-progress append, pick it up next time
+                self._offset += len(line)
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("seq", 0) <= self._seq:
+                    continue  # already part of the snapshot
+                apply_op(self._data, entry)
+                self._seq = entry["seq"]
+                self._since_snapshot += 1
+
+    def load_data(self) -> Dict[str, Any]:
+        """Returns the live document. Callers must not mutate it directly; use commit()."""
+        with self._lock:
+            self._refresh()
+            return self._data
+
+    def active_project_id(self) -> str | None:
+        return self.load_data().get("active_project_id")
+
+    def load_project(self, project_id: str | None) -> Dict[str, Any] | None:
+        return _find_project(self.load_data(), project_id)
+
+    # --- Writing ---
+
+    def _flush_ops(self, ops: List[Dict[str, Any]]) -> List[Dict[str, Any] | None]:
+        with file_lock(self.journal_path), self._lock:
+            # Under the lock our view is complete, so sequence numbers stay unique across processes
+            self._refresh()
+            results = []
+            lines = []
+            try:
+                for op in ops:
+                    if op.get("op") != "add_project" and not op.get("project_id"):
+                        # Pin "active project" so replay does not depend on later switches
+                        op = {**op, "project_id": self._data.get("active_project_id")}
+                    target = apply_op(self._data, op)
+                    results.append(target)
+                    if target is not None:
+                        lines.append(json.dumps({"seq": self._seq + len(lines) + 1, **op}, separators=(",", ":"), default=to_json) + "\n")
+
+                if lines:
+                    with open(self.journal_path, "ab") as f:
+                        if f.tell() != self._offset:
+                            f.truncate(self._offset)  # drop a torn line left by a crashed writer
+                        f.write("".join(lines).encode("utf-8"))
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self._offset = f.tell()
+            except Exception:
+                self._data = None  # memory is ahead of disk; reload on next access
+                raise
+            self._seq += len(lines)
+            self._since_snapshot += len(lines)
+
+            if self._since_snapshot >= self.compact_every and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, daemon=True).start()
+            return results
+
+    def commit(self, op: Dict[str, Any]) -> Dict[str, Any] | None:
+        return self._group.submit(op)
+
+    def save_data(self, data: Dict[str, Any]) -> None:
+        """Full replacement: written as a new snapshot, which also empties the journal."""
+        with file_lock(self.journal_path), self._lock:
+            self._refresh()
+            self._data = with_models(Document(data))
+            atomic_write_text(self.path, json.dumps({**self._data, "journal_seq": self._seq}, indent=2, default=to_json))
+            self._truncate_journal(self._seq)
+
+    # --- Compaction ---
+
+    def compact(self) -> None:
+        """Writes the current state as the snapshot and drops the journal entries it covers."""
+        try:
+            with self._lock:
+                self._refresh()
+                seq = self._seq
+                base_sig = self._snapshot_sig
+                text = json.dumps({**self._data, "journal_seq": seq}, indent=2, default=to_json)
+
+            # Slow part (write + fsync) happens outside the locks, commits keep appending meanwhile
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.compact")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with file_lock(self.journal_path), self._lock:
+                if _file_signature(self.path) != base_sig:
+                    tmp.unlink()  # another process compacted first; its snapshot is newer
+                    return
+                os.replace(tmp, self.path)
+                self._truncate_journal(seq)
+        finally:
+            self._compacting = False
+
+    def _truncate_journal(self, seq: int) -> None:
+        """Keeps only entries newer than `seq` (appended while the snapshot was being written). Caller holds the locks."""
+        keep = []
+        if self.journal_path.exists():
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    if line.endswith(b"\n") and line.strip() and json.loads(line).get("seq", 0) > seq:
+                        keep.append(line)
+        tmp = self.journal_path.with_name(f".{self.journal_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(b"".join(keep))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_path)
+
+        self._snapshot_sig = _file_signature(self.path)
+        # Re-read the (short) tail; entries we already applied are skipped by seq
+        self._offset = 0
+        self._since_snapshot = len(keep)
@@ -1,21 +1,287 @@
-﻿from dataclasses import dataclass, field
+﻿import sys
+from array import array
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Any, Dict, Iterator, List, Optional
+
+# Plain-dict shapes (data/projects.json) <-> the compact types below.
+# Task and Project are slotted and behave like the dicts they replace (t["id"], t.get("role"),
+# t["status"] = "done", {**t}), so the stores load into them and everything else still reads
+# dicts. Keys without a field live in `extra`; fields the dict did not have are ABSENT.
+
+TASK_FIELDS = ("id", "name", "duration_days", "depends_on", "status", "delay_days")
+PROJECT_FIELDS = ("id", "name", "description", "deadline", "created_at", "tasks")
+
+
+class _Absent:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "ABSENT"
+
+    def __reduce__(self):
+        return "ABSENT"  # unpickles as the module singleton (the portfolio pool pickles tasks)
+
+
+# A field the loaded dict did not have: reads as a missing key, not as the default,
+# so the validator's missing-field checks and the round trip to JSON see the same dict
+ABSENT: Any = _Absent()
+
+
+class _FieldMapping(MutableMapping):
+    """Dict view over a slotted dataclass: its FIELDS first (unless ABSENT), then `extra`."""
+    __slots__ = ()
+    FIELDS: tuple = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not ABSENT:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.FIELDS and getattr(self, key) is not ABSENT:
+            setattr(self, key, ABSENT)
+        elif key not in self.FIELDS and self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if getattr(self, key) is not ABSENT:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(getattr(self, key) is not ABSENT for key in self.FIELDS) + len(self.extra or ())
+
+
+def _interned(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True, eq=False)  # eq: Mapping's, so a Task equals the dict it was loaded from
+class Task(_FieldMapping):
+    FIELDS = TASK_FIELDS
 
-@dataclass
-class Task:
     id: str
     name: str
     duration_days: int = 1
     depends_on: List[str] = field(default_factory=list)
     status: str = "pending"  # pending | done
     delay_days: int = 0
+    extra: Optional[Dict[str, Any]] = None  # other keys (role, priority, estimates...)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Task":
+        extra = {k: v for k, v in d.items() if k not in TASK_FIELDS}
+        deps = d.get("depends_on", ABSENT)
+        return cls(
+            id=_interned(d.get("id", ABSENT)),
+            name=d.get("name", ABSENT),
+            duration_days=d.get("duration_days", ABSENT),
+            depends_on=[_interned(x) for x in deps] if isinstance(deps, list) else deps,
+            status=_interned(d.get("status", ABSENT)),
+            delay_days=d.get("delay_days", ABSENT),
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: (list(v) if k == "depends_on" and isinstance(v, list) else v) for k, v in self.items()}
+
+
+@dataclass(slots=True, eq=False)
+class Project(_FieldMapping):
+    FIELDS = PROJECT_FIELDS
 
-@dataclass
-class Project:
     id: str
     name: str
     description: str = ""
     deadline: Optional[str] = None  # ISO date string YYYY-MM-DD
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     tasks: List[Task] = field(default_factory=list)
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], columnar: bool = False) -> "Project":
+        """columnar=True loads the tasks into a TaskTable instead of a list of Task."""
+        tasks = d.get("tasks", ABSENT)
+        if isinstance(tasks, list):
+            tasks = TaskTable.from_dicts(tasks) if columnar else [as_task(t) for t in tasks]
+        extra = {k: v for k, v in d.items() if k not in PROJECT_FIELDS}
+        return cls(
+            id=d.get("id", ABSENT),
+            name=d.get("name", ABSENT),
+            description=d.get("description", ABSENT),
+            deadline=d.get("deadline", ABSENT),
+            created_at=d.get("created_at", ABSENT),
+            tasks=tasks,
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = dict(self)
+        if isinstance(self.tasks, TaskTable):
+            d["tasks"] = self.tasks.to_dicts()
+        elif isinstance(self.tasks, list):
+            d["tasks"] = [t.to_dict() if isinstance(t, Task) else dict(t) for t in self.tasks]
+        return d
+
+
+def as_task(task: Dict[str, Any]) -> Task:
+    return task if isinstance(task, Task) else Task.from_dict(task)
+
+
+def as_project(project: Dict[str, Any]) -> Project:
+    return project if isinstance(project, Project) else Project.from_dict(project)
+
+
+def to_json(obj: Any) -> Any:
+    """json.dumps(default=to_json): writes the model types in their plain-dict shape."""
+    if isinstance(obj, (Task, Project)):
+        return obj.to_dict()
+    if isinstance(obj, TaskTable):
+        return obj.to_dicts()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class TaskTable:
+    """
+    A task list stored column by column: durations, delays and status codes in flat
+    arrays, ids interned once, dependencies as offsets into one index array (CSR).
+    Far smaller than a dict per task, and the CPM code reads the columns directly.
+
+    Indexing or iterating yields Task objects (built on demand), so code written
+    for lists of task dicts still works, just without the speed-up.
+    """
+    __slots__ = ("ids", "names", "durations", "delays", "status", "status_names",
+                 "dep_ptr", "dep_idx", "unknown_deps", "extra", "_index")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.durations = array("i")
+        self.delays = array("i")
+        self.status = array("b")               # code into status_names
+        self.status_names: List[str] = ["pending", "done"]
+        self.dep_ptr = array("i", [0])          # task i depends on dep_idx[dep_ptr[i]:dep_ptr[i + 1]]
+        self.dep_idx = array("i")               # >= 0: task index; < 0: unknown_deps[-k - 1]
+        self.unknown_deps: List[str] = []
+        self.extra: Dict[int, Dict[str, Any]] = {}  # row -> keys without a column
+        self._index: Optional[Dict[str, int]] = None
+
+    # --- Loading ---
+
+    @classmethod
+    def from_dicts(cls, tasks: List[Dict[str, Any]]) -> "TaskTable":
+        table = cls()
+        index: Dict[str, int] = {}
+        for i, t in enumerate(tasks):
+            index.setdefault(t.get("id"), i)
+
+        status_codes = {s: k for k, s in enumerate(table.status_names)}
+        unknown: Dict[str, int] = {}
+        intern = sys.intern
+        for i, t in enumerate(tasks):
+            tid = t.get("id")
+            table.ids.append(intern(tid) if isinstance(tid, str) else tid)
+            table.names.append(t.get("name", ""))
+            table.durations.append(int(t.get("duration_days", 1)))
+            table.delays.append(int(t.get("delay_days", 0) or 0))
+            status = t.get("status") or "pending"
+            code = status_codes.get(status)
+            if code is None:
+                code = status_codes[status] = len(table.status_names)
+                table.status_names.append(status)
+            table.status.append(code)
+            for d in t.get("depends_on") or ():
+                j = index.get(d)
+                if j is None:
+                    j = unknown.get(d)
+                    if j is None:
+                        j = unknown[d] = -len(table.unknown_deps) - 1
+                        table.unknown_deps.append(d)
+                table.dep_idx.append(j)
+            table.dep_ptr.append(len(table.dep_idx))
+            extra = {k: v for k, v in t.items() if k not in TASK_FIELDS}
+            if extra:
+                table.extra[i] = extra
+        return table
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [self.row(i) for i in range(len(self.ids))]
+
+    # --- Access ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """id -> first row with that id. Built on first use: the CPM passes don't need it."""
+        if self._index is None:
+            self._index = {}
+            for i, tid in enumerate(self.ids):
+                self._index.setdefault(tid, i)
+        return self._index
+
+    def _deps(self, i: int) -> List[str]:
+        return [self.ids[j] if j >= 0 else self.unknown_deps[-j - 1]
+                for j in self.dep_idx[self.dep_ptr[i]:self.dep_ptr[i + 1]]]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Row i in the plain task dict shape."""
+        d = {
+            "id": self.ids[i],
+            "name": self.names[i],
+            "duration_days": self.durations[i],
+            "depends_on": self._deps(i),
+            "status": self.status_names[self.status[i]],
+            "delay_days": self.delays[i],
+        }
+        if i in self.extra:
+            d.update(self.extra[i])
+        return d
+
+    def __getitem__(self, i: int) -> Task:
+        if i < 0:
+            i += len(self.ids)
+        if not 0 <= i < len(self.ids):
+            raise IndexError(i)
+        return Task(self.ids[i], self.names[i], self.durations[i], self._deps(i),
+                    self.status_names[self.status[i]], self.delays[i], self.extra.get(i))
+
+    def __iter__(self) -> Iterator[Task]:
+        for i in range(len(self.ids)):
+            yield self[i]
+
+    # --- Columns for the CPM code ---
+
+    def total_durations(self) -> List[int]:
+        """duration_days + delay_days per task (task_duration for every row)."""
+        return [d + x for d, x in zip(self.durations, self.delays)]
+
+    def edges(self):
+        """(src, dst) arrays of the known dependency edges: dst depends on src."""
+        src, dst = array("i"), array("i")
+        ptr, idx = self.dep_ptr, self.dep_idx
+        for i in range(len(self.ids)):
+            for k in range(ptr[i], ptr[i + 1]):
+                if idx[k] >= 0:
+                    src.append(idx[k])
+                    dst.append(i)
+        return src, dst
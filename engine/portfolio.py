@@ -0,0 +1,133 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from .analysis import ProjectAnalysis, analyze, content_key
+from .storage import load_data
+
+# Portfolios with at least this many tasks in total are analyzed in a process pool;
+# below it, pickling the projects costs more than the analysis itself
+POOL_MIN_TASKS = int(os.environ.get("JARVIS_PORTFOLIO_POOL_MIN_TASKS", "50000"))
+
+# Worker processes (default: one per CPU)
+POOL_WORKERS = int(os.environ.get("JARVIS_PORTFOLIO_WORKERS", "0")) or None
+
+# Ranking: most urgent first
+_STATUS_RANK = {"off-track": 0, "invalid": 1, "unknown": 2, "ok": 3, "on-track": 4}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def project_summary(project: Dict[str, Any], today: date, analysis: Optional[ProjectAnalysis] = None) -> Dict[str, Any]:
+    """Status and doctor findings of one project, as one portfolio row."""
+    analysis = analysis or analyze(project)
+    status = analysis.status(today)
+    finish = analysis.finish_date(today)
+    deadline = project.get("deadline")
+    slip = None
+    if finish and deadline:
+        try:
+            slip = (date.fromisoformat(finish) - date.fromisoformat(deadline)).days
+        except ValueError:
+            # Deadlines aren't validated on the way in; one bad date spoils only its own row
+            status = {"status": "invalid", "message": f"Deadline '{deadline}' is not a date (use YYYY-MM-DD)."}
+    return {
+        "id": project.get("id"),
+        "name": project.get("name", ""),
+        "status": status["status"],
+        "finish": finish,
+        "deadline": deadline,
+        "slip_days": slip,  # > 0: days past the deadline
+        "tasks": len(analysis.tasks),
+        "done": sum(1 for t in analysis.tasks if t.get("status") == "done"),
+        "issues": list(analysis.issues),
+        "message": status["message"],
+    }
+
+
+def _summaries(projects: List[Dict[str, Any]], today: str) -> List[Dict[str, Any]]:
+    # Runs in a worker process: the projects are copies, never the store's, so skip the
+    # shared cache (and the store load that checking for it would cost)
+    day = date.fromisoformat(today)
+    return [project_summary(p, day, ProjectAnalysis(p, content_key(p))) for p in projects]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+    return _pool
+
+
+def _chunks(projects: List[Dict[str, Any]], parts: int) -> List[List[Dict[str, Any]]]:
+    """Splits projects into `parts` chunks of roughly equal task counts."""
+    chunks: List[List[Dict[str, Any]]] = [[] for _ in range(parts)]
+    loads = [0] * parts
+    for p in sorted(projects, key=lambda p: -len(p.get("tasks", []))):
+        k = loads.index(min(loads))
+        chunks[k].append(p)
+        loads[k] += len(p.get("tasks", [])) + 1
+    return [c for c in chunks if c]
+
+
+def _rank(row: Dict[str, Any]):
+    slip = row["slip_days"] if row["slip_days"] is not None else 0
+    return _STATUS_RANK.get(row["status"], 2), -slip, row["name"]
+
+
+def portfolio_status(projects: Optional[List[Dict[str, Any]]] = None, today: Optional[date] = None,
+                     parallel: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Schedules and diagnoses every project (default: all stored projects) in one pass.
+    Returns {"projects": rows ranked most urgent first (off-track by days late, then
+    invalid plans, ...), "counts": projects per status}. Large portfolios (see
+    POOL_MIN_TASKS) are spread over a process pool; parallel=True/False forces it.
+    """
+    if projects is None:
+        projects = load_data().get("projects", [])
+    today = today or date.today()
+    if parallel is None:
+        parallel = ((POOL_WORKERS or os.cpu_count() or 1) > 1
+                    and sum(len(p.get("tasks", [])) for p in projects) >= POOL_MIN_TASKS)
+
+    rows: List[Dict[str, Any]] = []
+    if parallel and len(projects) > 1:
+        pool = _get_pool()
+        chunks = _chunks([dict(p) for p in projects], 4 * (POOL_WORKERS or os.cpu_count() or 1))
+        for part in pool.map(_summaries, chunks, [today.isoformat()] * len(chunks)):
+            rows.extend(part)
+    else:
+        rows = [project_summary(p, today) for p in projects]
+
+    rows.sort(key=_rank)
+    counts: Dict[str, int] = {}
+    for r in rows:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {"date": today.isoformat(), "projects": rows, "counts": counts}
+
+
+def format_portfolio(report: Dict[str, Any], limit: int = 10) -> str:
+    """The ranked off-track list (then anything else needing attention), for the command reply."""
+    rows = report["projects"]
+    if not rows:
+        return "No projects yet."
+    counts = report["counts"]
+    lines = [f"[Portfolio] {len(rows)} project(s): " + ", ".join(
+        f"{n} {s}" for s, n in sorted(counts.items(), key=lambda kv: _STATUS_RANK.get(kv[0], 2)))]
+    urgent = [r for r in rows if r["status"] in ("off-track", "invalid") or r["issues"]]
+    for r in urgent[:limit]:
+        if r["status"] == "off-track":
+            line = f"- {r['name']}: {r['slip_days']} day(s) late (finish {r['finish']}, deadline {r['deadline']})"
+        elif r["status"] == "invalid":
+            line = f"- {r['name']}: {r['message']}"
+        else:
+            line = f"- {r['name']}: {r['status']}"
+        if r["issues"]:
+            line += f"; {len(r['issues'])} issue(s): {r['issues'][0]}"
+        lines.append(line)
+    if len(urgent) > limit:
+        lines.append(f"... and {len(urgent) - limit} more.")
+    if not urgent:
+        lines.append("Everything is on track.")
+    return "\n".join(lines)
@@ -0,0 +1,159 @@
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: risk mode is simply unavailable without it
+    np = None
+
+from .analytics import CompiledPlan, task_ids, _BATCH_CELLS
+from .calendars import DEFAULT_CALENDAR, WorkCalendar
+from .scheduler import task_duration
+
+# Simulated runs per risk estimate
+RISK_RUNS = int(os.environ.get("JARVIS_RISK_RUNS", "10000"))
+
+# Tasks without explicit estimates: optimistic = (1 - spread) x, pessimistic = (1 + 2 spread) x duration
+RISK_SPREAD = float(os.environ.get("JARVIS_RISK_SPREAD", "0.3"))
+
+# "Status" adds the risk estimate on its own only up to this many tasks; larger
+# plans get the deterministic status unless asked for "status risk"
+RISK_INLINE_MAX_TASKS = int(os.environ.get("JARVIS_RISK_INLINE_MAX_TASKS", "2000"))
+
+# PERT quantile tables: the PERT beta is Beta(1 + 4r, 5 - 4r) with r = (m - o) / (p - o),
+# a one-parameter family, so one table over r serves every task. Sampling picks a
+# uniformly random quantile (inverse-CDF at _QUANTILES evenly spaced probabilities).
+_SHAPES = 65
+_QUANTILES = 4096
+_pert_table = None
+
+
+def _pert_quantiles():
+    """Flat (_SHAPES * _QUANTILES) table: row k holds quantiles of the PERT beta with r = k / (_SHAPES - 1)."""
+    global _pert_table
+    if _pert_table is None:
+        x = np.linspace(0.0, 1.0, 8193)
+        probs = (np.arange(_QUANTILES) + 0.5) / _QUANTILES
+        rows = []
+        for r in np.linspace(0.0, 1.0, _SHAPES):
+            a, b = 1 + 4 * r, 5 - 4 * r
+            pdf = x ** (a - 1) * (1 - x) ** (b - 1)
+            cdf = np.concatenate(([0.0], np.cumsum((pdf[1:] + pdf[:-1]) / 2)))
+            rows.append(np.interp(probs, cdf / cdf[-1], x))
+        _pert_table = np.asarray(rows, dtype=np.float32).ravel()
+    return _pert_table
+
+
+def three_point(task: Dict[str, Any], spread: float = RISK_SPREAD):
+    """
+    (optimistic, most likely, pessimistic) duration in days. Uses the task's
+    optimistic_days / pessimistic_days when given, else a spread around its duration.
+    Done tasks are certain. Accumulated delay shifts all three.
+    """
+    m = float(task_duration(task))
+    if task.get("status") == "done":
+        return m, m, m
+    delay = float(task.get("delay_days", 0) or 0)
+    o = task.get("optimistic_days")
+    p = task.get("pessimistic_days")
+    o = float(o) + delay if o is not None else m * (1 - spread)
+    p = float(p) + delay if p is not None else m * (1 + 2 * spread)
+    return min(o, m), m, max(p, m)
+
+
+def _sample(offsets, low, width, rng, runs):
+    """Durations, shape (tasks, runs). `offsets` locates each task's row in the quantile table."""
+    idx = rng.integers(0, _QUANTILES, size=(len(low), runs), dtype=np.int32)
+    idx += offsets[:, None]
+    dur = _pert_quantiles().take(idx)
+    dur *= width[:, None]
+    dur += low[:, None]
+    return dur
+
+
+def simulate(tasks: List[Dict[str, Any]], runs: int = RISK_RUNS, seed: Optional[int] = None,
+             spread: float = RISK_SPREAD) -> Dict[str, Any]:
+    """
+    Monte Carlo over the dependency DAG. Every run samples each task's duration from
+    its PERT distribution (see three_point) and computes the project finish and which
+    tasks were critical. Returns {"finish": finish day offsets per run (end inclusive,
+    like the schedule), "criticality": fraction of runs each task was critical, in task order}.
+    Raises DependencyCycleError; RuntimeError if NumPy is missing.
+    """
+    if np is None:
+        raise RuntimeError("Risk simulation needs numpy (pip install numpy).")
+    plan = CompiledPlan(tasks)
+    n = plan.n
+    estimates = np.asarray([three_point(t, spread) for t in tasks], dtype=np.float64).reshape(n, 3)
+    low, mode, high = estimates.T
+    width = high - low
+    r = np.divide(mode - low, width, out=np.zeros(n), where=width > 0)
+    offsets = (np.rint(r * (_SHAPES - 1)).astype(np.int32) * _QUANTILES)
+    low, width = low.astype(np.float32), width.astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, min(runs, _BATCH_CELLS // max(n, 1)))
+    finish = np.empty(runs, dtype=np.int64)
+    critical = np.zeros(n, dtype=np.int64)
+    done = 0
+    while done < runs:
+        b = min(batch, runs - done)
+        dur = _sample(offsets, low, width, rng, b)
+
+        end, slack = plan.evaluate(dur)
+        tol = np.float32(1e-3) + end * np.float32(1e-6)  # float32 rounding grows with the sums
+        critical += np.count_nonzero(slack <= tol, axis=1)
+
+        # Inclusive end day of a run, matching the deterministic schedule for whole-day durations
+        finish[done:done + b] = np.maximum(np.ceil(end - np.float32(1e-3)).astype(np.int64) - 1, 0)
+        done += b
+
+    return {"finish": finish, "criticality": critical / max(runs, 1)}
+
+
+def deadline_risk(tasks: List[Dict[str, Any]], start: date, deadline: Optional[str] = None,
+                  runs: int = RISK_RUNS, seed: Optional[int] = None,
+                  calendar: Optional[WorkCalendar] = None) -> Dict[str, Any]:
+    """
+    Finish-date risk of a plan starting at `start`: P(finish <= deadline) (None without
+    a deadline, or with one that isn't an ISO date), P50/P90 finish dates and each task's criticality index (task id -> share
+    of runs in which it was on the critical path). Durations are working days of
+    `calendar`. Raises DependencyCycleError.
+    """
+    calendar = calendar or DEFAULT_CALENDAR
+    sim = simulate(tasks, runs=runs, seed=seed)
+    finish = sim["finish"]
+    p50, p90 = (int(v) for v in np.percentile(finish, [50, 90], method="higher"))
+
+    p_on_time = None
+    try:
+        # Deadlines aren't validated on the way in; one that isn't a date counts as none
+        due = date.fromisoformat(deadline) if deadline else None
+    except (TypeError, ValueError):
+        due = None
+    if due is not None:
+        limit = calendar.offset(start, due)
+        p_on_time = float(np.count_nonzero(finish <= limit)) / len(finish)
+
+    criticality: Dict[str, float] = {}
+    for tid, c in zip(task_ids(tasks), sim["criticality"].tolist()):
+        criticality.setdefault(tid, round(c, 3))
+    return {
+        "runs": len(finish),
+        "p_on_time": p_on_time,
+        "p50": calendar.date(start, p50).isoformat(),
+        "p90": calendar.date(start, p90).isoformat(),
+        "criticality": criticality,
+    }
+
+
+def risk_summary(risk: Dict[str, Any]) -> str:
+    """One sentence for the status reply."""
+    text = f"Risk ({risk['runs']:,} runs): P50 finish {risk['p50']}, P90 {risk['p90']}"
+    if risk["p_on_time"] is not None:
+        text += f", {risk['p_on_time']:.0%} chance of meeting the deadline"
+    likely = [tid for tid, c in sorted(risk["criticality"].items(), key=lambda kv: -kv[1]) if c >= 0.5][:3]
+    if likely:
+        text += f". Most often critical: {', '.join(likely)}"
+    return text + "."
@@ -0,0 +1,416 @@
+import heapq
+from collections import deque
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .calendars import DEFAULT_CALENDAR, WorkCalendar
+
+
+class DependencyCycleError(ValueError):
+    """Task dependencies form a cycle. `cycle` is the offending path of task ids, first id repeated at the end."""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__("Dependency cycle: " + " -> ".join(str(c) for c in cycle))
+
+
+def task_duration(t: Dict[str, Any]) -> int:
+    """Planned duration plus accumulated delay, in (working) days."""
+    return int(t.get("duration_days", 1)) + int(t.get("delay_days", 0))
+
+
+def build_graph(tasks: List[Dict[str, Any]]) -> Tuple[Dict[str, int], List[List[int]]]:
+    """
+    Returns (id -> index, preds) where preds[i] lists the indices task i depends on.
+    Dependencies on unknown ids are dropped (the doctor reports them); with duplicate
+    ids the first task wins.
+    """
+    index: Dict[str, int] = {}
+    for i, t in enumerate(tasks):
+        index.setdefault(t.get("id"), i)
+    preds = [[index[d] for d in (t.get("depends_on") or []) if d in index] for t in tasks]
+    return index, preds
+
+
+def find_cycle(tasks: List[Dict[str, Any]], preds: List[List[int]], remaining: List[int]) -> List[str]:
+    """
+    Extracts one cycle from the nodes Kahn's algorithm could not order. Every such
+    node still has an unordered dependency, so walking dependencies must loop.
+    """
+    alive = set(remaining)
+    seen: Dict[int, int] = {}
+    path: List[int] = []
+    node = remaining[0]
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = next(p for p in preds[node] if p in alive)
+    loop = path[seen[node]:]
+    # We walked "depends on" edges; report in execution order (dependency first)
+    loop.reverse()
+    ids = [tasks[i].get("id") for i in loop]
+    return ids + ids[:1]
+
+
+def topological_order(tasks: List[Dict[str, Any]], preds: Optional[List[List[int]]] = None) -> List[int]:
+    """
+    Kahn's algorithm, O(V + E). Ties keep the input order, so an already ordered
+    plan comes back unchanged. Raises DependencyCycleError.
+    """
+    if preds is None:
+        preds = build_graph(tasks)[1]
+    n = len(tasks)
+    indegree = [len(p) for p in preds]
+    succs: List[List[int]] = [[] for _ in range(n)]
+    for i, p in enumerate(preds):
+        for d in p:
+            succs[d].append(i)
+
+    queue = deque(i for i in range(n) if indegree[i] == 0)
+    order: List[int] = []
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for s in succs[i]:
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                queue.append(s)
+
+    if len(order) != n:
+        remaining = [i for i in range(n) if indegree[i] > 0]
+        raise DependencyCycleError(find_cycle(tasks, preds, remaining))
+    return order
+
+
+def schedule_offsets(tasks: List[Dict[str, Any]]) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Earliest start/end of every task as working-day offsets from the project start
+    (end is inclusive: a 1-day task starts and ends on the same day).
+    Returns (topological order, start offsets, end offsets), offsets by input index.
+    """
+    _, preds = build_graph(tasks)
+    order = topological_order(tasks, preds)
+    starts = [0] * len(tasks)
+    ends = [0] * len(tasks)
+    for i in order:
+        s = 0
+        for d in preds[i]:
+            if ends[d] + 1 > s:
+                s = ends[d] + 1
+        starts[i] = s
+        ends[i] = s + max(task_duration(tasks[i]) - 1, 0)
+    return order, starts, ends
+
+
+def schedule_tasks(tasks: List[Dict[str, Any]], start: date,
+                   calendar: Optional[WorkCalendar] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Schedules tasks given in any order. Returns (schedule in input order, finish date ISO)
+    where finish is the latest end over all tasks (None when there are no tasks).
+    Durations count working days of `calendar` (default: JARVIS_WORKWEEK / JARVIS_HOLIDAYS).
+    """
+    if not tasks:
+        return [], None
+    _, starts, ends = schedule_offsets(tasks)
+    return _dated(tasks, starts, ends, start, calendar)
+
+
+def _dated(tasks: List[Dict[str, Any]], starts: List[int], ends: List[int], start: date,
+           calendar: Optional[WorkCalendar] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Working-day offsets -> (dated rows in input order, finish date ISO)."""
+    if not tasks:
+        return [], None
+
+    # Offset -> date is a table lookup; many tasks share an offset, so format each date once
+    table = (calendar or DEFAULT_CALENDAR).table(start, max(ends) + 1)
+    iso: Dict[int, str] = {}
+
+    def day(offset: int) -> str:
+        s = iso.get(offset)
+        if s is None:
+            s = iso[offset] = date.fromordinal(table[offset]).isoformat()
+        return s
+
+    schedule = [{**t, "start": day(starts[i]), "end": day(ends[i])} for i, t in enumerate(tasks)]
+    return schedule, day(max(ends))
+
+
+# --- Resource-constrained scheduling ---
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+def resource_pools(tasks: List[Dict[str, Any]], team: Optional[Dict[str, int]] = None,
+                   team_size: Optional[int] = None) -> Tuple[List[Optional[str]], Dict[str, int]]:
+    """
+    Which headcount pool each task draws from: its role's pool when `team` lists that
+    role ({"frontend": 2, ...}), otherwise one shared pool of `team_size` people.
+    Returns (pool per task, None meaning unlimited; headcount per pool).
+    """
+    team = team or {}
+    headcount = {role: max(int(n), 1) for role, n in team.items()}
+    shared = "*" if team_size else None
+    if shared:
+        headcount[shared] = max(int(team_size), 1)
+    pools = [t.get("role") if t.get("role") in team else shared for t in tasks]
+    return pools, headcount
+
+
+def resource_schedule_offsets(tasks: List[Dict[str, Any]], team: Optional[Dict[str, int]] = None,
+                              team_size: Optional[int] = None) -> Tuple[List[int], List[int]]:
+    """
+    List scheduling under headcount limits: each task needs one person from its pool
+    (see resource_pools) for its whole duration. Whenever people are free, ready tasks
+    start by priority ("high" first), then by longest remaining chain, then input order.
+    With no limits this is exactly schedule_offsets. O((V + E) log V).
+    Returns (start offsets, end offsets) by input index. Raises DependencyCycleError.
+    """
+    _, preds = build_graph(tasks)
+    order = topological_order(tasks, preds)
+    n = len(tasks)
+    durations = [task_duration(t) for t in tasks]
+    succs: List[List[int]] = [[] for _ in range(n)]
+    for i, p in enumerate(preds):
+        for d in p:
+            succs[d].append(i)
+
+    # Longest chain from each task to the end: the classic list-scheduling tie-breaker
+    tail = [0] * n
+    for i in reversed(order):
+        tail[i] = max(durations[i], 1) + max((tail[s] for s in succs[i]), default=0)
+
+    pools, headcount = resource_pools(tasks, team, team_size)
+    rank = [(PRIORITY_RANK.get(t.get("priority"), 1), -tail[i], i) for i, t in enumerate(tasks)]
+    free = dict(headcount)
+    ready: Dict[str, list] = {pool: [] for pool in headcount}
+    indegree = [len(p) for p in preds]
+    earliest = [0] * n
+    pending = [(0, rank[i], i) for i in range(n) if indegree[i] == 0]  # (available day, rank, task)
+    heapq.heapify(pending)
+    releases: List[Tuple[int, str]] = []  # (day a person is free again, pool)
+    starts = [0] * n
+    ends = [0] * n
+
+    def begin(i: int, day: int) -> None:
+        starts[i] = day
+        ends[i] = day + max(durations[i] - 1, 0)
+        if pools[i] is not None and durations[i] > 0:
+            free[pools[i]] -= 1
+            heapq.heappush(releases, (day + durations[i], pools[i]))
+        for s in succs[i]:
+            if ends[i] + 1 > earliest[s]:
+                earliest[s] = ends[i] + 1
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                heapq.heappush(pending, (earliest[s], rank[s], s))
+
+    day = 0
+    while pending or releases:
+        dirty = set()
+        while releases and releases[0][0] <= day:
+            pool = heapq.heappop(releases)[1]
+            free[pool] += 1
+            dirty.add(pool)
+        while pending and pending[0][0] <= day:
+            _, key, i = heapq.heappop(pending)
+            if pools[i] is None:
+                begin(i, day)
+            else:
+                heapq.heappush(ready[pools[i]], (key, i))
+                dirty.add(pools[i])
+        for pool in dirty:
+            queue = ready[pool]
+            while queue and free[pool] > 0:
+                begin(heapq.heappop(queue)[1], day)
+        # Tasks started today end (and free people) on a later day
+        day = min(pending[0][0] if pending else float("inf"), releases[0][0] if releases else float("inf"))
+    return starts, ends
+
+
+class ResourceSchedule:
+    """
+    Resource-constrained schedule of one task list, with the same read interface as
+    IncrementalSchedule. Capacity couples otherwise independent tasks, so any change
+    means a full (but O((V + E) log V)) reschedule rather than a cone update.
+    """
+
+    def __init__(self, tasks: List[Dict[str, Any]], team: Optional[Dict[str, int]] = None,
+                 team_size: Optional[int] = None):
+        self.tasks = tasks
+        self.starts, self.ends = resource_schedule_offsets(tasks, team, team_size)
+        self.finish = max(self.ends) if tasks else None
+        self._start: Optional[Tuple[date, WorkCalendar]] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._finish_iso: Optional[str] = None
+
+    def rows(self, start: date, calendar: Optional[WorkCalendar] = None) -> List[Dict[str, Any]]:
+        """Dated schedule in task order. Shared: do not mutate."""
+        calendar = calendar or DEFAULT_CALENDAR
+        if (start, calendar) != self._start:
+            self._rows, self._finish_iso = _dated(self.tasks, self.starts, self.ends, start, calendar)
+            self._start = (start, calendar)
+        return self._rows
+
+    def finish_date(self, start: date, calendar: Optional[WorkCalendar] = None) -> Optional[str]:
+        self.rows(start, calendar)
+        return self._finish_iso
+
+
+class IncrementalSchedule:
+    """
+    The schedule of one task list, kept around so a single task change only
+    recomputes that task's downstream cone instead of the whole plan.
+
+    Offsets are working days relative to the project start, so they stay valid across
+    days and calendars; the dated rows are re-rendered only when the start date or
+    the calendar changes.
+    """
+
+    def __init__(self, tasks: List[Dict[str, Any]]):
+        self.tasks = tasks
+        self.index, self.preds = build_graph(tasks)
+        order = topological_order(tasks, self.preds)  # raises DependencyCycleError
+
+        n = len(tasks)
+        self.succs: List[List[int]] = [[] for _ in range(n)]
+        for i, p in enumerate(self.preds):
+            for d in p:
+                self.succs[d].append(i)
+        self.pos = [0] * n
+        for k, i in enumerate(order):
+            self.pos[i] = k
+        self.ids = [t.get("id") for t in tasks]
+        self.deps = [tuple(t.get("depends_on") or ()) for t in tasks]
+        self.durations = [task_duration(t) for t in tasks]
+
+        self.starts = [0] * n
+        self.ends = [0] * n
+        for i in order:
+            self._place(i)
+        self.finish = max(self.ends) if n else None
+
+        self._start: Optional[date] = None
+        self._calendar: WorkCalendar = DEFAULT_CALENDAR
+        self._table = None  # working day ordinals from _start (see WorkCalendar.table)
+        self._rows: List[Dict[str, Any]] = []
+        self._iso: Dict[int, str] = {}
+
+    def _place(self, i: int) -> bool:
+        """Recomputes task i from its dependencies. Returns True if its dates moved."""
+        s = 0
+        for d in self.preds[i]:
+            if self.ends[d] + 1 > s:
+                s = self.ends[d] + 1
+        e = s + max(self.durations[i] - 1, 0)
+        if s == self.starts[i] and e == self.ends[i]:
+            return False
+        self.starts[i], self.ends[i] = s, e
+        return True
+
+    # --- Updates ---
+
+    def task_changed(self, task_id: str) -> Optional[List[int]]:
+        """
+        Re-reads one task after it was edited in place. Returns the indices whose
+        dates moved, or None if the change is structural (dependencies) and the
+        schedule must be rebuilt.
+        """
+        i = self.index.get(task_id)
+        if i is None:
+            return None
+        t = self.tasks[i]
+        if tuple(t.get("depends_on") or ()) != self.deps[i]:
+            return None
+
+        self._refresh_row(i)
+        duration = task_duration(t)
+        if duration == self.durations[i]:
+            return []  # e.g. status change: dates unaffected
+        self.durations[i] = duration
+        return self._propagate([i])
+
+    def _propagate(self, seeds: List[int]) -> List[int]:
+        # Visit the cone in topological position order, so every task is placed
+        # after all of its (possibly moved) dependencies.
+        heap = [(self.pos[i], i) for i in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        moved: List[int] = []
+        old_finish = self.finish
+        finish_may_drop = False
+        while heap:
+            _, j = heapq.heappop(heap)
+            old_end = self.ends[j]
+            if not self._place(j):
+                continue
+            moved.append(j)
+            self._refresh_row(j)
+            if old_end == old_finish and self.ends[j] < old_end:
+                finish_may_drop = True
+            if self.ends[j] > self.finish:
+                self.finish = self.ends[j]
+            for k in self.succs[j]:
+                if k not in queued:
+                    queued.add(k)
+                    heapq.heappush(heap, (self.pos[k], k))
+        if finish_may_drop:
+            self.finish = max(self.ends)
+        return moved
+
+    def sync(self, tasks: List[Dict[str, Any]]) -> bool:
+        """
+        Adopts a freshly loaded copy of the same plan (e.g. after another process
+        wrote the file), or the same list after in-place edits. Only tasks whose
+        duration changed are re-propagated. Returns False if ids or dependencies
+        changed and a rebuild is needed.
+        """
+        if len(tasks) != len(self.ids):
+            return False
+        for t, tid, deps in zip(tasks, self.ids, self.deps):
+            if t.get("id") != tid or tuple(t.get("depends_on") or ()) != deps:
+                return False
+
+        same = tasks is self.tasks
+        self.tasks = tasks
+        seeds = []
+        for i, t in enumerate(tasks):
+            duration = task_duration(t)
+            if duration != self.durations[i]:
+                self.durations[i] = duration
+                seeds.append(i)
+        self._propagate(seeds)
+        if not same:
+            self._start = None  # rows copied the old dicts
+        return True
+
+    # --- Output ---
+
+    def _day(self, offset: int) -> str:
+        s = self._iso.get(offset)
+        if s is None:
+            if offset >= len(self._table):  # a delay pushed past the table
+                self._table = self._calendar.table(self._start, offset + 1)
+            s = self._iso[offset] = date.fromordinal(self._table[offset]).isoformat()
+        return s
+
+    def _refresh_row(self, i: int) -> None:
+        if self._start is not None:
+            self._rows[i] = {**self.tasks[i], "start": self._day(self.starts[i]), "end": self._day(self.ends[i])}
+
+    def rows(self, start: date, calendar: Optional[WorkCalendar] = None) -> List[Dict[str, Any]]:
+        """Dated schedule in task order. Shared and kept up to date: do not mutate."""
+        calendar = calendar or DEFAULT_CALENDAR
+        if start != self._start or calendar != self._calendar:
+            self._start, self._calendar, self._iso = start, calendar, {}
+            self._table = calendar.table(start, (self.finish or 0) + 1)
+            self._rows = [{**t, "start": self._day(self.starts[i]), "end": self._day(self.ends[i])}
+                          for i, t in enumerate(self.tasks)]
+        return self._rows
+
+    def finish_date(self, start: date, calendar: Optional[WorkCalendar] = None) -> Optional[str]:
+        if self.finish is None:
+            return None
+        calendar = calendar or DEFAULT_CALENDAR
+        if start != self._start or calendar != self._calendar:
+            return calendar.date(start, self.finish).isoformat()
+        return self._day(self.finish)
@@ -0,0 +1,183 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Project, as_project, to_json
+from .storage import (
+    GROUP_COMMIT_WINDOW, GroupCommit, atomic_write_text, file_lock,
+    Document, _file_signature, _read_json, apply_op,
+)
+
+
+def _shard_name(project_id: str) -> str:
+    # Project ids are short uuids, but never let one escape the directory
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(project_id)) + ".json"
+
+
+class ShardedStore:
+    """
+    One file per project: data/projects/<id>.json, plus data/projects/index.json
+    holding active_project_id and the list of project ids/names.
+
+    Only the shards a command actually touches are read or written, so the cost
+    of "done t3" does not depend on how many other projects are kept around.
+    Commits are serialized across processes by a lock next to index.json and grouped:
+    a batch writes each touched shard once.
+    """
+
+    def __init__(self, directory: Path, json_path: Optional[Path] = None, window: float = GROUP_COMMIT_WINDOW):
+        self.dir = Path(directory)
+        self.index_path = self.dir / "index.json"
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_sig = None
+        self._shards: Dict[str, Tuple[Any, Dict[str, Any]]] = {}  # id -> (signature, project)
+        self._views: Dict[str, Document] = {}  # id -> one-project Document wrapping the cached shard
+        self._group = GroupCommit(self._flush_ops, window)
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if json_path is not None and not self.index_path.exists() and Path(json_path).exists():
+            # One-shot split of the single-file layout
+            data = _read_json(Path(json_path))
+            data.pop("journal_seq", None)
+            self.save_data(data)
+
+    # --- Files ---
+
+    def _shard_path(self, project_id: str) -> Path:
+        return self.dir / _shard_name(project_id)
+
+    @staticmethod
+    def _write(path: Path, obj: Any) -> None:
+        atomic_write_text(path, json.dumps(obj, indent=2, default=to_json))
+
+    def _load_index(self) -> Dict[str, Any]:
+        sig = _file_signature(self.index_path)
+        if self._index is None or sig != self._index_sig:
+            index = _read_json(self.index_path)
+            index.setdefault("projects", [])
+            self._index, self._index_sig = index, sig
+        return self._index
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        self._write(self.index_path, index)
+        self._index, self._index_sig = index, _file_signature(self.index_path)
+
+    def _save_shard(self, project: Dict[str, Any]) -> None:
+        path = self._shard_path(project["id"])
+        try:
+            self._write(path, project)
+        except Exception:
+            self._shards.pop(project["id"], None)  # memory may be ahead of disk
+            raise
+        self._shards[project["id"]] = (_file_signature(path), project)
+
+    # --- Reading ---
+
+    def active_project_id(self) -> str | None:
+        with self._lock:
+            return self._load_index().get("active_project_id")
+
+    def load_project(self, project_id: str | None) -> Dict[str, Any] | None:
+        """Loads a single shard (cached until its file changes)."""
+        if not project_id:
+            return None
+        with self._lock:
+            path = self._shard_path(project_id)
+            sig = _file_signature(path)
+            if sig is None:
+                self._shards.pop(project_id, None)
+                return None
+            cached = self._shards.get(project_id)
+            if cached is None or cached[0] != sig:
+                try:
+                    project = Project.from_dict(json.loads(path.read_text(encoding="utf-8-sig")))
+                except Exception:
+                    return None
+                self._shards[project_id] = (sig, project)
+                return project
+            return cached[1]
+
+    def load_data(self) -> Dict[str, Any]:
+        """Assembles the full single-document view. Reads every shard, so the engine avoids it."""
+        with self._lock:
+            index = self._load_index()
+            projects = [self.load_project(entry["id"]) for entry in index["projects"]]
+            return {"active_project_id": index.get("active_project_id"),
+                    "projects": [p for p in projects if p is not None]}
+
+    # --- Writing ---
+
+    def save_data(self, data: Dict[str, Any]) -> None:
+        with file_lock(self.index_path), self._lock:
+            keep = set()
+            for project in data.get("projects", []):
+                project = as_project(project)
+                self._save_shard(project)
+                keep.add(_shard_name(project["id"]))
+            for path in self.dir.glob("*.json"):
+                if path.name != self.index_path.name and path.name not in keep:
+                    path.unlink()
+                    self._shards = {pid: v for pid, v in self._shards.items() if _shard_name(pid) != path.name}
+            self._save_index({
+                "active_project_id": data.get("active_project_id"),
+                "projects": [{"id": p["id"], "name": p.get("name")} for p in data.get("projects", [])],
+            })
+
+    def _apply(self, op: Dict[str, Any], dirty: Dict[str, Dict[str, Any]]) -> Dict[str, Any] | None:
+        """Applies one op to the cached index/shards, recording what needs writing in `dirty`."""
+        index = dirty.get("index") or self._load_index()
+        kind = op.get("op")
+
+        if kind == "add_project":
+            project = as_project(op["project"])
+            self._shards[project["id"]] = (None, project)
+            dirty.setdefault("shards", {})[project["id"]] = project
+            entries = [e for e in index["projects"] if e["id"] != project["id"]]
+            entries.append({"id": project["id"], "name": project.get("name")})
+            dirty["index"] = {**index, "active_project_id": project["id"], "projects": entries}
+            return project
+
+        pid = op.get("project_id") or index.get("active_project_id")
+        project = dirty.get("shards", {}).get(pid) or self.load_project(pid)
+        if project is None:
+            return None
+
+        if kind == "set_active_project":
+            dirty["index"] = {**index, "active_project_id": pid}
+            return project
+
+        # Reuse the single-document op semantics on a one-project view (kept, so its index is too)
+        view = self._views.get(pid)
+        if view is None or view["projects"][0] is not project:
+            view = Document(active_project_id=pid, projects=[project])
+            self._views[pid] = view
+        target = apply_op(view, {**op, "project_id": pid})
+        if target is not None:
+            dirty.setdefault("shards", {})[pid] = project
+            if kind == "update_project" and "name" in (op.get("set") or {}):
+                entries = [{**e, "name": project.get("name")} if e["id"] == pid else e for e in index["projects"]]
+                dirty["index"] = {**index, "projects": entries}
+        return target
+
+    def _flush_ops(self, ops: List[Dict[str, Any]]) -> List[Dict[str, Any] | None]:
+        with file_lock(self.index_path), self._lock:
+            dirty: Dict[str, Any] = {}
+            try:
+                results = [self._apply(op, dirty) for op in ops]
+                for project in dirty.get("shards", {}).values():
+                    self._save_shard(project)
+                if "index" in dirty:
+                    self._save_index(dirty["index"])
+            except Exception:
+                # Memory may be ahead of disk; re-read everything on next access
+                self._index = None
+                self._shards.clear()
+                self._views.clear()
+                raise
+            return results
+
+    def commit(self, op: Dict[str, Any]) -> Dict[str, Any] | None:
+        return self._group.submit(op)
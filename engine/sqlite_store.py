@@ -0,0 +1,198 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import Project, to_json
+from .storage import GROUP_COMMIT_WINDOW, Document, GroupCommit, _find_project, _read_json, apply_op, with_models
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id       TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    doc      TEXT NOT NULL           -- project fields except "tasks", as JSON
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    project_id TEXT NOT NULL,
+    id         TEXT,
+    position   INTEGER NOT NULL,
+    status     TEXT,
+    delay_days INTEGER,
+    doc        TEXT NOT NULL          -- the full task dict, as JSON
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_id ON tasks(project_id, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+"""
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), default=to_json)
+
+
+class SqliteStore:
+    """
+    Projects and tasks as rows in data/projects.db.
+
+    load_data() still hands back the usual {"active_project_id", "projects"} document
+    (cached, and rebuilt only when another connection has committed), while commit()
+    turns each op into row-level statements: marking a task done is one UPDATE.
+    SQLite does the cross-process locking; concurrent commits share one transaction.
+    """
+
+    def __init__(self, path: Path, json_path: Optional[Path] = None, window: float = GROUP_COMMIT_WINDOW):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._version = None
+        self._group = GroupCommit(self._flush_ops, window)
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if json_path is not None:
+            self.migrate_from_json(Path(json_path))
+
+    # --- Migration ---
+
+    def migrate_from_json(self, json_path: Path) -> bool:
+        """One-shot import of data/projects.json. Does nothing if the database was already populated."""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+            if row or not json_path.exists():
+                return False
+            data = _read_json(json_path)
+            data.pop("journal_seq", None)
+            with self.conn:
+                self._write_all(data)
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (str(json_path),))
+            self._data = None
+            return True
+
+    # --- Reading ---
+
+    def _data_version(self) -> int:
+        # Changes whenever *another* connection commits
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_data(self) -> Dict[str, Any]:
+        """Returns the cached document. Callers must not mutate it directly; use commit()."""
+        with self._lock:
+            version = self._data_version()
+            if self._data is None or version != self._version:
+                self._data = self._read_all()
+                self._version = version
+            return self._data
+
+    def active_project_id(self) -> str | None:
+        return self.load_data().get("active_project_id")
+
+    def load_project(self, project_id: str | None) -> Dict[str, Any] | None:
+        return _find_project(self.load_data(), project_id)
+
+    def _read_all(self) -> Dict[str, Any]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'active_project_id'").fetchone()
+        projects: List[Dict[str, Any]] = []
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for pid, doc in self.conn.execute("SELECT id, doc FROM projects ORDER BY position"):
+            project = json.loads(doc)
+            project["tasks"] = []
+            projects.append(project)
+            by_id[pid] = project
+        for pid, doc in self.conn.execute("SELECT project_id, doc FROM tasks ORDER BY project_id, position"):
+            if pid in by_id:
+                by_id[pid]["tasks"].append(json.loads(doc))
+        return Document(active_project_id=row[0] if row else None, projects=[Project.from_dict(p) for p in projects])
+
+    # --- Writing ---
+
+    def _set_active(self, project_id: Optional[str]) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('active_project_id', ?)", (project_id,))
+
+    def _insert_project(self, project: Dict[str, Any]) -> None:
+        fields = {k: v for k, v in project.items() if k != "tasks"}
+        self.conn.execute(
+            "INSERT OR REPLACE INTO projects (id, position, doc) "
+            "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM projects), ?)",
+            (project.get("id"), _dumps(fields)),
+        )
+        self.conn.execute("DELETE FROM tasks WHERE project_id = ?", (project.get("id"),))
+        self._insert_tasks(project.get("id"), project.get("tasks", []))
+
+    def _insert_tasks(self, project_id: str, tasks: List[Dict[str, Any]]) -> None:
+        self.conn.executemany(
+            "INSERT INTO tasks (project_id, id, position, status, delay_days, doc) VALUES (?, ?, ?, ?, ?, ?)",
+            [(project_id, t.get("id"), i, t.get("status"), int(t.get("delay_days", 0) or 0), _dumps(t))
+             for i, t in enumerate(tasks)],
+        )
+
+    def _write_all(self, data: Dict[str, Any]) -> None:
+        self.conn.execute("DELETE FROM tasks")
+        self.conn.execute("DELETE FROM projects")
+        for project in data.get("projects", []):
+            self._insert_project(project)
+        self._set_active(data.get("active_project_id"))
+
+    def save_data(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            try:
+                with self.conn:
+                    self._write_all(data)
+            except Exception:
+                self._data = None
+                raise
+            self._data = with_models(Document(data))
+            self._version = self._data_version()
+
+    def _apply(self, data: Dict[str, Any], op: Dict[str, Any]) -> Dict[str, Any] | None:
+        kind = op.get("op")
+        pid = op.get("project", {}).get("id") if kind == "add_project" else (op.get("project_id") or data.get("active_project_id"))
+
+        target = apply_op(data, op)
+        if target is None:
+            return None
+
+        if kind == "add_project":
+            self._insert_project(target)
+            self._set_active(pid)
+        elif kind == "set_active_project":
+            self._set_active(pid)
+        elif kind == "update_project":
+            fields = {k: v for k, v in target.items() if k != "tasks"}
+            self.conn.execute("UPDATE projects SET doc = ? WHERE id = ?", (_dumps(fields), pid))
+        elif kind == "replace_tasks":
+            self.conn.execute("DELETE FROM tasks WHERE project_id = ?", (pid,))
+            self._insert_tasks(pid, target.get("tasks", []))
+        elif kind == "update_task":
+            # Single-row update; duplicates of an id resolve to the first, like apply_op
+            self.conn.execute(
+                "UPDATE tasks SET status = ?, delay_days = ?, doc = ? WHERE rowid = ("
+                "SELECT rowid FROM tasks WHERE project_id = ? AND id = ? ORDER BY position LIMIT 1)",
+                (target.get("status"), int(target.get("delay_days", 0) or 0), _dumps(target), pid, target.get("id")),
+            )
+        return target
+
+    def _flush_ops(self, ops: List[Dict[str, Any]]) -> List[Dict[str, Any] | None]:
+        with self._lock:
+            try:
+                with self.conn:
+                    # BEGIN IMMEDIATE takes the write lock first, so the document we apply to is current
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    data = self.load_data()
+                    results = [self._apply(data, op) for op in ops]
+            except Exception:
+                self._data = None  # memory is ahead of disk; reload on next access
+                raise
+            return results
+
+    def commit(self, op: Dict[str, Any]) -> Dict[str, Any] | None:
+        return self._group.submit(op)
+
+    def close(self) -> None:
+        self.conn.close()
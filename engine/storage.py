@@ -1,16 +1,442 @@
 ﻿import json
+import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional
+
+from .models import as_project, as_task, to_json
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    import msvcrt
+    fcntl = None
 
 DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "projects.json"
 
-def load_data() -> Dict[str, Any]:
-    if not DATA_PATH.exists():
-        return {"active_project_id": None, "projects": []}
+# Storage backend:
+# - "json"    -> rewrite data/projects.json on every change (default)
+# - "journal" -> append each change to data/projects.journal, compact in the background
+# - "sqlite"  -> rows in data/projects.db (imported once from projects.json)
+# - "sharded" -> one file per project in data/projects/ plus an index.json
+STORAGE_BACKEND = os.environ.get("JARVIS_STORAGE", "json").lower()
+
+# Commits arriving within this window share one write + fsync
+GROUP_COMMIT_WINDOW = float(os.environ.get("JARVIS_GROUP_COMMIT_MS", "2")) / 1000.0
+
+
+class Document(dict):
+    """
+    A loaded {"active_project_id", "projects"} document. A plain dict that also carries
+    its lookup index; the projects in it are Project models (see with_models).
+    """
+    __slots__ = ("index",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = None
+
+
+class DocumentIndex:
+    """
+    id -> project and (project_id, task_id) -> task lookups for one document.
+
+    Built lazily (projects on first lookup, each project's tasks on first task lookup)
+    and kept in sync by apply_op(). Entries remember their list position and are
+    checked against the list on every lookup, so a list swapped, grown or edited in
+    place behind our back just gets re-indexed.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._projects_list = None
+        self._projects: Dict[str, tuple] = {}  # project id -> (position, project)
+        self._tasks: Dict[str, tuple] = {}  # project id -> (tasks list, {task id: (position, task)})
+
+    @staticmethod
+    def _positions(items: List[Dict[str, Any]]) -> Dict[str, tuple]:
+        by_id: Dict[str, tuple] = {}
+        for i, item in enumerate(items):
+            by_id.setdefault(item.get("id"), (i, item))  # first one wins, like a scan
+        return by_id
+
+    @staticmethod
+    def _current(items: List[Dict[str, Any]], entry: tuple | None) -> bool:
+        # Still the same object at the same place?
+        return entry is not None and entry[0] < len(items) and items[entry[0]] is entry[1]
+
+    def project(self, project_id: str | None) -> Dict[str, Any] | None:
+        plist = self.data.get("projects", [])
+        entry = self._projects.get(project_id) if plist is self._projects_list else None
+        if not self._current(plist, entry):
+            self._projects = self._positions(plist)
+            self._projects_list = plist
+            entry = self._projects.get(project_id)
+        return entry[1] if entry is not None else None
+
+    def task(self, project_id: str | None, task_id: str) -> Dict[str, Any] | None:
+        project = self.project(project_id)
+        if project is None:
+            return None
+        tasks = project.get("tasks", [])
+        cached = self._tasks.get(project_id)
+        entry = cached[1].get(task_id) if cached is not None and cached[0] is tasks else None
+        if not self._current(tasks, entry):
+            by_id = self._positions(tasks)
+            self._tasks[project_id] = (tasks, by_id)
+            entry = by_id.get(task_id)
+        return entry[1] if entry is not None else None
+
+    def add_project(self, project: Dict[str, Any]) -> None:
+        """Called right after `project` was appended to data["projects"]."""
+        plist = self.data.get("projects")
+        if self._projects_list is plist and plist and plist[-1] is project:
+            self._projects.setdefault(project.get("id"), (len(plist) - 1, project))
+
+
+def index_for(data: Dict[str, Any]) -> DocumentIndex:
+    """The (cached) index of a Document; plain dicts get a throwaway one."""
+    if isinstance(data, Document):
+        if data.index is None:
+            data.index = DocumentIndex(data)
+        return data.index
+    return DocumentIndex(data)
+
+
+def _empty_data() -> Dict[str, Any]:
+    return Document(active_project_id=None, projects=[])
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return _empty_data()
     try:
-        return json.loads(DATA_PATH.read_text(encoding="utf-8") or "{}") or {"active_project_id": None, "projects": []}
+        # utf-8-sig: tolerate files saved with a BOM by Windows editors
+        return Document(json.loads(path.read_text(encoding="utf-8-sig") or "{}") or _empty_data())
     except Exception:
-        return {"active_project_id": None, "projects": []}
+        return _empty_data()
+
+
+def with_models(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Loads a document's projects (and their tasks) into Project / Task, in place.
+    Every store does this on the way in; json.dumps(..., default=to_json) turns
+    them back into plain dicts on the way out.
+    """
+    data["projects"] = [as_project(p) for p in data.get("projects") or []]
+    return data
+
+
+def _find_project(data: Dict[str, Any], project_id: str | None) -> Dict[str, Any] | None:
+    return index_for(data).project(project_id)
+
+
+def find_task(data: Dict[str, Any], project_id: str | None, task_id: str) -> Dict[str, Any] | None:
+    return index_for(data).task(project_id, task_id)
+
+
+# project id -> number of changes applied to it in this process. Every mutation goes
+# through apply_op(), so together with the identity of the loaded project this tells
+# whether a plan changed without hashing it (see engine.analysis.analyze).
+_plan_versions: Dict[str, int] = {}
+
+
+def plan_version(project_id: str | None) -> int:
+    return _plan_versions.get(project_id, 0)
+
+
+def _bump(project_id: str | None) -> None:
+    _plan_versions[project_id] = _plan_versions.get(project_id, 0) + 1
+
+
+def apply_op(data: Dict[str, Any], op: Dict[str, Any]) -> Dict[str, Any] | None:
+    """
+    Applies one mutation to an in-memory document.
+    Returns the touched project/task, or None if the target does not exist
+    (in which case the document is left unchanged).
+
+    Ops:
+      {"op": "add_project", "project": {...}}
+      {"op": "set_active_project", "project_id": ...}
+      {"op": "replace_tasks", "project_id": ..., "tasks": [...]}
+      {"op": "update_task", "project_id": ..., "task_id": ..., "set": {...}, "inc": {...}}
+      {"op": "update_project", "project_id": ..., "set": {...}}   (project fields; not id/tasks)
+    A missing/None project_id means the active project.
+    """
+    kind = op.get("op")
+    index = index_for(data)
+
+    if kind == "add_project":
+        project = as_project(op["project"])
+        data.setdefault("projects", []).append(project)
+        index.add_project(project)
+        data["active_project_id"] = project.get("id")
+        _bump(project.get("id"))
+        return project
+
+    pid = op.get("project_id") or data.get("active_project_id")
+    project = index.project(pid)
+    if project is None:
+        return None
+
+    if kind == "set_active_project":
+        data["active_project_id"] = pid
+        return project
+
+    if kind == "replace_tasks":
+        project["tasks"] = [as_task(t) for t in op.get("tasks", [])]
+        _bump(pid)
+        return project
+
+    if kind == "update_project":
+        project.update({k: v for k, v in (op.get("set") or {}).items() if k not in ("id", "tasks")})
+        _bump(pid)
+        return project
+
+    if kind == "update_task":
+        t = index.task(pid, op.get("task_id"))
+        if t is None:
+            return None
+        t.update(op.get("set") or {})
+        for field, amount in (op.get("inc") or {}).items():
+            t[field] = int(t.get(field, 0)) + int(amount)
+        _bump(pid)
+        return t
+
+    raise ValueError(f"Unknown storage op: {kind}")
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Exclusive advisory lock on `<path>.lock`, shared by every process using the store
+    (server.py, the CLI, ...). Blocks until the lock is free.
+    """
+    lock_path = Path(str(path) + ".lock")
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Writes to a temp file, fsyncs it and renames it over `path`: readers see the old or the new file, never half of one."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Make the rename itself durable (POSIX only)
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class GroupCommit:
+    """
+    Batches concurrent commits. The first caller becomes the leader, waits
+    `window` seconds for others to queue up, then hands the whole batch to
+    `flush(ops) -> results` (one lock, one write, one fsync). Followers just
+    wait for their result.
+    """
+
+    def __init__(self, flush: Callable[[List[Dict[str, Any]]], List[Any]], window: float = GROUP_COMMIT_WINDOW):
+        self._flush = flush
+        self.window = window
+        self._lock = threading.Lock()
+        self._queue: List[Dict[str, Any]] = []
+        self._flushing = False
+
+    def submit(self, op: Dict[str, Any]) -> Any:
+        slot = {"op": op, "done": threading.Event(), "result": None, "error": None}
+        with self._lock:
+            self._queue.append(slot)
+            leader = not self._flushing
+            self._flushing = True
+
+        if not leader:
+            slot["done"].wait()
+        else:
+            if self.window > 0:
+                time.sleep(self.window)
+            while True:
+                with self._lock:
+                    batch, self._queue = self._queue, []
+                    if not batch:
+                        self._flushing = False
+                        break
+                try:
+                    for s, result in zip(batch, self._flush([s["op"] for s in batch])):
+                        s["result"] = result
+                except Exception as e:
+                    for s in batch:
+                        s["error"] = e
+                for s in batch:
+                    s["done"].set()
+
+        if slot["error"] is not None:
+            raise slot["error"]
+        return slot["result"]
+
+
+def _file_signature(path: Path):
+    """(mtime, size, inode) of a file, or None if it does not exist. Changes whenever the file is rewritten."""
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+
+class JsonStore:
+    """
+    The original layout: one JSON document, rewritten on every change.
+
+    The decoded document is kept in memory and only re-parsed when the file's
+    signature changes (i.e. another process wrote it), so reads cost one stat().
+    Writes are atomic, serialized across processes by file_lock(), and grouped.
+    """
+
+    def __init__(self, path: Path = DATA_PATH, window: float = GROUP_COMMIT_WINDOW):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._sig = None
+        self._group = GroupCommit(self._flush_ops, window)
+
+    def load_data(self) -> Dict[str, Any]:
+        """Returns the cached document. Callers must not mutate it directly; use commit()."""
+        with self._lock:
+            sig = _file_signature(self.path)
+            if self._data is None or sig != self._sig:
+                data = with_models(_read_json(self.path))
+                # Leftover from a journal snapshot, meaningless here
+                data.pop("journal_seq", None)
+                self._data, self._sig = data, sig
+            return self._data
+
+    def active_project_id(self) -> str | None:
+        return self.load_data().get("active_project_id")
+
+    def load_project(self, project_id: str | None) -> Dict[str, Any] | None:
+        return _find_project(self.load_data(), project_id)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        try:
+            atomic_write_text(self.path, json.dumps(data, indent=2, default=to_json))
+        except Exception:
+            self._data = None
+            raise
+        self._data, self._sig = data, _file_signature(self.path)
+
+    def save_data(self, data: Dict[str, Any]) -> None:
+        with file_lock(self.path), self._lock:
+            self._write(with_models(Document(data)))
+
+    def _flush_ops(self, ops: List[Dict[str, Any]]) -> List[Dict[str, Any] | None]:
+        with file_lock(self.path), self._lock:
+            # Under the lock: pick up whatever other processes wrote, then apply on top
+            data = self.load_data()
+            try:
+                results = [apply_op(data, op) for op in ops]
+            except Exception:
+                self._data = None
+                raise
+            if any(r is not None for r in results):
+                self._write(data)
+            return results
+
+    def commit(self, op: Dict[str, Any]) -> Dict[str, Any] | None:
+        return self._group.submit(op)
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        if STORAGE_BACKEND == "journal":
+            from .journal import JournalStore
+            _store = JournalStore(DATA_PATH)
+        elif STORAGE_BACKEND == "sqlite":
+            from .sqlite_store import SqliteStore
+            _store = SqliteStore(DATA_PATH.with_suffix(".db"), json_path=DATA_PATH)
+        elif STORAGE_BACKEND == "sharded":
+            from .sharded_store import ShardedStore
+            _store = ShardedStore(DATA_PATH.parent / "projects", json_path=DATA_PATH)
+        else:
+            _store = JsonStore(DATA_PATH)
+    return _store
+
+
+def load_data() -> Dict[str, Any]:
+    return get_store().load_data()
+
 
 def save_data(data: Dict[str, Any]) -> None:
-    DATA_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    get_store().save_data(data)
+
+
+def get_active_project_id() -> str | None:
+    return get_store().active_project_id()
+
+
+def load_project(project_id: str | None) -> Dict[str, Any] | None:
+    """Loads one project without (necessarily) loading the others."""
+    return get_store().load_project(project_id)
+
+
+def commit(op: Dict[str, Any]) -> Dict[str, Any] | None:
+    return get_store().commit(op)
+
+
+# --- Mutation helpers (the engine should prefer these over load_data/save_data) ---
+
+def add_project(project: Dict[str, Any]) -> Dict[str, Any]:
+    return commit({"op": "add_project", "project": project})
+
+
+def set_active_project_id(project_id: str) -> Dict[str, Any] | None:
+    return commit({"op": "set_active_project", "project_id": project_id})
+
+
+def replace_tasks(project_id: str | None, tasks: List[Dict[str, Any]]) -> Dict[str, Any] | None:
+    return commit({"op": "replace_tasks", "project_id": project_id, "tasks": tasks})
+
+
+def update_project(project_id: str | None, changes: Dict[str, Any]) -> Dict[str, Any] | None:
+    return commit({"op": "update_project", "project_id": project_id, "set": changes})
+
+
+def update_task(project_id: str | None, task_id: str,
+                changes: Optional[Dict[str, Any]] = None,
+                increments: Optional[Dict[str, int]] = None) -> Dict[str, Any] | None:
+    op: Dict[str, Any] = {"op": "update_task", "project_id": project_id, "task_id": task_id}
+    if changes:
+        op["set"] = changes
+    if increments:
+        op["inc"] = increments
+    return commit(op)
@@ -0,0 +1,165 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# How many task ids an orphan-chain message lists before "..."
+_LIST_IDS = 5
+
+
+def _signature(t: Dict[str, Any]) -> Tuple[Any, bool, bool, Tuple[Any, ...]]:
+    """The parts of a task validation looks at: id, has a name, has a duration, dependencies."""
+    return t.get("id"), bool(t.get("name")), "duration_days" in t, tuple(t.get("depends_on") or ())
+
+
+class PlanValidator:
+    """
+    The doctor's structural checks in one linear traversal: duplicate ids, missing
+    fields, dependencies on missing tasks, dependency cycles (with the cycle path)
+    and orphan chains (tasks that only transitively hang off a missing task).
+
+    Kept per project like IncrementalSchedule: an edit that leaves a task's id and
+    dependencies alone (name, duration, status, delay) is re-checked on its own;
+    anything structural re-runs the traversal.
+    """
+
+    def __init__(self, tasks: List[Dict[str, Any]]):
+        self.tasks = tasks
+        self._validate()
+
+    # --- Full pass ---
+
+    def _validate(self) -> None:
+        tasks = self.tasks
+        n = len(tasks)
+        self.signatures = [_signature(t) for t in tasks]
+        self.index: Dict[Any, int] = {}
+        self.duplicates = False
+        for i, (tid, _, _, _) in enumerate(self.signatures):
+            if not tid:
+                continue
+            if tid in self.index:
+                self.duplicates = True
+            else:
+                self.index[tid] = i
+
+        # One iterative DFS over the dependencies: references checked edge by edge,
+        # cycles found on back edges, fields and orphan roots settled on the way out.
+        # Issues are sparse, so they live in dicts keyed by task index.
+        self.field_issues: Dict[int, List[str]] = {}
+        self.missing: Dict[int, List[Any]] = {}
+        self.orphan_of: Dict[int, int] = {}  # task -> task with the missing dependency upstream of it
+        self.cycle: Optional[List[str]] = None
+        signatures, index, orphan_of, missing = self.signatures, self.index, self.orphan_of, self.missing
+        color = bytearray(n)  # 0 new, 1 on the stack, 2 done
+        for root in range(n):
+            if color[root]:
+                continue
+            color[root] = 1
+            stack = [(root, iter(signatures[root][3]))]
+            while stack:
+                i, deps = stack[-1]
+                for d in deps:
+                    j = index.get(d)
+                    if j is None:
+                        missing.setdefault(i, []).append(d)
+                        orphan_of[i] = i
+                    elif color[j] == 0:
+                        color[j] = 1
+                        stack.append((j, iter(signatures[j][3])))
+                        break
+                    elif color[j] == 1:
+                        if self.cycle is None:
+                            path = [signatures[k][0] for k, _ in stack]
+                            self.cycle = path[path.index(d):] + [d]
+                    elif j in orphan_of and i not in orphan_of:
+                        orphan_of[i] = orphan_of[j]
+                else:
+                    stack.pop()
+                    color[i] = 2
+                    _, named, timed, _ = signatures[i]
+                    if not (named and timed):
+                        self._check_fields(i)
+                    if stack and i in orphan_of and stack[-1][0] not in orphan_of:
+                        orphan_of[stack[-1][0]] = orphan_of[i]
+
+    def _check_fields(self, i: int) -> None:
+        tid, named, timed, _ = self.signatures[i]
+        issues = []
+        if not named:
+            issues.append(f"Task {tid} is missing a name.")
+        if not timed:
+            issues.append(f"Task {tid} is missing duration_days.")
+        if issues:
+            self.field_issues[i] = issues
+        else:
+            self.field_issues.pop(i, None)
+
+    # --- Updates ---
+
+    def task_changed(self, task_id: str) -> bool:
+        """
+        Re-checks one task after it was edited in place. Returns False if the edit
+        touched its id or dependencies and the validator must be rebuilt.
+        """
+        i = self.index.get(task_id)
+        if i is None:
+            return False
+        sig = _signature(self.tasks[i])
+        old = self.signatures[i]
+        if sig[0] != old[0] or sig[3] != old[3]:
+            return False
+        self.signatures[i] = sig
+        self._check_fields(i)
+        return True
+
+    def sync(self, tasks: List[Dict[str, Any]]) -> bool:
+        """
+        Adopts a freshly loaded copy of the same plan, re-checking only tasks whose
+        name or duration field changed. Returns False if ids or dependencies changed.
+        """
+        if len(tasks) != len(self.signatures):
+            return False
+        changed = []
+        for i, t in enumerate(tasks):
+            sig = _signature(t)
+            old = self.signatures[i]
+            if sig != old:
+                if sig[0] != old[0] or sig[3] != old[3]:
+                    return False
+                changed.append((i, sig))
+        self.tasks = tasks
+        for i, sig in changed:
+            self.signatures[i] = sig
+            self._check_fields(i)
+        return True
+
+    # --- Output ---
+
+    @property
+    def issues(self) -> List[str]:
+        issues: List[str] = []
+        if not self.tasks:
+            return ["No tasks generated yet. Say 'Generate plan' to create tasks."]
+        if self.duplicates:
+            issues.append("Duplicate task IDs found (some tasks share the same id).")
+        for i in sorted(self.missing):
+            for dep in self.missing[i]:
+                issues.append(f"Task {self.signatures[i][0]} depends on missing task '{dep}'.")
+        for i in sorted(self.field_issues):
+            issues.extend(self.field_issues[i])
+        if self.cycle is not None:
+            issues.append(f"Dependency cycle: {' -> '.join(str(c) for c in self.cycle)}. "
+                          f"Break it before anything can be scheduled.")
+        issues.extend(self._orphan_chains())
+        return issues
+
+    def _orphan_chains(self) -> List[str]:
+        """Tasks downstream of a missing dependency, grouped by the task that has it."""
+        chains: Dict[int, List[Any]] = {}
+        for i, root in sorted(self.orphan_of.items()):
+            if root != i:
+                chains.setdefault(root, []).append(self.signatures[i][0])
+        messages = []
+        for root, ids in sorted(chains.items()):
+            shown = ", ".join(str(t) for t in ids[:_LIST_IDS]) + (", ..." if len(ids) > _LIST_IDS else "")
+            messages.append(f"Orphan chain: {len(ids)} task(s) ({shown}) wait on {self.signatures[root][0]}, "
+                            f"which depends on missing task '{self.missing[root][0]}'.")
+        return messages
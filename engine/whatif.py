@@ -0,0 +1,220 @@
+import re
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: scenarios are then evaluated one by one
+    np = None
+
+from .analytics import CompiledPlan, critical_path_analysis, _BATCH_CELLS
+from .calendars import DEFAULT_CALENDAR, WorkCalendar
+from .scheduler import resource_schedule_offsets, task_duration
+
+# Scenario edits, in the same {"op": ...} shape as storage ops:
+#   {"op": "delay",   "task_id": "t3", "days": 2}   task takes 2 more days
+#   {"op": "shorten", "task_id": "t3", "days": 1}   task takes 1 day less (never below 1)
+#   {"op": "drop",    "task_id": "t5"}              task is cut; its dependents wait on its dependencies
+
+
+def _scenario(s: Any) -> Dict[str, Any]:
+    """Accepts a list of edits or {"name", "edits"}."""
+    if isinstance(s, dict):
+        edits = s.get("edits", [])
+        return {"name": s.get("name") or describe_edits(edits), "edits": edits}
+    return {"name": describe_edits(s), "edits": list(s)}
+
+
+def describe_edits(edits: List[Dict[str, Any]]) -> str:
+    parts = []
+    for e in edits:
+        if e.get("op") == "drop":
+            parts.append(f"drop {e.get('task_id')}")
+        else:
+            parts.append(f"{e.get('op')} {e.get('task_id')} {e.get('days', 0)}")
+    return ", ".join(parts) or "no change"
+
+
+def _edited_duration(duration: float, edit: Dict[str, Any]) -> float:
+    op = edit.get("op")
+    if op == "delay":
+        return duration + int(edit.get("days", 0))
+    if op == "shorten":
+        return max(duration - int(edit.get("days", 0)), min(duration, 1))
+    if op == "drop":
+        return 0
+    raise ValueError(f"Unknown scenario edit: {op!r}")
+
+
+def _apply_edits(durations, dropped, index: Dict[str, int], edits: List[Dict[str, Any]]) -> List[str]:
+    """Applies one scenario's edits to its duration column in place. Returns the unknown task ids."""
+    unknown = []
+    for e in edits:
+        i = index.get(e.get("task_id"))
+        if i is None:
+            unknown.append(e.get("task_id"))
+            continue
+        durations[i] = _edited_duration(durations[i], e)
+        if e.get("op") == "drop":
+            dropped[i] = True
+    return unknown
+
+
+def _constrained_end(tasks, durations, dropped, team, team_size) -> int:
+    """
+    Days one scenario takes when headcount limits the schedule, as status reports it
+    (scheduler.resource_schedule_offsets). Dropped tasks leave the plan and their
+    dependents wait on their dependencies instead.
+    """
+    gone = {t.get("id"): t.get("depends_on") or [] for t, x in zip(tasks, dropped) if x}
+
+    def deps(ids, seen):
+        out = []
+        for d in ids:
+            if d not in gone:
+                out.append(d)
+            elif d not in seen:
+                seen.add(d)
+                out.extend(deps(gone[d], seen))
+        return out
+
+    kept = [{**t, "duration_days": int(d), "delay_days": 0, "depends_on": deps(t.get("depends_on") or [], set())}
+            for t, d, x in zip(tasks, durations, dropped) if not x]
+    if not kept:
+        return 0
+    _, ends = resource_schedule_offsets(kept, team, team_size)
+    return max(ends) + 1
+
+
+def _result(tasks, name, unknown, end, critical_idx, start, calendar, baseline_end=None) -> Dict[str, Any]:
+    offset = max(int(round(end)) - 1, 0)  # inclusive end day, like the schedule
+    critical, seen = [], set()
+    for i in critical_idx:
+        tid = tasks[i].get("id")
+        if tid not in seen:
+            seen.add(tid)
+            critical.append(tid)
+    result = {
+        "name": name,
+        "finish": calendar.date(start, offset).isoformat() if tasks else None,
+        "duration_days": int(round(end)),
+        "critical_path": critical,
+    }
+    if baseline_end is not None:
+        result["delta_days"] = int(round(end)) - int(round(baseline_end))
+    if unknown:
+        result["unknown_tasks"] = unknown
+    return result
+
+
+def evaluate_scenarios(tasks: List[Dict[str, Any]], scenarios: List[Any], start: date,
+                       plan: Optional[CompiledPlan] = None,
+                       calendar: Optional[WorkCalendar] = None,
+                       team: Optional[Dict[str, int]] = None,
+                       team_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Evaluates hypothetical edits without touching the tasks or storage. All scenarios
+    (plus the unchanged plan as baseline) run as columns of one batched CPM over a
+    single compiled DAG; pass `plan` to reuse one. Returns {"baseline": result,
+    "scenarios": [result, ...] in input order}, each result holding the finish date,
+    duration (working days of `calendar`), critical path and delta_days against the baseline.
+    With a `team` / `team_size` the finish dates (and deltas) come from the
+    resource-constrained schedule instead, so the baseline matches status; the
+    critical path stays the dependency one.
+    Raises DependencyCycleError; ValueError on an unknown edit op.
+    """
+    scenarios = [_scenario(s) for s in scenarios]
+    calendar = calendar or DEFAULT_CALENDAR
+    constrained = bool(team or team_size)
+    if np is None:
+        return _evaluate_python(tasks, scenarios, start, calendar, team, team_size)
+
+    if plan is None:
+        plan = CompiledPlan(tasks)
+    n, k = plan.n, len(scenarios) + 1
+    durations = np.repeat(plan.durations[:, None], k, axis=1)
+    dropped = np.zeros((n, k), dtype=bool)
+    unknown = [_apply_edits(durations[:, j + 1], dropped[:, j + 1], plan.index, s["edits"])
+               for j, s in enumerate(scenarios)]
+
+    ends = np.empty(k)
+    slack = np.empty((n, k))
+    batch = max(1, _BATCH_CELLS // max(n, 1))
+    for lo in range(0, k, batch):
+        ends[lo:lo + batch], slack[:, lo:lo + batch] = plan.evaluate(durations[:, lo:lo + batch])
+
+    if constrained:
+        ends = [_constrained_end(tasks, durations[:, j], dropped[:, j], team, team_size) for j in range(k)]
+    critical = (np.abs(slack) < 1e-9) & ~dropped
+    baseline = _result(tasks, "baseline", [], ends[0], np.flatnonzero(critical[:, 0]), start, calendar)
+    results = [_result(tasks, s["name"], unknown[j], ends[j + 1], np.flatnonzero(critical[:, j + 1]), start,
+                       calendar, ends[0])
+               for j, s in enumerate(scenarios)]
+    return {"baseline": baseline, "scenarios": results}
+
+
+def _evaluate_python(tasks, scenarios, start, calendar, team=None, team_size=None) -> Dict[str, Any]:
+    index: Dict[str, int] = {}
+    for i, t in enumerate(tasks):
+        index.setdefault(t.get("id"), i)
+
+    def run(name, edits, baseline_end=None):
+        durations = [task_duration(t) for t in tasks]
+        dropped = [False] * len(tasks)
+        unknown = _apply_edits(durations, dropped, index, edits)
+        edited = [{**t, "duration_days": d, "delay_days": 0} for t, d in zip(tasks, durations)]
+        cpm = critical_path_analysis(edited)
+        critical = [i for i, (s, gone) in enumerate(zip(cpm["slack"], dropped)) if s == 0 and not gone]
+        end = _constrained_end(tasks, durations, dropped, team, team_size) if team or team_size else cpm["duration"]
+        return _result(tasks, name, unknown, end, critical, start, calendar, baseline_end)
+
+    baseline = run("baseline", [])
+    return {"baseline": baseline,
+            "scenarios": [run(s["name"], s["edits"], baseline["duration_days"]) for s in scenarios]}
+
+
+_EDIT_RE = re.compile(r"\b(delay|shorten|cut|drop|remove|skip)\s+(?:task\s+)?([\w.-]+)(?:\s+by)?(?:\s+(\d+))?")
+_TASK_ID_RE = re.compile(r"t\d+")
+
+
+def parse_scenarios(text: str, task_ids: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
+    """
+    "what if delay t3 2 and drop t5; shorten t2 by 1" -> two scenarios.
+    Scenarios are separated by ";" or " or ", edits within one by "," or " and ".
+    Any id of `task_ids` (the active plan's, matched case-insensitively) can be
+    edited; other words count as task ids only in the "t3" form.
+    """
+    known = {str(tid).lower(): tid for tid in task_ids or () if tid is not None}
+    text = re.sub(r"^\s*what\s*-?\s*if\b", "", text.strip().lower())
+    scenarios = []
+    for part in re.split(r";|\bor\b", text):
+        edits = []
+        for verb, token, days in _EDIT_RE.findall(part):
+            tid = known.get(token)
+            if tid is None:
+                if not _TASK_ID_RE.fullmatch(token):
+                    continue
+                tid = token
+            if verb in ("cut", "remove", "skip"):
+                verb = "drop"
+            if verb == "drop":
+                edits.append({"op": "drop", "task_id": tid})
+            elif days:
+                edits.append({"op": verb, "task_id": tid, "days": int(days)})
+        if edits:
+            scenarios.append({"name": describe_edits(edits), "edits": edits})
+    return scenarios
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Scenarios ranked by finish date, for the command reply."""
+    base = report["baseline"]
+    lines = [f"[What-if] Current plan finishes {base['finish']}."]
+    for r in sorted(report["scenarios"], key=lambda r: (r["duration_days"], r["name"])):
+        delta = r.get("delta_days", 0)
+        change = "no change" if delta == 0 else f"{delta:+d} day(s)"
+        line = f"- {r['name']}: finish {r['finish']} ({change}), critical: {' -> '.join(r['critical_path']) or 'none'}"
+        if r.get("unknown_tasks"):
+            line += f" (unknown: {', '.join(r['unknown_tasks'])})"
+        lines.append(line)
+    return "\n".join(lines)
@@ -1,12 +1,22 @@
-﻿from engine.engine import (
+﻿import re
+from datetime import date
+
+from engine.engine import (
     create_project, get_active_project, generate_plan, save_tasks,
-    mark_task_done, delay_task, get_status, get_project_diagnosis
+    mark_task_done, delay_task, get_status, get_project_diagnosis, what_if, set_team,
+    set_calendar, status_as_of, burndown,
 )
+from engine.analysis import analyze
+from engine.portfolio import portfolio_status, format_portfolio
+from engine.whatif import parse_scenarios, format_report
+from engine.scheduler import DependencyCycleError
+from engine.calendars import WEEKDAYS, calendar_for, parse_weekmask
+from engine.risk import RISK_INLINE_MAX_TASKS
 from actions.system_actions import (
     minimize_all_windows, open_notes, open_word, open_excel, open_url
 )
 from documents.exporter import export_plan_to_word, export_schedule_to_excel
-from engine.ai_chat import chat_with_ai # New Intelligence Module
+from engine.ai_chat import chat_with_ai, stream_chat_with_ai # New Intelligence Module
 
 try:
     from voice.voice_io import speak, listen_command
@@ -16,23 +26,54 @@ except ImportError:
     def speak(t): print(f"[TTS] {t}")
     def listen_command(): return "VOICE_ERROR: Module not found"
 
+# "Team 3", "Team size 4 people"; "Team frontend 2 backend 1". Whole commands only, so
+# chat like "team of 5 engineers" or "teammates are slow" still reaches the AI.
+_TEAM_SIZE = re.compile(r"team\s+(?:size\s+)?(\d+)(?:\s+people)?")
+_TEAM_ROLES = re.compile(r"team((?:\s+(?!(?:of|for|with|in|at|by|to|is|are|and|size)\b)[a-z][\w-]*\s+\d+)+)")
+
+# "Calendar", "Calendar weekdays", "Calendar mon-thu"; "Holiday 2026-12-25 2026-12-26"
+_CALENDAR = re.compile(r"calendar(?:\s+(.+))?")
+_HOLIDAYS = re.compile(r"holidays?((?:[\s,]+(?:and\s+)?\d{4}-\d{2}-\d{2})+)")
+
 
-def handle_command(text: str, files: list = None) -> str:
+def handle_command(text: str, files: list = None, urgent: bool = False, stream: bool = False,
+                   use_cache: bool = True):
+    # With stream=True, replies that come from the AI are an iterator of text pieces
+    # (see stream_chat_with_ai); everything else is still a plain string.
+    # use_cache=False asks the AI afresh instead of re-using a cached reply.
     cmd = text.strip().lower()
 
     # If there are files attached, go straight to AI Analysis
     if files and len(files) > 0:
-        return chat_with_ai(text, files)
+        if stream:
+            return stream_chat_with_ai(text, files, use_cache=use_cache)
+        return chat_with_ai(text, files, use_cache=use_cache)
 
     # --- HELP ---
     if "help" in cmd or "what can you do" in cmd:
         return (
             "I can help with:\n"
-            "1. Projects: 'Create project <name>', 'Generate plan', 'Status', 'Doctor', 'Export plan'.\n"
-            "2. Tasks: 'Done <task_id>', 'Delay <task_id> <days>'.\n"
+            "1. Projects: 'Create project <name>', 'Generate plan', 'Status', 'Status as of 2026-10-01', 'Burndown',\n"
+            "   'Doctor', 'Export plan', 'Portfolio status' (every project, most urgent first),\n"
+            "   'Team 3' or 'Team frontend 2 backend 1' (the schedule then respects headcount),\n"
+            "   'Calendar' (show), 'Calendar weekdays' / 'Calendar mon-thu', 'Holiday 2026-12-25' (durations count working days).\n"
+            "2. Tasks: 'Done <task_id>', 'Delay <task_id> <days>', 'What if delay t3 2; drop t5' (nothing is saved).\n"
             "3. System: 'Open notes', 'Open word', 'Open excel', 'Minimize windows', 'Play music'."
         )
 
+    # "What if delay t3 2 and drop t5; shorten t2 1" -> evaluated side by side, nothing saved.
+    # Checked first: the edits would otherwise match the real "delay" command below.
+    if cmd.startswith("what if") or cmd.startswith("what-if"):
+        p = get_active_project()
+        if not p: return "No active project."
+        scenarios = parse_scenarios(text, [t.get("id") for t in p.get("tasks", [])])
+        if not scenarios:
+            return "Say e.g. 'What if delay t3 2 and drop t5; shorten t2 1'."
+        try:
+            return format_report(what_if(p, scenarios))
+        except DependencyCycleError as e:
+            return f"Can't evaluate scenarios. {e}."
+
     # --- SYSTEM ACTIONS ---
     if "minimize" in cmd or "hide windows" in cmd:
         return minimize_all_windows()
@@ -97,6 +138,48 @@ def handle_command(text: str, files: list = None) -> str:
                 p = create_project(name=name)
                 return f'Created project "{p["name"]}" (ID: {p["id"]}). Ready to plan?'
 
+    # "Team 3" (3 people, any task) or "Team frontend 2 backend 1" (headcount per role)
+    size = _TEAM_SIZE.fullmatch(cmd)
+    roles = None if size else _TEAM_ROLES.fullmatch(cmd)
+    if size or roles:
+        p = get_active_project()
+        if not p: return "No active project."
+        if size:
+            set_team(p["id"], team_size=int(size.group(1)))
+            return f"Team set to {size.group(1)} people. The schedule now runs at most that many tasks at once."
+        team = {role: int(n) for role, n in re.findall(r"([a-z][\w-]*)\s+(\d+)", roles.group(1))}
+        set_team(p["id"], team=team)
+        return "Team set: " + ", ".join(f"{n} {role}" for role, n in team.items()) + "."
+
+    # "Calendar" shows the working week; "Calendar weekdays", "Calendar mon-thu", "Calendar every day"
+    # set it; "Holiday 2026-12-25 2026-12-26" adds days off. Anything else ("calendar for next
+    # week?", "holiday ideas") is chat.
+    calendar = _CALENDAR.fullmatch(cmd)
+    spec = calendar.group(1) if calendar else None
+    if spec is not None:
+        try:
+            parse_weekmask(spec)
+        except ValueError:
+            calendar = None
+    holidays = _HOLIDAYS.fullmatch(cmd)
+    if calendar or holidays:
+        p = get_active_project()
+        if not p: return "No active project."
+        try:
+            if holidays:
+                days = re.findall(r"\d{4}-\d{2}-\d{2}", holidays.group(1))
+                set_calendar(p["id"], add_holidays=days)
+                return f"Added {len(days)} holiday(s). They no longer count as working days."
+            if spec is None:
+                cal = calendar_for(p).to_dict()
+                week = ", ".join(d.title() for d, c in zip(WEEKDAYS, cal["weekmask"]) if c == "1")
+                return (f"Working days: {week}. Holidays: {', '.join(cal['holidays']) or 'none'}. "
+                        f"Say e.g. 'Calendar weekdays' or 'Holiday 2026-12-25' to change it.")
+            set_calendar(p["id"], weekmask=spec)
+            return f"Working week set to {spec}. Durations now count working days only."
+        except ValueError as e:
+            return f"Can't set the calendar. {e}."
+
     # "Generate plan", "Make a plan", "Plan it"
     if "plan" in cmd and ("generate" in cmd or "make" in cmd or "create" in cmd):
         p = get_active_project()
@@ -104,15 +187,38 @@ def handle_command(text: str, files: list = None) -> str:
         
         # Check if AI is configured (simple check)
         use_ai = True 
-        tasks = generate_plan(p, use_ai=use_ai)
+        tasks = generate_plan(p, use_ai=use_ai, team_size=p.get("team_size") or 1)
         save_tasks(p["id"], tasks)
         return f"Plan generated! I've created {len(tasks)} tasks. Say 'Status' to see them."
 
+    # "Portfolio status", "Portfolio": every project, off-track ones first
+    if "portfolio" in cmd or "all projects" in cmd:
+        return format_portfolio(portfolio_status())
+
+    # "Burndown", "Velocity": the last two weeks from the task history
+    if "burndown" in cmd or "burn down" in cmd or "velocity" in cmd:
+        p = get_active_project()
+        if not p: return "No active project."
+        b = burndown(p)
+        if not b["series"]: return "No task history yet."
+        lines = [f"[Burndown] Velocity: {b['velocity']} day(s) of work per day."]
+        lines += [f"- {r['date']}: {r['remaining_days']} day(s) left, {r['done']}/{r['tasks']} done" for r in b["series"]]
+        return "\n".join(lines)
+
     # "Status", "Show me", "How is it going"
     if "status" in cmd or "progress" in cmd or "list tasks" in cmd:
         p = get_active_project()
         if not p: return "No active project."
-        s = get_status(p)
+        # "Status as of 2026-10-01": rebuilt from the task history
+        as_of = re.search(r"\bas of (\d{4}-\d{2}-\d{2})", cmd)
+        if as_of:
+            try:
+                day = date.fromisoformat(as_of.group(1))
+            except ValueError:
+                return "Say e.g. 'Status as of 2026-10-01'."
+            return status_as_of(p, day)["message"]
+        risk = "risk" in cmd or len(p.get("tasks", [])) <= RISK_INLINE_MAX_TASKS
+        s = get_status(p, risk=risk)
         return s["message"]
 
     # "Doctor", "Diagnose", "Check health"
@@ -126,7 +232,6 @@ def handle_command(text: str, files: list = None) -> str:
     # "Mark t1 done", "t1 is finished"
     if "done" in cmd or "finish" in cmd or "complete" in cmd:
         # Try to find a task ID (e.g., t1, t2)
-        import re
         match = re.search(r"\b(t\d+)\b", cmd)
         if match:
             task_id = match.group(1)
@@ -137,7 +242,6 @@ def handle_command(text: str, files: list = None) -> str:
 
     # "Delay t1 by 2 days"
     if "delay" in cmd:
-        import re
         # Look for "t1" and a number
         t_match = re.search(r"\b(t\d+)\b", cmd)
         d_match = re.search(r"\b(\d+)\b", cmd)
@@ -159,20 +263,24 @@ def handle_command(text: str, files: list = None) -> str:
         p = get_active_project()
         if not p: return "No active project."
         
+        # Same cached analysis that "status" and "doctor" used
+        analysis = analyze(p)
         if "excel" in cmd or "schedule" in cmd:
             s = get_status(p)
-            path = export_schedule_to_excel(p, s["schedule"])
+            path = export_schedule_to_excel(p, s["schedule"], slack=analysis.slack)
             return f"Schedule saved to Excel: {path}"
         
         # Default to word
-        path = export_plan_to_word(p)
+        path = export_plan_to_word(p, critical_path=analysis.critical_path)
         return f"Plan saved to Word: {path}"
 
     # Removed early return "I'm listening..." to allow fallback to AI Chat
 
     # Fallback to General AI Chat
     print(f"[Main] No command matched. Asking AI: {text}")
-    return chat_with_ai(text)
+    if stream:
+        return stream_chat_with_ai(text, use_cache=use_cache)
+    return chat_with_ai(text, urgent=urgent, use_cache=use_cache)
 
 if __name__ == "__main__":
     import sys
@@ -206,7 +314,8 @@ if __name__ == "__main__":
                     speak("Goodbye.")
                     break
                     
-                reply = handle_command(text)
+                # Spoken turns race both AI providers at once (see chat_with_ai)
+                reply = handle_command(text, urgent=True)
                 print(f"Jarvis: {reply}")
                 speak(reply)
                 
@@ -27,7 +27,12 @@ try:
     from main import handle_command
 except ImportError:
     print("Error: Could not import handle_command from main.py")
-    def handle_command(cmd, files=None): return f"Error: Backend connection failed. Command: {cmd}"
+    def handle_command(cmd, files=None, **kwargs): return f"Error: Backend connection failed. Command: {cmd}"
+
+try:
+    from engine.portfolio import portfolio_status
+except ImportError:
+    portfolio_status = None
 
 PORT = 8000
 DIRECTORY = "ui"
@@ -37,8 +42,63 @@ class Handler(http.server.SimpleHTTPRequestHandler):
         # Serve files from the 'ui' directory
         super().__init__(*args, directory=DIRECTORY, **kwargs)
 
+    def send_json(self, payload):
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode('utf-8'))
+
+    def do_GET(self):
+        # Every project's status and doctor findings, most urgent first
+        if self.path.split("?")[0] == "/api/portfolio":
+            if portfolio_status is None:
+                self.send_error(503, "Portfolio engine unavailable")
+                return
+            try:
+                self.send_json(portfolio_status())
+            except Exception as e:
+                print(f"[Server] Error: {e}")
+                self.send_error(500, str(e))
+            return
+        super().do_GET()
+
+    def stream_command(self):
+        # Server-sent events: {"delta": text} as the reply is written, then {"done": true}
+        content_length = int(self.headers['Content-Length'])
+        data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+        command = data.get("command", "")
+        files = data.get("files", [])
+        print(f"[Server] Received command (stream): {command} | Files: {len(files)}")
+
+        reply = handle_command(command, files, stream=True, use_cache=not data.get("no_cache"))
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        def send_event(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        try:
+            for piece in ([reply] if isinstance(reply, str) else reply):
+                send_event({"delta": piece})
+            send_event({"done": True})
+        except (BrokenPipeError, ConnectionResetError):
+            print("[Server] Client went away mid-stream.")
+        except Exception as e:
+            # Headers are gone already: report the error in the stream
+            print(f"[Server] Error: {e}")
+            send_event({"error": str(e)})
+
     def do_POST(self):
-        if self.path == "/api/command":
+        if self.path == "/api/command/stream":
+            try:
+                self.stream_command()
+            except Exception as e:
+                print(f"[Server] Error: {e}")
+                self.send_error(500, str(e))
+        elif self.path == "/api/command":
             try:
                 content_length = int(self.headers['Content-Length'])
                 post_data = self.rfile.read(content_length)
@@ -50,7 +110,7 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                 print(f"[Server] Received command: {command} | Files: {len(files)}")
                 
                 # Call the actual engine logic
-                reply = handle_command(command, files)
+                reply = handle_command(command, files, use_cache=not data.get("no_cache"))
                 print(f"[Server] Reply: {reply}")
                 
                 response = {"reply": reply}
@@ -0,0 +1,295 @@
+import sys
+import os
+import base64
+import contextlib
+import io
+import tempfile
+import time
+import tracemalloc
+import urllib.error
+import xml.etree.ElementTree as ET
+import zipfile
+from email.message import Message
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+import engine.ai_chat as ai_chat
+from engine.ai_cache import ResponseCache, cache_key
+from engine.circuit_breaker import CircuitBreaker
+
+
+class _Providers:
+    """Swaps the provider calls for fakes with set latencies; restores them on exit."""
+
+    def __init__(self, gemini, groq, provider="gemini", cache=None, delay=0.2):
+        self.fakes = {"_chat_with_gemini": gemini, "_chat_with_groq": groq, "_cache": cache,
+                      "_breaker": CircuitBreaker()}
+        self.settings = {"GEMINI_API_KEY": "test", "GROQ_API_KEY": "test", "DEFAULT_PROVIDER": provider,
+                         "HEDGE_ENABLED": True, "HEDGE_DELAY": delay}
+
+    def __enter__(self):
+        self.saved = {k: getattr(ai_chat, k) for k in list(self.fakes) + list(self.settings)}
+        for k, v in {**self.fakes, **self.settings}.items():
+            setattr(ai_chat, k, v)
+
+    def __exit__(self, *exc):
+        for k, v in self.saved.items():
+            setattr(ai_chat, k, v)
+
+
+def _slow(seconds, reply=None, error=None, started=None, name=None):
+    def call(message, *args, cancel=None, **kwargs):
+        if started is not None:
+            started.append(name)
+        if cancel is not None:
+            cancel.wait(seconds)
+            if cancel.is_set():
+                raise ai_chat.ProviderError("cancelled")
+        else:
+            time.sleep(seconds)
+        if error:
+            raise ai_chat.ProviderError(error)
+        return reply
+    return call
+
+
+def test_hedged_race():
+    print("Testing hedged provider race...")
+    # Preferred provider is quick: the hedge never starts
+    started = []
+    with _Providers(_slow(0.05, "gemini", started=started, name="gemini"),
+                    _slow(0.01, "groq", started=started, name="groq"), delay=5):
+        assert ai_chat.chat_with_ai("hi") == "gemini" and started == ["gemini"]
+
+    # Preferred provider hangs: the other starts after the hedge delay and wins
+    started = []
+    with _Providers(_slow(3, "gemini", started=started, name="gemini"),
+                    _slow(0.05, "groq", started=started, name="groq")):
+        assert ai_chat.chat_with_ai("hi") == "groq" and started == ["gemini", "groq"]
+    # Urgent (voice) turns don't wait for the delay, or the hanging provider would finish first
+    with _Providers(_slow(3, "gemini"), _slow(0.05, "groq"), delay=30):
+        assert ai_chat.chat_with_ai("hi", urgent=True) == "groq"
+
+    # Preferred provider fails fast: the other starts at once, not after the delay
+    out = io.StringIO()
+    with _Providers(_slow(0.5, "gemini"), _slow(0.01, error="HTTP 503"), provider="groq", delay=30), \
+            contextlib.redirect_stdout(out):
+        assert ai_chat.chat_with_ai("hi") == "gemini"
+    assert "groq failed" in out.getvalue() and "No answer from" not in out.getvalue()
+
+    # An empty candidate is not an answer: the race goes on to the other provider
+    with _Providers(_slow(0.01, "I thought about it, but couldn't form a response."), _slow(0.1, "groq"), delay=5):
+        assert ai_chat.chat_with_ai("hi") == "groq"
+
+    # Both fail: every error is reported
+    with _Providers(_slow(0.01, error="HTTP 429"), _slow(0.01, error="HTTP 503")):
+        reply = ai_chat.chat_with_ai("hi")
+        assert reply.startswith("All AI models failed.") and "429" in reply and "503" in reply
+    print("Hedged race OK.")
+
+
+def test_streaming_fallback():
+    print("Testing streamed replies...")
+
+    busy = []
+
+    def gemini(model, parts):
+        if model == "broken":
+            raise ai_chat.ProviderError("HTTP 503")
+        if model == "busy" and not busy:
+            busy.append(model)
+            headers = Message()
+            headers["Retry-After"] = "0"
+            raise urllib.error.HTTPError(model, 429, "busy", headers, io.BytesIO(b"{}"))
+        yield "Hello"
+        if model == "flaky":
+            raise ai_chat.ProviderError("connection reset")
+        yield ", world"
+
+    def groq(message):
+        yield "from groq"
+
+    saved = (ai_chat._stream_gemini, ai_chat._stream_groq, ai_chat._gemini_models)
+    with _Providers(None, None):
+        ai_chat._stream_gemini, ai_chat._stream_groq = gemini, groq
+        try:
+            # A model that fails before its first piece falls through to the next
+            ai_chat._gemini_models = lambda: ["broken", "ok"]
+            assert list(ai_chat.stream_chat_with_ai("hi")) == ["Hello", ", world"]
+            # A 429 before the first piece is retried on the same model
+            ai_chat._gemini_models = lambda: ["busy", "broken"]
+            assert list(ai_chat.stream_chat_with_ai("hi")) == ["Hello", ", world"] and busy == ["busy"]
+            # One that fails midway ends the reply with a note instead of starting over
+            ai_chat._gemini_models = lambda: ["flaky", "ok"]
+            pieces = list(ai_chat.stream_chat_with_ai("hi"))
+            assert pieces[0] == "Hello" and "interrupted" in pieces[1] and len(pieces) == 2
+            # Groq is the last resort, or first when preferred
+            ai_chat._gemini_models = lambda: ["broken"]
+            assert list(ai_chat.stream_chat_with_ai("hi")) == ["from groq"]
+            ai_chat.DEFAULT_PROVIDER = "groq"
+            ai_chat._gemini_models = lambda: ["ok"]
+            assert list(ai_chat.stream_chat_with_ai("hi")) == ["from groq"]
+        finally:
+            ai_chat._stream_gemini, ai_chat._stream_groq, ai_chat._gemini_models = saved
+    print("Streamed replies OK.")
+
+
+def test_response_cache():
+    print("Testing reply cache...")
+    cache = ResponseCache(max_entries=2, ttl=60)
+    a, b, c = (cache_key("gemini", "m", q) for q in ("a", "b", "c"))
+    assert cache_key("gemini", "m", "  What can you DO?") == cache_key("gemini", "m", "what can you do")
+    assert cache_key("gemini", "m", "a") != cache_key("groq", "m", "a")
+    files = [{"name": "x.txt", "type": "text/plain", "content": "aGk="}]
+    renamed = [{"name": "y.txt", "type": "text/plain", "content": "aGk="}]
+    assert cache_key("gemini", "m", "a", files) == cache_key("gemini", "m", "a", renamed) != a
+
+    cache.put(a, "A")
+    cache.put(b, "B")
+    assert cache.get(a) == "A"  # a is now the most recently used
+    cache.put(c, "C")
+    assert cache.get(b) is None and cache.get(a) == "A" and cache.get(c) == "C"
+    assert cache.stats["hits"] == 3 and cache.stats["misses"] == 1
+
+    cache.ttl = 0
+    assert cache.get(a) is None
+
+    # The disk tier survives a restart, bounded to its own size
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "ai_cache.db"
+        first = ResponseCache(max_entries=2, ttl=60, path=path, max_disk_entries=2)
+        for k, v in ((a, "A"), (b, "B"), (c, "C")):
+            first.put(k, v)
+        first.close()
+        second = ResponseCache(max_entries=2, ttl=60, path=path, max_disk_entries=2)
+        assert second.get(c) == "C" and second.get(a) is None
+        assert second.stats["disk_hits"] == 1
+        second.close()
+    print("Reply cache OK.")
+
+
+def test_chat_uses_cache():
+    calls = []
+
+    def gemini(message, files=None, **kwargs):
+        calls.append(message)
+        return "down" if message == "fail" else f"answer to {message}"
+
+    cache = ResponseCache(max_entries=8, ttl=60)
+    with _Providers(gemini, None, cache=cache):
+        ai_chat.GROQ_API_KEY = ""
+        assert ai_chat.chat_with_ai("What can you do?") == "answer to What can you do?"
+        assert ai_chat.chat_with_ai("what can you do") == "answer to What can you do?"
+        assert len(calls) == 1
+        ai_chat.chat_with_ai("what can you do", use_cache=False)
+        assert len(calls) == 2
+
+        # Failures are not remembered
+        gemini_failed = lambda message, files=None, **kwargs: calls.append(message) or "All AI models failed.\nDetails:"
+        ai_chat._chat_with_gemini = gemini_failed
+        ai_chat.chat_with_ai("fail")
+        ai_chat.chat_with_ai("fail")
+        assert calls[-2:] == ["fail", "fail"]
+    assert cache.stats["hits"] == 1
+
+
+def _docx(body: str) -> str:
+    xml = ('<?xml version="1.0" encoding="UTF-8"?>'
+           '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+           f'<w:body>{body}</w:body></w:document>')
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("word/document.xml", xml)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _tree_text(data: str) -> str:
+    # The old whole-tree extraction, as the reference output
+    with zipfile.ZipFile(io.BytesIO(base64.b64decode(data))) as z:
+        tree = ET.fromstring(z.read("word/document.xml"))
+    parts = []
+    for node in tree.iter():
+        if node.tag == f"{ai_chat.W_NS}t" and node.text:
+            parts.append(node.text)
+        elif node.tag == f"{ai_chat.W_NS}p":
+            parts.append("\n")
+    return "".join(parts).strip()
+
+
+def test_docx_extraction():
+    print("Testing DOCX extraction...")
+    body = ('<w:p><w:r><w:t>Title</w:t></w:r></w:p>'
+            '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>cell </w:t></w:r><w:r><w:t>one</w:t></w:r></w:p></w:tc>'
+            '<w:tc><w:p><w:r><w:t>cell two</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+            '<w:p><w:r><w:t>Before </w:t></w:r><w:r><w:pict><w:p><w:r><w:t>boxed</w:t></w:r></w:p></w:pict></w:r>'
+            '<w:r><w:t> after</w:t></w:r></w:p><w:p/>')
+    data = _docx(body)
+    text = ai_chat._extract_text_from_file(data, "", "spec.docx")
+    assert text == _tree_text(data) == "Title\ncell one\ncell two\nBefore \nboxed after"
+
+    # Memory stays flat: a long document costs about its text, not its tree
+    big = _docx("".join(f"<w:p><w:r><w:rPr><w:b/></w:rPr><w:t>Paragraph {i}</w:t></w:r></w:p>" for i in range(100_000)))
+    tracemalloc.start()
+    text = ai_chat._extract_text_from_file(big, "", "big.docx")
+    streamed = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    assert _tree_text(big) == text
+    whole = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"100k paragraphs: peak {streamed / 2**20:.1f} MB streamed vs {whole / 2**20:.1f} MB whole tree")
+    assert streamed * 3 < whole
+    print("DOCX extraction OK.")
+
+
+def test_extraction_once_per_content():
+    extracted = []
+    real = ai_chat._extract_text_from_file
+
+    def counting(data, mime_type, filename):
+        extracted.append(filename)
+        return real(data, mime_type, filename)
+
+    def post_json(url, payload):
+        raise urllib.error.HTTPError(url, 503, "busy", None, io.BytesIO(b"{}"))
+
+    saved = (ai_chat._extract_text_from_file, ai_chat.post_json, ai_chat.GEMINI_API_KEY, ai_chat.GROQ_API_KEY)
+    ai_chat._extract_text_from_file, ai_chat.post_json = counting, post_json
+    ai_chat.GEMINI_API_KEY, ai_chat.GROQ_API_KEY = "test", ""
+    ai_chat._extracted.clear()
+    with _Providers(ai_chat._chat_with_gemini, None):
+        ai_chat.GROQ_API_KEY = ""
+        try:
+            doc = {"name": "notes.docx", "type": "", "content": _docx("<w:p><w:r><w:t>hi</w:t></w:r></w:p>")}
+            # Every model fails, yet the file is extracted once; a later request re-uses it by content
+            assert ai_chat.chat_with_ai("summarize", [doc]).startswith("All AI models failed.")
+            ai_chat.chat_with_ai("summarize again", [dict(doc, name="copy.docx")])
+            assert extracted == ["notes.docx"]
+        finally:
+            ai_chat._extract_text_from_file, ai_chat.post_json, ai_chat.GEMINI_API_KEY, ai_chat.GROQ_API_KEY = saved
+            ai_chat._extracted.clear()
+
+
+def test_failed_extractions_are_bounded():
+    saved = ai_chat.EXTRACT_CACHE_ENTRIES
+    ai_chat.EXTRACT_CACHE_ENTRIES = 4
+    ai_chat._extracted.clear()
+    try:
+        # Unreadable files keep no text, yet each takes an entry: the count bound drops the oldest
+        for i in range(10):
+            content = base64.b64encode(f"not a zip {i}".encode()).decode("ascii")
+            assert ai_chat._extract_cached(content, "", "broken.docx") is None
+        assert len(ai_chat._extracted) == 4
+    finally:
+        ai_chat.EXTRACT_CACHE_ENTRIES = saved
+        ai_chat._extracted.clear()
+
+
+if __name__ == "__main__":
+    test_hedged_race()
+    test_streaming_fallback()
+    test_response_cache()
+    test_chat_uses_cache()
+    test_docx_extraction()
+    test_extraction_once_per_content()
+    test_failed_extractions_are_bounded()
+    print("AI chat tests passed.")
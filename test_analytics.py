@@ -0,0 +1,171 @@
+import sys
+import os
+import random
+import tempfile
+from datetime import date
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+import engine.analytics as analytics
+import engine.analysis as analysis_module
+from engine import engine as engine_module, storage
+from engine.analytics import calculate_critical_path, critical_path_analysis, diagnose_project
+from engine.scheduler import DependencyCycleError
+from engine.analysis import analyze, forget, task_changed
+
+
+class _TempStore:
+    """Points the engine at a throwaway JsonStore (history off), so data/ is left alone."""
+
+    def __enter__(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.saved = storage._store, engine_module.HISTORY_ENABLED
+        storage._store = storage.JsonStore(Path(self.dir.name) / "projects.json")
+        engine_module.HISTORY_ENABLED = False
+
+    def __exit__(self, *exc):
+        storage._store, engine_module.HISTORY_ENABLED = self.saved
+        self.dir.cleanup()
+
+
+def _reference_cpm(tasks):
+    # Straightforward fixed-point CPM to compare against
+    by_id = {}
+    for t in tasks:
+        by_id.setdefault(t["id"], t)
+    dur = {tid: t.get("duration_days", 1) + t.get("delay_days", 0) for tid, t in by_id.items()}
+    deps = {tid: [d for d in t.get("depends_on", []) if d in by_id] for tid, t in by_id.items()}
+    ef = {}
+    while len(ef) < len(by_id):
+        for tid in by_id:
+            if tid not in ef and all(d in ef for d in deps[tid]):
+                ef[tid] = max((ef[d] for d in deps[tid]), default=0) + dur[tid]
+    end = max(ef.values())
+    ls = {}
+    while len(ls) < len(by_id):
+        for tid in by_id:
+            succ = [s for s in by_id if tid in deps[s]]
+            if tid not in ls and all(s in ls for s in succ):
+                ls[tid] = min((ls[s] for s in succ), default=end) - dur[tid]
+    return {tid: ls[tid] - (ef[tid] - dur[tid]) for tid in by_id}, end
+
+
+def _random_plan(rng, n):
+    tasks = [{"id": f"t{i}", "duration_days": rng.randint(1, 5),
+              "depends_on": [f"t{j}" for j in rng.sample(range(i), min(i, rng.randint(0, 3)))]}
+             for i in range(n)]
+    tasks[-1]["depends_on"].append("ghost")  # unknown ids are ignored
+    rng.shuffle(tasks)
+    return tasks
+
+
+def test_matches_reference_on_random_plans():
+    print("Testing vectorized critical path...")
+    rng = random.Random(3)
+    wide = analytics._WIDE_LEVEL
+    try:
+        for level in (wide, 2):  # narrow (scalar) and wide (array) level handling
+            analytics._WIDE_LEVEL = level
+            for _ in range(50):
+                tasks = _random_plan(rng, rng.randint(1, 40))
+                slack, end = _reference_cpm(tasks)
+                result = critical_path_analysis(tasks)
+                assert result["duration"] == end
+                assert [int(s) for s in result["slack"]] == [slack[t["id"]] for t in tasks]
+    finally:
+        analytics._WIDE_LEVEL = wide
+    print("Critical path OK.")
+
+
+def test_critical_path_and_cycles():
+    tasks = [
+        {"id": "c", "duration_days": 1, "depends_on": ["b"]},
+        {"id": "a", "duration_days": 1, "depends_on": []},
+        {"id": "d", "duration_days": 1, "depends_on": []},
+        {"id": "b", "duration_days": 1, "depends_on": ["a"]},
+    ]
+    assert calculate_critical_path(tasks) == ["c", "a", "b"]
+
+    tasks[1]["depends_on"] = ["c"]
+    try:
+        calculate_critical_path(tasks)
+        assert False, "cycle not detected"
+    except DependencyCycleError as e:
+        assert set(e.cycle) == {"a", "b", "c"}
+    diags = diagnose_project({"tasks": tasks})
+    assert "cycle" in diags[0].lower()
+
+
+def test_analysis_is_shared_until_the_plan_changes():
+    print("Testing shared analysis cache...")
+    project = {"id": "analysis-test", "deadline": "2099-01-01", "tasks": [
+        {"id": "t1", "name": "A", "duration_days": 2, "depends_on": []},
+        {"id": "t2", "name": "B", "duration_days": 1, "depends_on": ["t1"]},
+        {"id": "t3", "name": "C", "duration_days": 1, "depends_on": []},
+    ]}
+    forget(project["id"])
+    calls = []
+    real = analytics.critical_path_analysis
+    analysis_module.critical_path_analysis = lambda tasks: calls.append(1) or real(tasks)
+    try:
+        first = analyze(project)
+        assert first.critical_path == ["t1", "t2"]
+        assert first.slack["t3"] == 2
+        # Same content (even as a freshly loaded copy) -> same object, nothing recomputed
+        copy = {**project, "tasks": [dict(t) for t in project["tasks"]]}
+        assert analyze(copy) is first
+        assert analyze(project).critical_path == ["t1", "t2"]
+        assert len(calls) == 1
+
+        # An in-place edit changes the content hash
+        project["tasks"][2]["delay_days"] = 3
+        task_changed(project["id"], "t3")
+        second = analyze(project)
+        assert second is not first
+        assert second.critical_path == ["t3"]
+        assert len(calls) == 2
+    finally:
+        analysis_module.critical_path_analysis = real
+        forget(project["id"])
+    print("Shared analysis OK.")
+
+
+def test_stored_plan_is_not_rehashed():
+    print("Testing version-keyed analysis...")
+    from engine.engine import compute_schedule, create_project, delay_task, get_active_project, save_tasks
+    from engine.scheduler import IncrementalSchedule, schedule_tasks
+    with _TempStore():
+        pid = create_project("Version Test")["id"]
+        save_tasks(pid, [{"id": f"t{i}", "name": f"T{i}", "duration_days": 1,
+                          "depends_on": [f"t{i - 1}"] if i else []} for i in range(200)])
+        hashed, synced = [], []
+        real_key, real_sync = analysis_module.content_key, IncrementalSchedule.sync
+        analysis_module.content_key = lambda project: hashed.append(1) or real_key(project)
+        IncrementalSchedule.sync = lambda self, tasks: synced.append(1) or real_sync(self, tasks)
+        try:
+            first = analyze(get_active_project())
+            first.rows(date.today())
+            # Unchanged: the same analysis, found without hashing the plan
+            assert analyze(get_active_project()) is first
+            # One delay: a new analysis on the patched schedule, still no hash and no full re-sync
+            delay_task("t150", 2)
+            project = get_active_project()
+            second = analyze(project)
+            assert second is not first
+            assert compute_schedule(project) == schedule_tasks(project["tasks"], date.today())[0]
+            assert hashed == [] and synced == []
+            # A copy that isn't the store's is matched by content instead
+            analyze({**project, "tasks": [dict(t) for t in project["tasks"]]})
+            assert len(hashed) == 1
+        finally:
+            analysis_module.content_key, IncrementalSchedule.sync = real_key, real_sync
+            forget(pid)
+    print("Version-keyed analysis OK.")
+
+
+if __name__ == "__main__":
+    test_matches_reference_on_random_plans()
+    test_critical_path_and_cycles()
+    test_analysis_is_shared_until_the_plan_changes()
+    test_stored_plan_is_not_rehashed()
+    print("Analytics tests passed.")
@@ -0,0 +1,101 @@
+import sys
+import os
+import random
+import time
+from datetime import date, timedelta
+sys.path.append(os.getcwd())
+
+from engine.calendars import WorkCalendar, calendar_for, parse_weekmask
+from engine.scheduler import IncrementalSchedule, schedule_tasks
+from engine.risk import deadline_risk
+from engine.analysis import analyze, forget
+
+
+def test_table_matches_day_by_day_walk():
+    print("Testing working-day table...")
+    assert parse_weekmask("mon-fri") == parse_weekmask("1111100") == parse_weekmask("weekdays")
+    assert parse_weekmask("fri-mon") == (True, False, False, False, True, True, True)
+    for bad in ("0000000", "funday"):
+        try:
+            parse_weekmask(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    rng = random.Random(5)
+    for _ in range(100):
+        mask = [rng.random() < 0.6 for _ in range(7)]
+        if not any(mask):
+            continue
+        holidays = [date(2026, 1, 1) + timedelta(days=rng.randint(0, 500)) for _ in range(15)]
+        cal = WorkCalendar(mask, holidays)
+        start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 60))
+        walk, day = [], start
+        while len(walk) < 400:
+            if cal.is_working(day):
+                walk.append(day)
+            day += timedelta(days=1)
+        assert [cal.date(start, k) for k in range(400)] == walk
+        for k in range(0, 400, 13):
+            assert cal.offset(start, walk[k]) == k
+    print("Working-day table OK.")
+
+
+def test_schedule_skips_weekends_and_holidays():
+    tasks = [
+        {"id": "t1", "name": "Scope", "duration_days": 2, "depends_on": []},
+        {"id": "t2", "name": "Build", "duration_days": 3, "depends_on": ["t1"]},
+        {"id": "t3", "name": "Ship", "duration_days": 1, "depends_on": ["t2"]},
+    ]
+    cal = WorkCalendar("mon-fri", ["2026-01-13"])
+    start = date(2026, 1, 8)  # a Thursday
+    rows, finish = schedule_tasks(tasks, start, cal)
+    assert [(r["start"], r["end"]) for r in rows] == [
+        ("2026-01-08", "2026-01-09"), ("2026-01-12", "2026-01-15"), ("2026-01-16", "2026-01-16")]
+    assert finish == "2026-01-16"
+
+    # The cached schedule renders the same dates, and re-renders when the calendar changes
+    sched = IncrementalSchedule(tasks)
+    assert sched.rows(start, cal) == rows
+    assert sched.finish_date(start) == schedule_tasks(tasks, start)[1] == "2026-01-13"
+    tasks[0]["delay_days"] = 20
+    sched.task_changed("t1")
+    assert sched.rows(start, cal) == schedule_tasks(tasks, start, cal)[0]
+
+    # Project calendars flow into status and risk
+    project = {"id": "calendar-test", "deadline": "2026-01-16", "tasks": tasks[:]}
+    project["tasks"][0] = {**tasks[0], "delay_days": 0}
+    forget(project["id"])
+    assert analyze(project).status(start)["status"] == "on-track"
+    project["calendar"] = {"weekmask": "mon-fri", "holidays": ["2026-01-13", "2026-01-16"]}
+    assert calendar_for(project) == WorkCalendar("1111100", ["2026-01-16", "2026-01-13"])
+    assert analyze(project).status(start)["status"] == "off-track"
+    forget(project["id"])
+
+    risk = deadline_risk(project["tasks"], start, "2026-01-19", runs=500, seed=1,
+                         calendar=calendar_for(project))
+    assert cal.is_working(date.fromisoformat(risk["p50"]))
+    assert 0 < risk["p_on_time"] < 1
+
+
+def test_calendar_costs_about_the_same():
+    print("Timing 100k tasks, calendar days vs working days...")
+    rng = random.Random(1)
+    tasks = [{"id": f"t{i}", "duration_days": rng.randint(1, 5),
+              "depends_on": [f"t{j}" for j in rng.sample(range(max(i - 50, 0), i), min(i, 2))]}
+             for i in range(100_000)]
+    cal = WorkCalendar("mon-fri", ["2026-12-24", "2026-12-25", "2026-12-31"])
+    timings = []
+    for c in (WorkCalendar(), cal):
+        started = time.perf_counter()
+        schedule_tasks(tasks, date(2026, 10, 19), c)
+        timings.append(time.perf_counter() - started)
+    print(f"every day: {timings[0]:.2f}s, mon-fri + holidays: {timings[1]:.2f}s")
+    assert timings[1] < 2 * timings[0] + 0.1
+
+
+if __name__ == "__main__":
+    test_table_matches_day_by_day_walk()
+    test_schedule_skips_weekends_and_holidays()
+    test_calendar_costs_about_the_same()
+    print("Calendar tests passed.")
@@ -0,0 +1,100 @@
+import sys
+import os
+import io
+import urllib.error
+from email.message import Message
+sys.path.append(os.getcwd())
+
+import engine.ai_chat as ai_chat
+from engine.circuit_breaker import CircuitBreaker, retry_after_seconds, CLOSED, OPEN, HALF_OPEN
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_states():
+    print("Testing model circuit breaker...")
+    clock = _Clock()
+    b = CircuitBreaker(window=60, min_calls=3, failure_rate=0.5, cooldown=30, max_cooldown=100, clock=clock)
+    models = ["a", "b", "c"]
+
+    # Failure rate: one bad call in three keeps it closed, two in four opens it
+    b.record_success("a")
+    b.record_failure("a", 503)
+    b.record_success("a")
+    assert b.state("a") == CLOSED
+    b.record_failure("a", 503)
+    assert b.state("a") == OPEN and b.order(models) == ["b", "c"]
+
+    # 404 opens at once; a 429 opens for exactly as long as the server asked
+    b.record_failure("b", 404)
+    b.record_failure("c", 429, retry_after=10)
+    assert b.state("b") == OPEN and b.state("c") == OPEN
+    assert b.order(models) == ["c"]  # all open: the one back soonest still gets a try
+    clock.now += 11
+    assert b.state("c") == HALF_OPEN and b.order(models) == ["c"]
+
+    # Half-open: a success closes it, a failure re-opens it for twice as long
+    b.record_success("c")
+    assert b.state("c") == CLOSED
+    clock.now += 20  # a reopens (30 s cooldown)
+    assert b.state("a") == HALF_OPEN and b.order(models) == ["a", "c"]
+    b.record_failure("a", 503)
+    assert b.state("a") == OPEN
+    clock.now += 59
+    assert b.state("a") == OPEN
+    clock.now += 2
+    assert b.state("a") == HALF_OPEN
+    assert b.snapshot["b"]["state"] == OPEN and b.snapshot["b"]["reopens_in"] > 0
+    print("Circuit breaker OK.")
+
+
+def test_retry_after_parsing():
+    headers = Message()
+    headers["Retry-After"] = "12"
+    assert retry_after_seconds(headers) == 12.0
+    headers.replace_header("Retry-After", "Wed, 21 Oct 2015 07:28:00 GMT")
+    assert retry_after_seconds(headers) == 0.0  # a date in the past
+    body = '{"error": {"code": 429, "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "37s"}]}}'
+    assert retry_after_seconds(Message(), body) == 37.0
+    assert retry_after_seconds(None, "") is None
+
+
+def test_chain_skips_unhealthy_models():
+    calls = []
+
+    def post_json(url, payload):
+        model = url.split("/models/")[1].split(":")[0]
+        calls.append(model)
+        if model != "gemini-2.0-flash":
+            headers = Message()
+            headers["Retry-After"] = "600"
+            code = 404 if model == "gemini-2.5-flash" else 429
+            raise urllib.error.HTTPError(url, code, "error", headers, io.BytesIO(b"{}"))
+        return {"candidates": [{"content": {"parts": [{"text": "ok"}]}}]}
+
+    saved = (ai_chat.post_json, ai_chat._breaker, ai_chat.GEMINI_API_KEY, ai_chat.GROQ_API_KEY, ai_chat.GEMINI_MODEL)
+    ai_chat.post_json, ai_chat._breaker = post_json, CircuitBreaker()
+    ai_chat.GEMINI_API_KEY, ai_chat.GROQ_API_KEY, ai_chat.GEMINI_MODEL = "test", "", "gemini-2.5-flash"
+    try:
+        # First request walks the chain (a 429 asking for 10 minutes isn't waited out)
+        assert ai_chat._chat_with_gemini("hi") == "ok"
+        assert calls == ["gemini-2.5-flash", "gemini-2.0-flash-lite-001", "gemini-2.0-flash"]
+        # The next one goes straight to the healthy model
+        calls.clear()
+        assert ai_chat._chat_with_gemini("hi") == "ok"
+        assert calls == ["gemini-2.0-flash"]
+    finally:
+        ai_chat.post_json, ai_chat._breaker, ai_chat.GEMINI_API_KEY, ai_chat.GROQ_API_KEY, ai_chat.GEMINI_MODEL = saved
+
+
+if __name__ == "__main__":
+    test_breaker_states()
+    test_retry_after_parsing()
+    test_chain_skips_unhealthy_models()
+    print("Circuit breaker tests passed.")
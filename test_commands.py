@@ -0,0 +1,120 @@
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+import main
+from main import handle_command
+from engine import engine as engine_module, storage
+from engine.engine import create_project, get_active_project, save_tasks
+
+
+class _NoAI:
+    """Answers chat locally, so tests see which messages fall through to the AI."""
+
+    def __enter__(self):
+        self.saved = main.chat_with_ai
+        main.chat_with_ai = lambda text, files=None, **kwargs: f"AI: {text}"
+
+    def __exit__(self, *exc):
+        main.chat_with_ai = self.saved
+
+
+class _TempStore:
+    """Points the engine at a throwaway JsonStore (history off), so data/ is left alone."""
+
+    def __enter__(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.saved = storage._store, engine_module.HISTORY_ENABLED
+        storage._store = storage.JsonStore(Path(self.dir.name) / "projects.json")
+        engine_module.HISTORY_ENABLED = False
+
+    def __exit__(self, *exc):
+        storage._store, engine_module.HISTORY_ENABLED = self.saved
+        self.dir.cleanup()
+
+
+def test_team_commands():
+    print("Testing team commands...")
+    create_project("Command Test")
+    with _NoAI():
+        for chat in ("team of 5 engineers", "teamwork tips for 3 people", "teammates are slow", "team of 5"):
+            assert handle_command(chat) == f"AI: {chat}", chat
+        p = get_active_project()
+        assert "team" not in p and "team_size" not in p
+
+        assert handle_command("Team 3").startswith("Team set to 3 people")
+        assert handle_command("team frontend 2 backend 1") == "Team set: 2 frontend, 1 backend."
+        p = get_active_project()
+        assert p["team_size"] == 3 and p["team"] == {"frontend": 2, "backend": 1}
+    print("Team commands OK.")
+
+
+def test_calendar_commands():
+    print("Testing calendar commands...")
+    create_project("Calendar Test")
+    with _NoAI():
+        for chat in ("calendar for next week?", "holiday ideas for the team", "holidays are coming"):
+            assert handle_command(chat) == f"AI: {chat}", chat
+        # A bare "calendar" shows the calendar and changes nothing
+        assert handle_command("calendar").startswith("Working days: Mon, Tue, Wed, Thu, Fri, Sat, Sun.")
+        assert "calendar" not in get_active_project()
+
+        assert handle_command("Calendar mon-thu").startswith("Working week set to mon-thu")
+        assert handle_command("holiday 2026-12-25 and 2026-12-26").startswith("Added 2 holiday(s)")
+        assert get_active_project()["calendar"] == {"weekmask": "1111000", "holidays": ["2026-12-25", "2026-12-26"]}
+        assert "Holidays: 2026-12-25, 2026-12-26" in handle_command("calendar")
+        assert handle_command("holiday 2026-13-01").startswith("Can't set the calendar.")
+    print("Calendar commands OK.")
+
+
+def test_status_risk_threshold():
+    print("Testing status risk threshold...")
+    p = create_project("Risk Status Test")
+    save_tasks(p["id"], [{"id": "t1", "name": "Build", "duration_days": 3, "depends_on": []}])
+    saved = main.RISK_INLINE_MAX_TASKS
+    try:
+        assert "Risk (" in handle_command("status")
+        # Above the threshold plain "status" skips the simulation; "status risk" still runs it
+        main.RISK_INLINE_MAX_TASKS = 0
+        assert "Risk (" not in handle_command("status")
+        assert "Risk (" in handle_command("status risk")
+    finally:
+        main.RISK_INLINE_MAX_TASKS = saved
+    print("Status risk threshold OK.")
+
+
+def test_status_with_a_non_iso_deadline():
+    print("Testing status with a free-text deadline...")
+    with _TempStore():
+        p = create_project("Loose Deadline Test", deadline_iso="next friday")
+        save_tasks(p["id"], [{"id": "t1", "name": "Build", "duration_days": 3, "depends_on": []}])
+        reply = handle_command("status")
+        # Risk still runs, just without an on-time probability
+        assert "Risk (" in reply and "chance of meeting the deadline" not in reply, reply
+    print("Free-text deadline OK.")
+
+
+def test_cache_bypass_reaches_the_ai():
+    seen = []
+    saved = main.chat_with_ai, main.stream_chat_with_ai
+    main.chat_with_ai = lambda text, files=None, **kwargs: seen.append(kwargs.get("use_cache")) or "ok"
+    main.stream_chat_with_ai = lambda text, files=None, **kwargs: seen.append(kwargs.get("use_cache")) or iter(["ok"])
+    try:
+        handle_command("tell me a joke")
+        handle_command("tell me a joke", use_cache=False)
+        handle_command("tell me a joke", stream=True, use_cache=False)
+        handle_command("summarize", files=[{"name": "a.txt", "type": "text/plain", "content": "aGk="}], use_cache=False)
+    finally:
+        main.chat_with_ai, main.stream_chat_with_ai = saved
+    assert seen == [True, False, False, False]
+
+
+if __name__ == "__main__":
+    test_team_commands()
+    test_calendar_commands()
+    test_status_risk_threshold()
+    test_status_with_a_non_iso_deadline()
+    test_cache_bypass_reaches_the_ai()
+    print("Command tests passed.")
@@ -9,11 +9,11 @@ def test_doctor():
     print("Testing Project Doctor 🩺...")
     
     # 1. Create a healthy project
-    t1 = Task(id="t1", name="Scope", duration_days=1, status="done")
-    t2 = Task(id="t2", name="Design", duration_days=2, depends_on=["t1"], status="pending")
+    t1 = Task(id="t1", name="Scope", duration_days=1, status="done", extra={"role": "pm"})
+    t2 = Task(id="t2", name="Design", duration_days=2, depends_on=["t1"], status="pending", extra={"role": "designer"})
     p_healthy = Project(id="p1", name="Healthy Project", tasks=[t1, t2])
     
-    diags = diagnose_project(p_healthy.__dict__)
+    diags = diagnose_project(p_healthy)
     print(f"\n[Healthy Project]: {diags[0]}")
     assert "healthy" in diags[0].lower()
 
@@ -22,7 +22,7 @@ def test_doctor():
     t3 = Task(id="t3", name="Critical Task", duration_days=2, delay_days=5, status="pending")
     p_sick = Project(id="p2", name="Sick Project", tasks=[t3])
     
-    diags_sick = diagnose_project(p_sick.__dict__)
+    diags_sick = diagnose_project(p_sick)
     print(f"\n[Sick Project]:")
     for d in diags_sick:
         print(f"- {d}")
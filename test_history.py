@@ -0,0 +1,120 @@
+import sys
+import os
+import json
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+from engine.history import TaskHistory
+
+
+def _ts(day, hour=12):
+    return datetime(day.year, day.month, day.day, hour).timestamp()
+
+
+def _plan():
+    return [{"id": f"t{i}", "name": f"Task {i}", "duration_days": 2, "depends_on": [], "status": "pending",
+             "delay_days": 0} for i in range(1, 5)]
+
+
+def test_events_and_time_travel():
+    print("Testing task history...")
+    d0 = date(2026, 3, 2)
+    with tempfile.TemporaryDirectory() as d:
+        h = TaskHistory(Path(d) / "p1", snapshot_every=3)
+        h.start([], ts=_ts(d0, 9))
+        tasks = _plan()
+        h.record(tasks, replaced=True, ts=_ts(d0, 10))
+
+        tasks[0] = {**tasks[0], "status": "done"}
+        events = h.record([tasks[0]], ts=_ts(d0 + timedelta(days=1)))
+        assert [(e["t"], e["f"], e["o"], e["n"]) for e in events] == [("t1", "status", "pending", "done")]
+        assert h.record([tasks[0]], ts=_ts(d0 + timedelta(days=1))) == []  # nothing changed
+
+        tasks[1] = {**tasks[1], "delay_days": 3}
+        h.record([tasks[1]], ts=_ts(d0 + timedelta(days=2)))
+        tasks[1] = {**tasks[1], "status": "done"}
+        h.record([tasks[1]], ts=_ts(d0 + timedelta(days=3)))
+        h.record(tasks[:3], replaced=True, ts=_ts(d0 + timedelta(days=4)))  # t4 cut from the plan
+
+        assert h.state_at(_ts(d0, 8)) is None
+        assert h.state_at(_ts(d0, 9)) == []
+        day2 = {t["id"]: t for t in h.state_at(_ts(d0 + timedelta(days=2), 23))}
+        assert day2["t1"]["status"] == "done" and day2["t2"]["delay_days"] == 3 and day2["t2"]["status"] == "pending"
+        assert [t["id"] for t in h.state_at(time.time())] == ["t1", "t2", "t3"]
+
+        # Snapshots were taken along the way; a second reader sees the same thing
+        assert len(h._load_index()) > 2
+        other = TaskHistory(Path(d) / "p1")
+        assert other.state_at(time.time()) == h.state_at(time.time())
+        other.record([{**tasks[2], "status": "done"}], ts=_ts(d0 + timedelta(days=5)))
+        assert h.record([{**tasks[2], "status": "done"}], ts=_ts(d0 + timedelta(days=5))) == []
+
+        series = h.series(d0 - timedelta(days=1), d0 + timedelta(days=5))
+        assert [r["date"] for r in series][0] == d0.isoformat()  # nothing before the history started
+        assert [r["remaining_days"] for r in series] == [8, 6, 9, 4, 2, 0]
+        assert [r["completed_days"] for r in series] == [0, 2, 0, 5, 0, 2]
+        assert [r["done"] for r in series] == [0, 1, 1, 2, 2, 3]
+    print("Task history OK.")
+
+
+def test_lookups_read_only_a_short_tail():
+    print("Timing as-of lookups over a long history...")
+    with tempfile.TemporaryDirectory() as d:
+        h = TaskHistory(Path(d) / "p1", snapshot_every=200)
+        tasks = [{"id": f"t{i}", "duration_days": 1, "delay_days": 0} for i in range(200)]
+        start = _ts(date(2025, 1, 1))
+        h.start(tasks, ts=start)
+        for k in range(20_000):
+            i = k % 200
+            tasks[i] = {**tasks[i], "delay_days": tasks[i]["delay_days"] + 1}
+            h.record([tasks[i]], ts=start + k * 60)
+
+        # Each lookup replays at most one snapshot interval of events
+        replayed = []
+        events = h._events
+
+        def counting(offset):
+            for e in events(offset):
+                replayed.append(e["seq"])
+                yield e
+
+        h._events = counting
+        started = time.perf_counter()
+        for k in range(0, 20_000, 1000):
+            state = h.state_at(start + k * 60)
+            assert sum(t["delay_days"] for t in state) == k + 1
+        elapsed = time.perf_counter() - started
+        print(f"20 lookups over 20k events: {elapsed * 1000:.0f} ms, {len(replayed)} events replayed")
+        assert len(replayed) <= 20 * (200 + 1)
+
+        lines = (Path(d) / "p1" / "events.jsonl").read_text().splitlines()
+        assert len(lines) == 20_000 and json.loads(lines[0])["f"] == "delay_days"
+    print("History lookups OK.")
+
+
+def test_mutations_do_not_reload_the_project():
+    import engine.engine as engine
+    p = engine.create_project("History Test")
+    loads = []
+    real = engine.load_project
+    engine.load_project = lambda pid: loads.append(pid) or real(pid)
+    try:
+        engine.save_tasks(p["id"], _plan())
+        engine.mark_task_done("t1")
+        engine.delay_task("t2", 1)
+        assert loads == []  # the history was started (empty) by create_project
+    finally:
+        engine.load_project = real
+    # ...and the changes were still recorded
+    today = {t["id"]: t for t in engine.as_of(p["id"], date.today())}
+    assert today["t1"]["status"] == "done" and today["t2"]["delay_days"] == 1
+
+
+if __name__ == "__main__":
+    test_events_and_time_travel()
+    test_lookups_read_only_a_short_tail()
+    test_mutations_do_not_reload_the_project()
+    print("History tests passed.")
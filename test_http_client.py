@@ -0,0 +1,144 @@
+import sys
+import os
+import json
+import socket
+import threading
+import time
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.getcwd())
+
+from engine import http_client
+
+
+class _Echo(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = set()
+    first_seen = threading.Event()  # set by the client once it has the first streamed event
+    waited = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        _Echo.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if ":stream" in self.path:
+            return self.stream()
+        payload = json.loads(body)
+        if payload.get("sleep"):
+            time.sleep(payload["sleep"])
+        status = payload.get("status", 200)
+        out = json.dumps({"echo": payload}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def stream(self):
+        # A chunked server-sent-events stream that holds back the rest until the client has the first event
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(3):
+            event = f"data: {{\"n\": {i}}}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+            if i == 0 and _Echo.waited is None:
+                _Echo.waited = _Echo.first_seen.wait(5)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Echo)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/chat?key=x"
+
+
+def test_keep_alive_reuse():
+    print("Testing pooled keep-alive client...")
+    server, url = _server()
+    _Echo.connections.clear()
+    http_client._pool.clear()
+    try:
+        opened = http_client._pool.opened
+        for i in range(5):
+            assert http_client.post_json(url, {"n": i}) == {"echo": {"n": i}}
+        assert len(_Echo.connections) == 1
+        assert http_client._pool.opened == opened + 1
+
+        # Concurrent callers each get their own connection, then return it to the pool
+        threads = [threading.Thread(target=http_client.post_json, args=(url, {"sleep": 0.1})) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(_Echo.connections) <= 3
+
+        # Errors surface like urlopen's, with a readable body, and keep the connection
+        try:
+            http_client.post_json(url, {"status": 429})
+            assert False, "expected HTTPError"
+        except urllib.error.HTTPError as e:
+            assert e.code == 429 and "echo" in e.read().decode("utf-8")
+        assert http_client.post_json(url, {"n": 9}) == {"echo": {"n": 9}}
+    finally:
+        server.shutdown()
+        server.server_close()
+        http_client._pool.clear()
+    print("Keep-alive reuse OK.")
+
+
+def test_stale_connection_and_timeout():
+    server, url = _server()
+    http_client._pool.clear()
+    try:
+        http_client.post_json(url, {"n": 1})
+        # The server drops its side of the idle connection: the next call reconnects
+        for _, conn in http_client._pool._idle[http_client._split(url)[0]]:
+            conn.sock.shutdown(socket.SHUT_RDWR)
+        assert http_client.post_json(url, {"n": 2}) == {"echo": {"n": 2}}
+
+        # The server would answer after 2s; the read timeout gives up first
+        try:
+            http_client.post_json(url, {"sleep": 2}, read_timeout=0.2)
+            assert False, "expected a timeout"
+        except (TimeoutError, socket.timeout):
+            pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        http_client._pool.clear()
+
+
+def test_stream_events():
+    server, url = _server()
+    _Echo.connections.clear()
+    http_client._pool.clear()
+    url = url.replace("/v1/chat", "/v1/chat:stream")
+    _Echo.first_seen.clear()
+    _Echo.waited = None
+    try:
+        arrivals = []
+        for data in http_client.stream_events(url, {}):
+            arrivals.append(json.loads(data)["n"])
+            _Echo.first_seen.set()
+        assert arrivals == [0, 1, 2]
+        assert _Echo.waited is True  # the first event arrived before the server wrote the rest
+        # Read to the end: the connection goes back to the pool
+        assert len(list(http_client.stream_events(url, {}))) == 3
+        assert len(_Echo.connections) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        http_client._pool.clear()
+
+
+if __name__ == "__main__":
+    test_keep_alive_reuse()
+    test_stale_connection_and_timeout()
+    test_stream_events()
+    print("HTTP client tests passed.")
@@ -0,0 +1,95 @@
+import sys
+import os
+import gc
+import json
+import time
+import tempfile
+import tracemalloc
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+from engine.models import Project, Task, TaskTable
+from engine.analytics import critical_path_analysis
+from engine.storage import JsonStore
+
+
+def _task_dicts(n):
+    return [{"id": f"t{i}", "name": f"Task {i}", "duration_days": 1 + i % 4,
+             "depends_on": [f"t{i - 1}", f"t{i // 2}"] if i > 1 else [], "status": "pending", "delay_days": 0}
+            for i in range(n)]
+
+
+def _allocated(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def test_round_trip():
+    tasks = _task_dicts(5)
+    tasks[2]["role"] = "dev"
+    tasks[3]["depends_on"].append("ghost")
+    tasks[4]["status"] = "blocked"
+    project = {"id": "p1", "name": "P", "description": "", "deadline": None,
+               "created_at": "2026-01-01", "tasks": tasks, "owner": "me"}
+    assert Project.from_dict(project).to_dict() == project
+    assert Project.from_dict(project, columnar=True).to_dict() == project
+
+    t = Task.from_dict(tasks[2])
+    assert t["id"] == "t2" and t.get("role") == "dev" and t.get("priority") is None
+    assert {**t}["depends_on"] == ["t1", "t1"]
+    assert not hasattr(t, "__dict__")
+
+
+def test_memory_and_speed():
+    print("Measuring task model memory...")
+    n = 100_000
+    text = json.dumps(_task_dicts(n))
+
+    dicts, dict_bytes = _allocated(lambda: json.loads(text))
+    slotted, slotted_bytes = _allocated(lambda: [Task.from_dict(t) for t in json.loads(text)])
+    table, table_bytes = _allocated(lambda: TaskTable.from_dicts(json.loads(text)))
+    print(f"{n} tasks: dicts {dict_bytes / 1e6:.1f} MB, slotted Task {slotted_bytes / 1e6:.1f} MB, "
+          f"TaskTable {table_bytes / 1e6:.1f} MB")
+    assert slotted_bytes < dict_bytes
+    assert table_bytes * 3 < dict_bytes
+
+    # Same CPM answer, straight from the columns
+    started = time.perf_counter()
+    from_table = critical_path_analysis(table)
+    table_time = time.perf_counter() - started
+    started = time.perf_counter()
+    from_dicts = critical_path_analysis(dicts)
+    dict_time = time.perf_counter() - started
+    print(f"critical path: dicts {dict_time:.2f}s, TaskTable {table_time:.2f}s")
+    assert from_table["duration"] == from_dicts["duration"]
+    assert list(from_table["slack"]) == list(from_dicts["slack"])
+    print("Task models OK.")
+
+
+def test_load_data_memory():
+    print("Measuring a stored project's memory...")
+    n = 100_000
+    text = json.dumps({"active_project_id": "p1", "projects": [
+        {"id": "p1", "name": "Big", "deadline": None, "tasks": _task_dicts(n)}]})
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "projects.json"
+        path.write_text(text)
+
+        dicts, dict_bytes = _allocated(lambda: json.loads(text))
+        data, loaded_bytes = _allocated(lambda: JsonStore(path).load_data())
+        print(f"{n} tasks: json.loads {dict_bytes / 1e6:.1f} MB, load_data() {loaded_bytes / 1e6:.1f} MB")
+        tasks = data["projects"][0]["tasks"]
+        assert isinstance(data["projects"][0], Project) and isinstance(tasks[0], Task)
+        assert tasks == dicts["projects"][0]["tasks"]
+        assert loaded_bytes < dict_bytes
+    print("Stored project memory OK.")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_memory_and_speed()
+    test_load_data_memory()
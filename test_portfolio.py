@@ -0,0 +1,80 @@
+import sys
+import os
+import random
+import time
+from datetime import date
+sys.path.append(os.getcwd())
+
+from engine.portfolio import portfolio_status, format_portfolio
+
+
+def _project(rng, k, n):
+    tasks = [{"id": f"t{i}", "name": f"Task {i}", "duration_days": rng.randint(1, 5),
+              "depends_on": [f"t{j}" for j in rng.sample(range(i), min(i, 2))], "status": "pending"}
+             for i in range(n)]
+    return {"id": f"portfolio-{k}", "name": f"Project {k}",
+            "deadline": f"2026-{rng.randint(11, 12)}-{rng.randint(10, 28):02d}", "tasks": tasks}
+
+
+def test_ranked_rollup():
+    today = date(2026, 10, 19)
+    projects = [
+        {"id": "pf-a", "name": "A", "deadline": "2026-10-20", "tasks": [
+            {"id": "t1", "name": "Build", "duration_days": 5, "depends_on": []}]},
+        {"id": "pf-b", "name": "B", "deadline": "2026-10-30", "tasks": [
+            {"id": "t1", "name": "Build", "duration_days": 2, "depends_on": []}]},
+        {"id": "pf-c", "name": "C", "deadline": "2026-10-19", "tasks": [
+            {"id": "t1", "name": "Build", "duration_days": 20, "depends_on": []}]},
+        {"id": "pf-d", "name": "D", "tasks": [
+            {"id": "t1", "name": "Loop", "duration_days": 1, "depends_on": ["t2"]},
+            {"id": "t2", "name": "Loop", "duration_days": 1, "depends_on": ["t1"]}]},
+    ]
+    report = portfolio_status(projects, today, parallel=False)
+    assert [r["id"] for r in report["projects"]] == ["pf-c", "pf-a", "pf-d", "pf-b"]
+    assert [r["slip_days"] for r in report["projects"][:2]] == [19, 3]
+    assert report["counts"] == {"off-track": 2, "invalid": 1, "on-track": 1}
+    text = format_portfolio(report)
+    assert "C: 19 day(s) late" in text and "cycle" in text.lower() and "B:" not in text
+    # Status and doctor name the same cycle
+    loop = report["projects"][2]
+    assert "t1 -> t2 -> t1" in loop["message"] and "t1 -> t2 -> t1" in loop["issues"][0]
+
+
+def test_bad_deadline_spoils_only_its_row():
+    today = date(2026, 10, 19)
+    projects = [
+        {"id": "pf-ok", "name": "Fine", "deadline": "2026-10-30", "tasks": [
+            {"id": "t1", "name": "Build", "duration_days": 2, "depends_on": []}]},
+        {"id": "pf-bad", "name": "Bad", "deadline": "next friday", "tasks": [
+            {"id": "t1", "name": "Build", "duration_days": 2, "depends_on": []}]},
+    ]
+    report = portfolio_status(projects, today, parallel=False)
+    assert report["counts"] == {"invalid": 1, "on-track": 1}
+    bad = report["projects"][0]
+    assert bad["id"] == "pf-bad" and bad["slip_days"] is None
+    assert "Bad: Deadline 'next friday' is not a date" in format_portfolio(report)
+
+
+def test_pool_matches_single_process():
+    print("Testing portfolio rollup...")
+    rng = random.Random(4)
+    projects = [_project(rng, k, rng.randint(5, 60)) for k in range(300)]
+    today = date(2026, 10, 19)
+
+    started = time.perf_counter()
+    serial = portfolio_status(projects, today, parallel=False)
+    print(f"300 projects in one process: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    pooled = portfolio_status(projects, today, parallel=True)
+    assert pooled == serial
+    rows = serial["projects"]
+    late = [r["slip_days"] for r in rows if r["status"] == "off-track"]
+    assert late == sorted(late, reverse=True) and late
+    print("Portfolio rollup OK.")
+
+
+if __name__ == "__main__":
+    test_ranked_rollup()
+    test_bad_deadline_spoils_only_its_row()
+    test_pool_matches_single_process()
+    print("Portfolio tests passed.")
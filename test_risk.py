@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import random
+from datetime import date
+sys.path.append(os.getcwd())
+
+from engine.risk import deadline_risk, simulate
+from engine.scheduler import schedule_tasks
+
+
+def _plan():
+    return [
+        {"id": "t1", "name": "Scope", "duration_days": 2, "depends_on": [], "status": "done"},
+        {"id": "t2", "name": "Build", "duration_days": 5, "depends_on": ["t1"]},
+        {"id": "t3", "name": "Docs", "duration_days": 1, "depends_on": ["t1"]},
+        {"id": "t4", "name": "Ship", "duration_days": 1, "depends_on": ["t2", "t3"],
+         "optimistic_days": 1, "pessimistic_days": 4},
+    ]
+
+
+def test_zero_spread_matches_schedule():
+    tasks = _plan()
+    del tasks[3]["optimistic_days"], tasks[3]["pessimistic_days"]
+    sim = simulate(tasks, runs=200, seed=1, spread=0.0)
+    start = date(2026, 3, 2)
+    finish = schedule_tasks(tasks, start)[1]
+    assert {(start.toordinal() + int(f)) for f in sim["finish"]} == {date.fromisoformat(finish).toordinal()}
+    assert sim["criticality"].tolist() == [1.0, 1.0, 0.0, 1.0]
+
+
+def test_deadline_probability_and_criticality():
+    print("Testing deadline risk...")
+    start = date(2026, 3, 2)
+    tasks = _plan()
+    _, finish = schedule_tasks(tasks, start)
+    tight = deadline_risk(tasks, start, finish, seed=7)
+    loose = deadline_risk(tasks, start, "2026-12-31", seed=7)
+    print(tight)
+    assert 0.0 < tight["p_on_time"] < 1.0
+    assert loose["p_on_time"] == 1.0
+    assert tight["p50"] <= tight["p90"]
+    assert tight["criticality"]["t1"] == 1.0 and tight["criticality"]["t3"] == 0.0
+    # Same seed, same answer
+    assert deadline_risk(tasks, start, finish, seed=7) == tight
+    # A deadline that isn't a date counts as no deadline
+    assert deadline_risk(tasks, start, "next friday", seed=7)["p_on_time"] is None
+    print("Deadline risk OK.")
+
+
+def test_thousand_tasks_inline_speed():
+    rng = random.Random(5)
+    tasks = [{"id": f"t{i}", "duration_days": rng.randint(1, 5),
+              "depends_on": [f"t{j}" for j in rng.sample(range(max(0, i - 50), i), min(i, rng.randint(0, 3)))]}
+             for i in range(1000)]
+    simulate(tasks[:10], runs=10)  # builds the quantile table
+    started = time.perf_counter()
+    risk = deadline_risk(tasks, date(2026, 3, 2), "2026-12-31", runs=10_000, seed=1)
+    print(f"1000 tasks x 10000 runs: {time.perf_counter() - started:.2f}s")
+    assert risk["p50"] <= risk["p90"] and len(risk["criticality"]) == 1000
+
+
+if __name__ == "__main__":
+    test_zero_spread_matches_schedule()
+    test_deadline_probability_and_criticality()
+    test_thousand_tasks_inline_speed()
@@ -0,0 +1,180 @@
+import sys
+import os
+import random
+from datetime import date
+sys.path.append(os.getcwd())
+
+import copy
+from engine.scheduler import (
+    DependencyCycleError, IncrementalSchedule, ResourceSchedule, resource_schedule_offsets,
+    schedule_offsets, schedule_tasks, topological_order,
+)
+from engine.engine import compute_schedule, get_status
+
+
+def _plan():
+    return [
+        {"id": "t1", "name": "Scope", "duration_days": 1, "depends_on": []},
+        {"id": "t2", "name": "Design", "duration_days": 2, "depends_on": ["t1"]},
+        {"id": "t3", "name": "Build", "duration_days": 3, "depends_on": ["t2"], "delay_days": 1},
+        {"id": "t4", "name": "Docs", "duration_days": 1, "depends_on": ["t1"]},
+    ]
+
+
+def test_out_of_order_plan_matches_ordered_plan():
+    ordered = _plan()
+    shuffled = ordered[:]
+    random.Random(7).shuffle(shuffled)
+
+    start = date(2026, 1, 5)
+    a, finish_a = schedule_tasks(ordered, start)
+    b, finish_b = schedule_tasks(shuffled, start)
+    by_id = {t["id"]: (t["start"], t["end"]) for t in b}
+    assert [(t["start"], t["end"]) for t in a] == [by_id[t["id"]] for t in ordered]
+    assert a[2]["start"] == "2026-01-08" and a[2]["end"] == "2026-01-11"
+
+    # The finish is the latest end, not the end of whatever task happens to be last
+    assert finish_a == finish_b == "2026-01-11"
+    assert a[-1]["end"] == "2026-01-06"
+
+
+def test_status_uses_true_finish():
+    tasks = _plan()
+    tasks.append(tasks.pop(2))   # put the long task in the middle...
+    tasks.insert(1, tasks.pop()) # ...before its dependency
+    status = get_status({"tasks": tasks, "deadline": None})
+    assert status["status"] == "ok"
+    assert max(t["end"] for t in compute_schedule({"tasks": tasks})) in status["message"]
+
+
+def test_cycle_is_reported_with_path():
+    tasks = _plan() + [{"id": "t5", "name": "Loop", "duration_days": 1, "depends_on": ["t3"]}]
+    tasks[1]["depends_on"] = ["t1", "t5"]
+    try:
+        topological_order(tasks)
+        assert False, "cycle not detected"
+    except DependencyCycleError as e:
+        print(f"Detected: {e}")
+        assert e.cycle[0] == e.cycle[-1]
+        assert set(e.cycle) == {"t2", "t3", "t5"}
+
+    status = get_status({"tasks": tasks})
+    assert status["status"] == "invalid"
+    assert "cycle" in status["message"].lower()
+
+    try:
+        topological_order([{"id": "a", "depends_on": ["a"]}])
+        assert False, "self-dependency not detected"
+    except DependencyCycleError as e:
+        assert e.cycle == ["a", "a"]
+
+
+def test_incremental_update_touches_only_downstream_cone():
+    # Two independent chains of 500 tasks; delaying chain A must not touch chain B
+    tasks = []
+    for chain in ("a", "b"):
+        for i in range(500):
+            tasks.append({"id": f"{chain}{i}", "name": f"{chain}{i}", "duration_days": 1,
+                          "depends_on": [f"{chain}{i-1}"] if i else [], "delay_days": 0})
+    start = date(2026, 3, 2)
+    sched = IncrementalSchedule(tasks)
+    sched.rows(start)
+
+    tasks[450]["delay_days"] = 3
+    moved = sched.task_changed("a450")
+    assert len(moved) == 50  # a450..a499 only
+    expected, finish = schedule_tasks(tasks, start)
+    assert sched.rows(start) == expected
+    assert sched.finish_date(start) == finish
+
+    # Status-only edits refresh the row without moving anything
+    tasks[510]["status"] = "done"
+    assert sched.task_changed("b10") == []
+    assert sched.rows(start)[510]["status"] == "done"
+
+    # Shortening the critical chain lets the finish move back
+    tasks[450]["delay_days"] = 0
+    sched.task_changed("a450")
+    assert sched.finish_date(start) == schedule_tasks(tasks, start)[1]
+
+    # A reloaded copy with one changed duration is synced, not rebuilt
+    reloaded = copy.deepcopy(tasks)
+    reloaded[999]["duration_days"] = 10
+    assert sched.sync(reloaded)
+    assert sched.rows(start) == schedule_tasks(reloaded, start)[0]
+
+    # The same list edited in place: durations re-propagated, a dependency edit asks for a rebuild
+    reloaded[0]["duration_days"] = 2
+    assert sched.sync(reloaded)
+    assert sched.rows(start) == schedule_tasks(reloaded, start)[0]
+    reloaded[600]["depends_on"] = []
+    assert not sched.sync(reloaded)
+
+    # Structural edits ask for a rebuild
+    reloaded[505]["depends_on"] = []
+    assert sched.task_changed("b5") is None
+
+
+def test_cached_schedules_are_bounded():
+    import engine.analysis as analysis
+    saved = analysis.CACHE_PROJECTS
+    analysis.CACHE_PROJECTS = 3
+    try:
+        for k in range(5):
+            compute_schedule({"id": f"bounded-{k}", "tasks": _plan()})
+        assert [pid for pid in analysis._schedules if pid.startswith("bounded-")] == ["bounded-2", "bounded-3", "bounded-4"]
+        assert len(analysis._analyses) == 3
+    finally:
+        analysis.CACHE_PROJECTS = saved
+
+
+def test_resource_schedule_respects_headcount():
+    print("Testing resource-constrained schedule...")
+    rng = random.Random(11)
+    for _ in range(30):
+        n = rng.randint(1, 40)
+        tasks = [{"id": f"t{i}", "duration_days": rng.randint(0, 4), "role": rng.choice(["fe", "be", "qa"]),
+                  "priority": rng.choice(["high", "medium", "low"]),
+                  "depends_on": [f"t{j}" for j in rng.sample(range(i), min(i, rng.randint(0, 2)))]}
+                 for i in range(n)]
+        rng.shuffle(tasks)
+
+        # No limits -> the dependency-only schedule
+        _, starts, ends = schedule_offsets(tasks)
+        assert resource_schedule_offsets(tasks) == (starts, ends)
+
+        team = {"fe": 1, "be": 2}
+        starts, ends = resource_schedule_offsets(tasks, team=team, team_size=1)
+        index = {t["id"]: i for i, t in enumerate(tasks)}
+        for i, t in enumerate(tasks):
+            for d in t["depends_on"]:
+                assert starts[i] > ends[index[d]]
+        for role, cap in (("fe", 1), ("be", 2), ("qa", 1)):  # qa has no pool of its own -> the shared 1
+            for day in range(max(ends, default=0) + 1):
+                busy = [i for i, t in enumerate(tasks) if t["role"] == role and t["duration_days"] > 0
+                        and starts[i] <= day <= ends[i]]
+                assert len(busy) <= cap, (role, day, busy)
+
+    # One person: high priority goes first, then the task that unblocks the longer chain
+    tasks = [
+        {"id": "a", "name": "A", "duration_days": 2, "depends_on": []},
+        {"id": "b", "name": "B", "duration_days": 1, "depends_on": [], "priority": "high"},
+        {"id": "c", "name": "C", "duration_days": 1, "depends_on": []},
+        {"id": "d", "name": "D", "duration_days": 3, "depends_on": ["c"]},
+    ]
+    rows = ResourceSchedule(tasks, team_size=1).rows(date(2026, 1, 5))
+    order = sorted(rows, key=lambda r: r["start"])
+    assert [r["id"] for r in order] == ["b", "c", "d", "a"]
+    assert ResourceSchedule(tasks, team_size=1).finish_date(date(2026, 1, 5)) == "2026-01-11"
+    assert ResourceSchedule(tasks, team_size=2).finish_date(date(2026, 1, 5)) == "2026-01-08"
+    print("Resource schedule OK.")
+
+
+if __name__ == "__main__":
+    test_out_of_order_plan_matches_ordered_plan()
+    test_status_uses_true_finish()
+    test_cycle_is_reported_with_path()
+    test_incremental_update_touches_only_downstream_cone()
+    test_cached_schedules_are_bounded()
+    test_resource_schedule_respects_headcount()
+    print("Scheduler tests passed.")
@@ -0,0 +1,286 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import multiprocessing
+from pathlib import Path
+sys.path.append(os.getcwd())
+
+from engine.storage import Document, JsonStore, apply_op, find_task, index_for
+from engine.journal import JournalStore
+from engine.sqlite_store import SqliteStore
+from engine.sharded_store import ShardedStore
+from engine.models import Project, Task
+
+
+def _project(pid, n_tasks=3):
+    tasks = [{"id": f"t{i}", "name": f"Task {i}", "duration_days": 1,
+              "depends_on": [f"t{i-1}"] if i > 1 else [], "status": "pending", "delay_days": 0}
+             for i in range(1, n_tasks + 1)]
+    return {"id": pid, "name": f"Project {pid}", "tasks": tasks}
+
+
+def test_json_store_ops():
+    with tempfile.TemporaryDirectory() as d:
+        store = JsonStore(Path(d) / "projects.json")
+        store.commit({"op": "add_project", "project": _project("p1")})
+        assert store.commit({"op": "update_task", "task_id": "t2", "set": {"status": "done"}}) is not None
+        assert store.commit({"op": "update_task", "task_id": "t9", "set": {"status": "done"}}) is None
+
+        data = store.load_data()
+        assert data["active_project_id"] == "p1"
+        assert data["projects"][0]["tasks"][1]["status"] == "done"
+
+        # Project fields; ids and tasks are not touched through update_project
+        store.commit({"op": "update_project", "set": {"team_size": 2, "id": "px", "tasks": []}})
+        p1 = store.load_data()["projects"][0]
+        assert (p1["id"], p1["team_size"], len(p1["tasks"])) == ("p1", 2, 3)
+
+
+def test_document_index_stays_in_sync():
+    data = Document(active_project_id=None, projects=[])
+    apply_op(data, {"op": "add_project", "project": _project("p1", 50_000)})
+    apply_op(data, {"op": "add_project", "project": _project("p2")})
+
+    # Task updates are dictionary lookups, not scans: the task list is indexed once
+    index = index_for(data)
+    builds = []
+    positions = index._positions
+    index._positions = lambda items: builds.append(len(items)) or positions(items)
+    for i in range(1, 50_001, 10):
+        assert apply_op(data, {"op": "update_task", "project_id": "p1", "task_id": f"t{i}", "inc": {"delay_days": 1}})
+    del index._positions
+    assert builds.count(50_000) == 1
+    assert find_task(data, "p1", "t49991")["delay_days"] == 1
+
+    # A task replaced in place, at the same position, is not served from the stale entry
+    tasks = data["projects"][0]["tasks"]
+    tasks[5] = {**tasks[5], "status": "done"}
+    assert find_task(data, "p1", tasks[5]["id"]) is tasks[5]
+    tasks[6] = {"id": "fresh", "name": "Fresh"}
+    assert find_task(data, "p1", "fresh") is tasks[6]
+
+    # Replaced task lists and newly added projects are picked up
+    apply_op(data, {"op": "replace_tasks", "project_id": "p1", "tasks": [{"id": "x1", "name": "New"}]})
+    assert find_task(data, "p1", "t1") is None
+    assert apply_op(data, {"op": "update_task", "project_id": "p1", "task_id": "x1", "set": {"status": "done"}})
+    apply_op(data, {"op": "add_project", "project": _project("p3")})
+    assert apply_op(data, {"op": "set_active_project", "project_id": "p3"})["id"] == "p3"
+
+
+def test_json_store_cache_invalidation():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "projects.json"
+        store = JsonStore(path)
+        store.commit({"op": "add_project", "project": _project("p1")})
+
+        # Unchanged file -> same decoded object, no re-parse
+        first = store.load_data()
+        assert store.load_data() is first
+
+        # Another process rewrites the file -> picked up on the next read
+        other = JsonStore(path)
+        other.commit({"op": "update_task", "task_id": "t1", "set": {"status": "done"}})
+        reloaded = store.load_data()
+        assert reloaded is not first
+        assert reloaded["projects"][0]["tasks"][0]["status"] == "done"
+
+
+def test_journal_store_replay_and_compaction():
+    print("Testing journal storage...")
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "projects.json"
+        store = JournalStore(path, compact_every=10**9)
+        store.commit({"op": "add_project", "project": _project("p1")})
+        store.commit({"op": "add_project", "project": _project("p2")})
+        store.commit({"op": "set_active_project", "project_id": "p1"})
+        store.commit({"op": "update_task", "task_id": "t3", "inc": {"delay_days": 2}})
+        store.commit({"op": "update_task", "task_id": "t3", "inc": {"delay_days": 1}})
+        store.commit({"op": "update_task", "task_id": "t1", "set": {"status": "done"}})
+
+        # Nothing but appends so far: no snapshot yet
+        assert not path.exists()
+        lines = store.journal_path.read_text().splitlines()
+        assert len(lines) == 6
+
+        # A fresh process rebuilds the same state from the journal
+        fresh = JournalStore(path)
+        p1 = fresh.load_data()["projects"][0]
+        assert p1["tasks"][2]["delay_days"] == 3
+        assert p1["tasks"][0]["status"] == "done"
+
+        store.compact()
+        assert store.journal_path.read_text() == ""
+        snapshot = json.loads(path.read_text())
+        assert snapshot["journal_seq"] == 6
+
+        # Replay after compaction does not double-apply increments
+        store.commit({"op": "update_task", "task_id": "t3", "inc": {"delay_days": 1}})
+        again = JournalStore(path)
+        assert again.load_data()["projects"][0]["tasks"][2]["delay_days"] == 4
+
+        # The other instance only reads the tail it has not seen
+        assert fresh.load_data()["projects"][0]["tasks"][2]["delay_days"] == 4
+
+        # The json backend can still read a journal snapshot
+        assert "journal_seq" not in JsonStore(path).load_data()
+    print("Journal storage OK.")
+
+
+def test_sqlite_store_migration_and_updates():
+    print("Testing sqlite storage...")
+    with tempfile.TemporaryDirectory() as d:
+        json_path = Path(d) / "projects.json"
+        json_path.write_text(json.dumps({"active_project_id": "p2",
+                                         "projects": [_project("p1"), _project("p2", 5)]}))
+        db_path = Path(d) / "projects.db"
+
+        store = SqliteStore(db_path, json_path=json_path)
+        data = store.load_data()
+        assert data["active_project_id"] == "p2"
+        assert [len(p["tasks"]) for p in data["projects"]] == [3, 5]
+
+        store.commit({"op": "update_task", "task_id": "t4", "set": {"status": "done"}})
+        store.commit({"op": "update_task", "task_id": "t4", "inc": {"delay_days": 2}})
+        status, delay = store.conn.execute(
+            "SELECT status, delay_days FROM tasks WHERE project_id = 'p2' AND id = 't4'").fetchone()
+        assert (status, delay) == ("done", 2)
+
+        # Migration is one-shot: editing projects.json afterwards does not re-import
+        json_path.write_text(json.dumps({"active_project_id": None, "projects": []}))
+        other = SqliteStore(db_path, json_path=json_path)
+        assert len(other.load_data()["projects"]) == 2
+
+        # Writes from another connection invalidate the cached document
+        other.commit({"op": "set_active_project", "project_id": "p1"})
+        other.commit({"op": "replace_tasks", "project_id": "p1", "tasks": []})
+        data = store.load_data()
+        assert data["active_project_id"] == "p1"
+        assert data["projects"][0]["tasks"] == []
+        assert data["projects"][1]["tasks"][3] == {**_project("p2", 5)["tasks"][3], "status": "done", "delay_days": 2}
+
+        other.commit({"op": "update_project", "project_id": "p2", "set": {"team": {"backend": 1}}})
+        assert store.load_data()["projects"][1]["team"] == {"backend": 1}
+        other.close()
+        store.close()
+    print("Sqlite storage OK.")
+
+
+def test_sharded_store_touches_only_active_shard():
+    print("Testing sharded storage...")
+    with tempfile.TemporaryDirectory() as d:
+        json_path = Path(d) / "projects.json"
+        json_path.write_text(json.dumps({"active_project_id": "p3",
+                                         "projects": [_project(f"p{i}") for i in range(1, 4)]}))
+        shard_dir = Path(d) / "projects"
+        store = ShardedStore(shard_dir, json_path=json_path)
+        assert sorted(p.name for p in shard_dir.glob("*.json")) == ["index.json", "p1.json", "p2.json", "p3.json"]
+
+        # Fresh instance: a task update reads and writes the active shard only
+        fresh = ShardedStore(shard_dir)
+        before = {p.name: p.stat().st_mtime_ns for p in shard_dir.glob("p*.json")}
+        assert fresh.commit({"op": "update_task", "task_id": "t2", "set": {"status": "done"}}) is not None
+        assert list(fresh._shards) == ["p3"]
+        after = {p.name: p.stat().st_mtime_ns for p in shard_dir.glob("p*.json")}
+        assert [n for n in before if before[n] != after[n]] == ["p3.json"]
+
+        assert fresh.load_project(fresh.active_project_id())["tasks"][1]["status"] == "done"
+        assert store.load_project("p3")["tasks"][1]["status"] == "done"
+
+        fresh.commit({"op": "update_project", "project_id": "p3", "set": {"name": "Renamed", "team_size": 3}})
+        assert ShardedStore(shard_dir).load_project("p3")["team_size"] == 3
+        assert json.loads((shard_dir / "index.json").read_text())["projects"][2]["name"] == "Renamed"
+
+        fresh.commit({"op": "add_project", "project": _project("p4")})
+        data = store.load_data()
+        assert data["active_project_id"] == "p4"
+        assert [p["id"] for p in data["projects"]] == ["p1", "p2", "p3", "p4"]
+    print("Sharded storage OK.")
+
+
+def test_stores_load_models():
+    print("Testing stores load Project/Task...")
+    source = {"active_project_id": "p1", "projects": [_project("p1"), _project("p2", 2)]}
+    source["projects"][0]["tasks"][0]["role"] = "dev"
+    del source["projects"][1]["tasks"][1]["delay_days"]  # missing fields stay missing
+    backends = {
+        "json": lambda d, path: JsonStore(path),
+        "journal": lambda d, path: JournalStore(path),
+        "sqlite": lambda d, path: SqliteStore(d / "projects.db", json_path=path),
+        "sharded": lambda d, path: ShardedStore(d / "projects", json_path=path),
+    }
+    for kind, make in backends.items():
+        with tempfile.TemporaryDirectory() as d:
+            json_path = Path(d) / "projects.json"
+            json_path.write_text(json.dumps(source))
+            store = make(Path(d), json_path)
+            project = store.load_project("p1")
+            assert isinstance(project, Project) and all(isinstance(t, Task) for t in project["tasks"]), kind
+            assert store.load_data()["projects"] == source["projects"], kind
+
+            store.commit({"op": "update_task", "project_id": "p1", "task_id": "t1", "set": {"status": "done"}})
+            store.commit({"op": "replace_tasks", "project_id": "p2", "tasks": [{"id": "x1", "name": "X"}]})
+            store.commit({"op": "add_project", "project": _project("p3", 1)})
+            assert isinstance(store.load_project("p3"), Project), kind
+            assert isinstance(store.load_project("p2")["tasks"][0], Task), kind
+
+            # A fresh instance reads back the same plain JSON
+            again = make(Path(d), json_path).load_data()["projects"]
+            assert again[0]["tasks"][0] == {**source["projects"][0]["tasks"][0], "status": "done"}, kind
+            assert again[1]["tasks"] == [{"id": "x1", "name": "X"}], kind
+            if kind == "json":
+                assert json.loads(json_path.read_text())["projects"] == [p.to_dict() for p in again]
+            if kind == "sqlite":
+                store.close()
+    print("Stores load models OK.")
+
+
+def _bump_worker(kind, path, n):
+    store = {"json": JsonStore, "journal": JournalStore}[kind](Path(path))
+    for _ in range(n):
+        store.commit({"op": "update_task", "project_id": "p1", "task_id": "t1", "inc": {"delay_days": 1}})
+
+
+def test_concurrent_writers_do_not_lose_updates():
+    print("Testing concurrent writers...")
+    for kind, cls in [("json", JsonStore), ("journal", JournalStore)]:
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "projects.json"
+            cls(path).commit({"op": "add_project", "project": _project("p1")})
+
+            # Several processes...
+            procs = [multiprocessing.Process(target=_bump_worker, args=(kind, str(path), 20)) for _ in range(3)]
+            for proc in procs:
+                proc.start()
+            # ...and several threads sharing one store (these get group-committed)
+            shared = cls(path)
+
+            def bump():
+                for _ in range(20):
+                    shared.commit({"op": "update_task", "project_id": "p1", "task_id": "t1", "inc": {"delay_days": 1}})
+
+            threads = [threading.Thread(target=bump) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for proc in procs:
+                proc.join()
+                assert proc.exitcode == 0
+
+            total = cls(path).load_data()["projects"][0]["tasks"][0]["delay_days"]
+            print(f"{kind}: delay_days = {total}")
+            assert total == 3 * 20 + 4 * 20
+    print("Concurrent writers OK.")
+
+
+if __name__ == "__main__":
+    test_json_store_ops()
+    test_document_index_stays_in_sync()
+    test_json_store_cache_invalidation()
+    test_journal_store_replay_and_compaction()
+    test_sqlite_store_migration_and_updates()
+    test_sharded_store_touches_only_active_shard()
+    test_stores_load_models()
+    test_concurrent_writers_do_not_lose_updates()
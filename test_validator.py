@@ -0,0 +1,86 @@
+import sys
+import os
+import copy
+import time
+sys.path.append(os.getcwd())
+
+from engine.validator import PlanValidator
+from engine.analysis import analyze, forget, task_changed
+
+
+def _plan():
+    return [
+        {"id": "t1", "name": "Scope", "duration_days": 1, "depends_on": ["ghost"]},
+        {"id": "t2", "name": "Design", "duration_days": 2, "depends_on": ["t1"]},
+        {"id": "t3", "duration_days": 1, "depends_on": ["t2"]},
+        {"id": "t4", "name": "Loop A", "depends_on": ["t5"]},
+        {"id": "t5", "name": "Loop B", "duration_days": 1, "depends_on": ["t6"]},
+        {"id": "t6", "name": "Loop C", "duration_days": 1, "depends_on": ["t4"]},
+        {"id": "t1", "name": "Scope again", "duration_days": 1, "depends_on": []},
+    ]
+
+
+def test_all_checks_in_one_pass():
+    print("Testing plan validator...")
+    issues = PlanValidator(_plan()).issues
+    for i in issues:
+        print(f"- {i}")
+    assert issues == [
+        "Duplicate task IDs found (some tasks share the same id).",
+        "Task t1 depends on missing task 'ghost'.",
+        "Task t3 is missing a name.",
+        "Task t4 is missing duration_days.",
+        "Dependency cycle: t4 -> t5 -> t6 -> t4. Break it before anything can be scheduled.",
+        "Orphan chain: 2 task(s) (t2, t3) wait on t1, which depends on missing task 'ghost'.",
+    ]
+    assert PlanValidator([]).issues[0].startswith("No tasks generated yet")
+    assert PlanValidator([{"id": "a", "name": "A", "duration_days": 1, "depends_on": ["a"]}]).cycle == ["a", "a"]
+    print("Plan validator OK.")
+
+
+def test_incremental_revalidation():
+    tasks = _plan()
+    v = PlanValidator(tasks)
+    tasks[2]["name"] = "Test"
+    assert v.task_changed("t3")
+    assert not any("t3 is missing" in i for i in v.issues)
+
+    # A reloaded copy with a field fixed is synced; a dependency edit is not
+    reloaded = copy.deepcopy(tasks)
+    reloaded[3]["duration_days"] = 2
+    assert v.sync(reloaded)
+    assert not any("missing duration_days" in i for i in v.issues)
+    reloaded[5]["depends_on"] = []
+    assert not v.task_changed("t6")
+    assert not v.sync(reloaded)
+    assert PlanValidator(reloaded).cycle is None
+
+    # Through the shared analysis: edits in place only re-check the edited task
+    project = {"id": "validator-test", "tasks": copy.deepcopy(reloaded)}
+    forget(project["id"])
+    assert any("Orphan chain" in i for i in analyze(project).issues)
+    project["tasks"][0]["depends_on"] = []
+    task_changed(project["id"], "t1")
+    assert not any("ghost" in i for i in analyze(project).issues)
+    forget(project["id"])
+
+
+def test_linear_on_long_chains():
+    print("Timing validator on a 200k task chain...")
+    n = 200_000
+    chain = [{"id": f"t{i}", "name": "x", "duration_days": 1, "depends_on": [f"t{i - 1}"] if i else []}
+             for i in range(n)][::-1]
+    started = time.perf_counter()
+    assert PlanValidator(chain).issues == []
+    elapsed = time.perf_counter() - started
+    chain[-1]["depends_on"] = [f"t{n - 1}"]  # close the loop
+    cycle = PlanValidator(chain).cycle
+    assert len(cycle) == n + 1 and cycle[0] == cycle[-1]
+    print(f"200k chain: {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    test_all_checks_in_one_pass()
+    test_incremental_revalidation()
+    test_linear_on_long_chains()
+    print("Validator tests passed.")
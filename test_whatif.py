@@ -0,0 +1,94 @@
+import sys
+import os
+import copy
+from datetime import date
+sys.path.append(os.getcwd())
+
+import engine.whatif as whatif
+from engine.whatif import evaluate_scenarios, parse_scenarios
+from engine.scheduler import ResourceSchedule, schedule_tasks
+
+
+def _plan():
+    return [
+        {"id": "t1", "name": "Scope", "duration_days": 1, "depends_on": []},
+        {"id": "t2", "name": "Design", "duration_days": 2, "depends_on": ["t1"]},
+        {"id": "t3", "name": "Build", "duration_days": 3, "depends_on": ["t2"]},
+        {"id": "t4", "name": "Docs", "duration_days": 1, "depends_on": ["t1"]},
+        {"id": "t5", "name": "Ship", "duration_days": 1, "depends_on": ["t3", "t4"]},
+    ]
+
+
+def test_scenarios_match_edited_plans():
+    print("Testing what-if scenarios...")
+    tasks = _plan()
+    before = copy.deepcopy(tasks)
+    start = date(2026, 1, 5)
+    scenarios = parse_scenarios("what if delay t4 5 and drop t2; shorten t3 by 2 or cut t5, delay t9 1")
+    assert [s["name"] for s in scenarios] == ["delay t4 5, drop t2", "shorten t3 2", "drop t5, delay t9 1"]
+    # Ids of other shapes are edited when they are in the plan
+    named = parse_scenarios("What if delay Design-2 3 and drop api.v1; delay the team 2",
+                            ["Design-2", "api.v1", "t1"])
+    assert [s["edits"] for s in named] == [[{"op": "delay", "task_id": "Design-2", "days": 3},
+                                           {"op": "drop", "task_id": "api.v1"}]]
+
+    report = evaluate_scenarios(tasks, scenarios, start)
+    assert tasks == before  # nothing was edited
+    assert report["baseline"]["finish"] == schedule_tasks(tasks, start)[1]
+    assert report["baseline"]["critical_path"] == ["t1", "t2", "t3", "t5"]
+
+    delayed, shortened, cut = report["scenarios"]
+    # Same answer as actually applying the edits (t2 dropped -> t3 waits on t1 directly)
+    edited = _plan()
+    edited[3]["duration_days"] = 6
+    edited[2]["depends_on"] = ["t1"]
+    del edited[1]
+    assert delayed["finish"] == schedule_tasks(edited, start)[1]
+    assert (delayed["delta_days"], delayed["critical_path"]) == (1, ["t1", "t4", "t5"])
+    assert (shortened["delta_days"], shortened["finish"]) == (-2, "2026-01-09")
+    assert cut["critical_path"] == ["t1", "t2", "t3"] and cut["unknown_tasks"] == ["t9"]
+
+    # The pure-Python fallback agrees
+    np, whatif.np = whatif.np, None
+    try:
+        assert evaluate_scenarios(tasks, scenarios, start) == report
+    finally:
+        whatif.np = np
+    print("What-if OK.")
+
+
+def test_team_limits_the_baseline():
+    print("Testing what-if under a team...")
+    from engine.engine import get_status, what_if
+    tasks = _plan()
+    start = date(2026, 1, 5)
+    scenarios = parse_scenarios("what if delay t4 5 and drop t2; shorten t3 by 2")
+
+    # One person: everything runs back to back, a day later than the dependencies alone allow
+    report = evaluate_scenarios(tasks, scenarios, start, team_size=1)
+    assert report["baseline"]["finish"] == ResourceSchedule(tasks, team_size=1).finish_date(start) == "2026-01-12"
+    assert report["baseline"]["finish"] > schedule_tasks(tasks, start)[1]
+    edited = _plan()
+    edited[3]["duration_days"] = 6
+    edited[2]["depends_on"] = ["t1"]
+    del edited[1]
+    delayed, shortened = report["scenarios"]
+    assert delayed["finish"] == ResourceSchedule(edited, team_size=1).finish_date(start)
+    assert (delayed["delta_days"], shortened["delta_days"]) == (3, -2)
+
+    np, whatif.np = whatif.np, None
+    try:
+        assert evaluate_scenarios(tasks, scenarios, start, team_size=1) == report
+    finally:
+        whatif.np = np
+
+    # Through the engine: the baseline is the finish status reports
+    project = {"id": None, "name": "Team What-if", "team_size": 1, "tasks": tasks}
+    status = get_status(project)
+    assert what_if(project, scenarios)["baseline"]["finish"] == status["schedule"][-1]["end"]
+    print("What-if under a team OK.")
+
+
+if __name__ == "__main__":
+    test_scenarios_match_edited_plans()
+    test_team_limits_the_baseline()
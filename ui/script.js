@@ -79,22 +79,9 @@ async function sendMessage() {
     toggleSendButton();
     scrollToBottom();
 
-    // Call Python Backend
+    // Call Python Backend (streamed: the reply is shown as it is written)
     try {
-        const response = await fetch('/api/command', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                command: originalText,
-                files: filesToSend
-            })
-        });
-        const data = await response.json();
-        const aiResponse = data.reply;
-
-        const aiMessageDiv = createAIMessage(aiResponse);
-        messagesArea.appendChild(aiMessageDiv);
-        scrollToBottom();
+        const aiResponse = await streamCommand(originalText, filesToSend);
 
         // Speak response
         speak(aiResponse);
@@ -107,6 +94,59 @@ async function sendMessage() {
     }
 }
 
+// Posts a command to /api/command/stream and renders the server-sent
+// {"delta": ...} events into one AI message as they arrive. Falls back to the
+// one-shot /api/command if streaming isn't available. Resolves to the full reply.
+async function streamCommand(command, files) {
+    const body = JSON.stringify({ command: command, files: files });
+    const response = await fetch('/api/command/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: body
+    });
+
+    if (!response.ok || !response.body) {
+        const fallback = await fetch('/api/command', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: body
+        });
+        const data = await fallback.json();
+        messagesArea.appendChild(createAIMessage(data.reply));
+        scrollToBottom();
+        return data.reply;
+    }
+
+    const aiMessageDiv = createAIMessage('');
+    const textP = aiMessageDiv.querySelector('.message-content p');
+    messagesArea.appendChild(aiMessageDiv);
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let reply = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+            const event = buffer.slice(0, end);
+            buffer = buffer.slice(end + 2);
+            const line = event.split('\n').find(l => l.startsWith('data:'));
+            if (!line) continue;
+            const data = JSON.parse(line.slice(5));
+            if (data.delta) reply += data.delta;
+            if (data.error) reply += `\n\n[Error: ${data.error}]`;
+            textP.textContent = reply;
+            scrollToBottom();
+        }
+    }
+    return reply;
+}
+
 // Helper: Convert file to Base64
 function convertToBase64(file) {
     return new Promise((resolve, reject) => {